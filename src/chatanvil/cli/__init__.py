@@ -0,0 +1,31 @@
+"""
+Command line interface for ChatAnvil.
+"""
+
+import argparse
+from typing import List, Optional
+
+from . import batch, loadtest, parserbench
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the top-level ``chatanvil`` argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="chatanvil",
+        description="ChatAnvil command line tools.",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+    loadtest.add_parser(subparsers)
+    batch.add_parser(subparsers)
+    parserbench.add_parser(subparsers)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the ``chatanvil`` command line interface."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+__all__ = ["build_parser", "main"]
@@ -0,0 +1,373 @@
+"""
+Resumable JSONL batch processing through the Chat code path.
+
+Input lines are read lazily and run concurrently; each result is appended to
+the output file as soon as it completes. A checkpoint next to the output
+records how far the run got, so a crashed or killed run picks up where it
+stopped instead of starting from zero.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from ..core.chat import Chat
+from ..parsers.base import BaseParser
+from ..parsers.factory import ParserFactory
+
+# Per-line keys that are passed to the Chat call rather than treated as data
+REQUEST_KEYS = ("model", "system_prompt", "temperature", "max_tokens")
+
+logger = logging.getLogger("chatanvil.batch")
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a batch run.
+
+    Attributes:
+        input_path: Input file the checkpoint belongs to
+        watermark: Every input line below this index has a successful result
+        completed: Successful line indices at or above the watermark
+        output_bytes: Size of the output file when the checkpoint was written
+        finished: Whether the whole input was processed
+    """
+
+    input_path: str
+    watermark: int = 0
+    completed: List[int] = field(default_factory=list)
+    output_bytes: int = 0
+    finished: bool = False
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint atomically so a kill never leaves it half written."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class BatchSummary:
+    """Counts for one batch run."""
+
+    processed: int = 0
+    errors: int = 0
+    skipped: int = 0
+    duration: float = 0.0
+
+
+class BatchRunner:
+    """Run a JSONL file of requests through a Chat instance with checkpoints.
+
+    Each input line is a JSON object with ``message`` (or ``prompt``) for
+    ``get_response`` or ``messages`` for ``get_chat_completion``, an optional
+    ``id`` and optional per-line ``model``, ``system_prompt``, ``temperature``
+    and ``max_tokens``. Output lines carry ``id``, ``line`` and ``response``
+    (or ``error``), plus ``parsed`` and ``code`` when a parser and code
+    extraction are enabled.
+
+    Lines that failed, including lines that are not valid JSON and results
+    that could not be written, are not marked done: rerunning the command
+    retries them, and their new result is appended after the failed one.
+
+    Args:
+        chat: Chat instance used for every request
+        input_path: JSONL file of requests
+        output_path: JSONL file results are appended to
+        checkpoint_path: Checkpoint file (defaults to ``<output>.ckpt``)
+        concurrency: Number of requests in flight
+        parser: Parser producing the ``parsed`` column
+        extract_code: Add a ``code`` column extracted with ``parser``
+        checkpoint_every: Write a checkpoint after this many results
+        restart: Ignore previous progress and truncate the output
+        request_kwargs: Default keyword arguments for every Chat call
+    """
+
+    def __init__(
+        self,
+        chat: Chat,
+        input_path: str,
+        output_path: str,
+        checkpoint_path: Optional[str] = None,
+        concurrency: int = 8,
+        parser: Optional[BaseParser] = None,
+        extract_code: bool = False,
+        checkpoint_every: int = 100,
+        restart: bool = False,
+        request_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        if extract_code and (parser is None or parser.type == "default"):
+            raise ValueError("Code extraction requires a markdown, json or xml parser")
+        self.chat = chat
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or f"{output_path}.ckpt"
+        self.concurrency = concurrency
+        self.parser = parser
+        self.extract_code = extract_code
+        self.checkpoint_every = checkpoint_every
+        self.restart = restart
+        self.request_kwargs = request_kwargs or {}
+
+        self._lock = threading.Lock()
+        self._watermark = 0
+        self._completed: Set[int] = set()
+        self._since_checkpoint = 0
+        self._output: Any = None
+
+    def _resume(self) -> None:
+        """Restore progress from the checkpoint and any results written after it."""
+        checkpoint = None if self.restart else Checkpoint.load(self.checkpoint_path)
+        if checkpoint is not None and checkpoint.input_path != os.path.abspath(
+            self.input_path
+        ):
+            raise ValueError(
+                f"Checkpoint {self.checkpoint_path} belongs to {checkpoint.input_path}; "
+                "use --restart to discard it"
+            )
+        if self.restart or not os.path.exists(self.output_path):
+            open(self.output_path, "wb").close()
+            return
+
+        # Drop a partially written last line left behind by a kill mid-write
+        with open(self.output_path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+
+        offset = 0
+        if checkpoint is not None and checkpoint.output_bytes <= end:
+            self._watermark = checkpoint.watermark
+            self._completed = set(checkpoint.completed)
+            offset = checkpoint.output_bytes
+        # Results appended after the last checkpoint are recovered from the output
+        with open(self.output_path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                record = json.loads(raw)
+                if "error" not in record:
+                    self._completed.add(record["line"])
+        self._advance_watermark()
+
+    def _advance_watermark(self) -> None:
+        while self._watermark in self._completed:
+            self._completed.discard(self._watermark)
+            self._watermark += 1
+
+    def _checkpoint(self, finished: bool = False) -> None:
+        Checkpoint(
+            input_path=os.path.abspath(self.input_path),
+            watermark=self._watermark,
+            completed=sorted(self._completed),
+            output_bytes=self._output.tell(),
+            finished=finished,
+        ).save(self.checkpoint_path)
+        self._since_checkpoint = 0
+
+    def _pending(self) -> Iterator[Tuple[int, str]]:
+        """Yield (line index, raw line) for input lines without a result yet."""
+        with open(self.input_path, encoding="utf-8") as f:
+            for index, line in enumerate(f):
+                if index < self._watermark or index in self._completed:
+                    continue
+                if line.strip():
+                    yield index, line
+                else:
+                    # Blank lines have nothing to run but must not hold back
+                    # the watermark
+                    with self._lock:
+                        self._completed.add(index)
+                        self._advance_watermark()
+
+    def _execute(self, index: int, line: str) -> Dict[str, Any]:
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"id": index, "line": index, "error": f"JSONDecodeError: {e}"}
+        if not isinstance(item, dict):
+            return {"id": index, "line": index, "error": "Line is not a JSON object"}
+        record: Dict[str, Any] = {"id": item.get("id", index), "line": index}
+        kwargs = dict(self.request_kwargs)
+        kwargs.update({key: item[key] for key in REQUEST_KEYS if key in item})
+        try:
+            if "messages" in item:
+                kwargs.pop("system_prompt", None)
+                response = self.chat.get_chat_completion(item["messages"], **kwargs)
+            else:
+                message = item.get("message") or item.get("prompt")
+                if message is None:
+                    raise ValueError("Line has no message, prompt or messages")
+                response = self.chat.get_response(message, **kwargs)
+            record["response"] = response
+            if self.parser is not None and isinstance(response, str):
+                record["parsed"] = self.parser.parse_response(response)
+                if self.extract_code:
+                    record["code"] = self.parser.extract_code(response)
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        return record
+
+    def _write(self, record: Dict[str, Any], summary: BatchSummary) -> None:
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._output.write(data)
+            self._output.flush()
+            summary.processed += 1
+            if "error" in record:
+                # Left pending so a resumed run retries it, e.g. after an outage
+                summary.errors += 1
+            else:
+                self._completed.add(record["line"])
+                self._advance_watermark()
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self.checkpoint_every:
+                self._checkpoint()
+
+    def run(self) -> BatchSummary:
+        """Process every pending input line and return the run's counts."""
+        self._resume()
+        summary = BatchSummary(skipped=self._watermark + len(self._completed))
+        started = time.monotonic()
+        # Bound the number of submitted lines so the input is never read ahead
+        # by more than a few batches of work
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+
+        def work(index: int, line: str) -> None:
+            try:
+                self._write(self._execute(index, line), summary)
+            except Exception:
+                # Nothing was recorded for the line, so it stays pending
+                logger.exception("Could not write the result of line %d", index)
+                with self._lock:
+                    summary.errors += 1
+            finally:
+                slots.release()
+
+        self._output = open(self.output_path, "ab")
+        finished = False
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="chatanvil-batch"
+            ) as executor:
+                for index, line in self._pending():
+                    slots.acquire()
+                    executor.submit(work, index, line)
+            finished = True
+        finally:
+            with self._lock:
+                self._checkpoint(finished=finished)
+            self._output.close()
+        summary.duration = time.monotonic() - started
+        return summary
+
+
+def add_parser(subparsers: Any) -> argparse.ArgumentParser:
+    """Register the ``batch`` subcommand."""
+    parser = subparsers.add_parser(
+        "batch",
+        help="Run a JSONL file of requests with checkpoints and resume.",
+        description=__doc__,
+    )
+    parser.add_argument("input", help="JSONL file of requests")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file for results")
+    parser.add_argument("--provider", default="openai", help="Service provider name")
+    parser.add_argument("--model", help="Model override")
+    parser.add_argument("--api-key", help="API key override")
+    parser.add_argument("--base-url", help="Endpoint override")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--system-prompt", help="Default system prompt")
+    parser.add_argument("--max-tokens", type=int, help="Default max_tokens")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument(
+        "--parser",
+        choices=["markdown", "json", "xml", "auto"],
+        help="Add a 'parsed' column produced by this parser",
+    )
+    parser.add_argument(
+        "--extract-code",
+        action="store_true",
+        help="Add a 'code' column with code blocks extracted by --parser",
+    )
+    parser.add_argument("--checkpoint", help="Checkpoint file (default <output>.ckpt)")
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=100, help="Results between checkpoints"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard previous progress and truncate the output",
+    )
+    parser.add_argument(
+        "--log-requests",
+        action="store_true",
+        help="Keep per-request chat transcript logging",
+    )
+    parser.set_defaults(handler=run)
+    return parser
+
+
+def run(args: argparse.Namespace) -> int:
+    """Execute the ``batch`` subcommand."""
+    provider_kwargs: Dict[str, Any] = {}
+    if args.base_url:
+        provider_kwargs["base_url"] = args.base_url
+    chat = Chat(
+        args.provider, api_key=args.api_key, model=args.model, **provider_kwargs
+    )
+    if not args.log_requests:
+        logging.getLogger(f"chatanvil.{chat.provider_name}.chat").setLevel(
+            logging.WARNING
+        )
+
+    request_kwargs: Dict[str, Any] = {"temperature": args.temperature}
+    if args.model:
+        request_kwargs["model"] = args.model
+    if args.max_tokens:
+        request_kwargs["max_tokens"] = args.max_tokens
+    if args.system_prompt:
+        request_kwargs["system_prompt"] = args.system_prompt
+
+    summary = BatchRunner(
+        chat,
+        args.input,
+        args.output,
+        checkpoint_path=args.checkpoint,
+        concurrency=args.concurrency,
+        parser=ParserFactory.get_parser(args.parser) if args.parser else None,
+        extract_code=args.extract_code,
+        checkpoint_every=args.checkpoint_every,
+        restart=args.restart,
+        request_kwargs=request_kwargs,
+    ).run()
+    print(
+        f"{summary.processed} processed, {summary.errors} errors, "
+        f"{summary.skipped} already done, {summary.duration:.2f} s",
+        file=sys.stderr,
+    )
+    return 0 if summary.errors == 0 else 1
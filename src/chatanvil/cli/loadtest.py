@@ -0,0 +1,492 @@
+"""
+Open-loop load generator driving providers through the Chat code path.
+
+Requests arrive on a schedule (Poisson or constant inter-arrival times) that
+does not depend on how fast earlier requests complete, so slow responses show
+up as growing latency and queueing instead of silently lowering the offered
+load, as a closed loop of N threads would.
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..core.chat import Chat
+from ..utils.retry import is_rate_limit_error, retry_observer
+
+DEFAULT_PROMPT = "Say hello in one short sentence."
+
+
+@dataclass
+class RequestRecord:
+    """Timing and outcome of a single load-test request."""
+
+    scheduled: float
+    started: float = 0.0
+    finished: float = 0.0
+    first_chunk: Optional[float] = None
+    output_chars: int = 0
+    error: Optional[str] = None
+    rate_limited: bool = False
+    retried_errors: int = 0
+    retried_rate_limits: int = 0
+
+    def observe(self, error: BaseException) -> None:
+        """Count an error a retry hid from the caller."""
+        self.retried_errors += 1
+        if is_rate_limit_error(error):
+            self.retried_rate_limits += 1
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of already sorted values (q in 0-100)."""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(values)
+    return {
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1] if values else None,
+    }
+
+
+@dataclass
+class LoadTestReport:
+    """Aggregated results of a load-test run.
+
+    Latency and time to first token are measured from each request's scheduled
+    arrival, so they include client-side queueing; ``queue_delay`` reports
+    that component on its own. ``errors`` and ``rate_limited`` count requests
+    that failed; ``retried_errors`` and ``retried_rate_limits`` count the
+    responses the provider retries absorbed on the way.
+    """
+
+    provider: str
+    model: Optional[str]
+    target_rate: float
+    arrival: str
+    duration: float
+    sent: int
+    completed: int
+    errors: int
+    rate_limited: int
+    incomplete: int
+    throughput: float
+    output_chars_per_second: float
+    latency: Dict[str, Optional[float]]
+    ttft: Dict[str, Optional[float]]
+    queue_delay: Dict[str, Optional[float]]
+    cpu_seconds: float
+    cpu_percent: float
+    retried_errors: int = 0
+    retried_rate_limits: int = 0
+    error_types: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.sent if self.sent else 0.0
+
+    @property
+    def rate_limit_rate(self) -> float:
+        return self.rate_limited / self.sent if self.sent else 0.0
+
+    @classmethod
+    def from_records(
+        cls,
+        records: List[RequestRecord],
+        provider: str,
+        model: Optional[str],
+        target_rate: float,
+        arrival: str,
+        duration: float,
+        cpu_seconds: float,
+    ) -> "LoadTestReport":
+        done = [r for r in records if r.finished]
+        ok = [r for r in done if r.error is None]
+        failed = [r for r in done if r.error is not None]
+        error_types: Dict[str, int] = {}
+        for record in failed:
+            error_types[record.error] = error_types.get(record.error, 0) + 1
+        return cls(
+            provider=provider,
+            model=model,
+            target_rate=target_rate,
+            arrival=arrival,
+            duration=duration,
+            sent=len(records),
+            completed=len(ok),
+            errors=len(failed),
+            rate_limited=sum(1 for r in failed if r.rate_limited),
+            incomplete=len(records) - len(done),
+            throughput=len(ok) / duration if duration else 0.0,
+            output_chars_per_second=(
+                sum(r.output_chars for r in ok) / duration if duration else 0.0
+            ),
+            latency=_summary([r.finished - r.scheduled for r in ok]),
+            ttft=_summary(
+                [r.first_chunk - r.scheduled for r in ok if r.first_chunk is not None]
+            ),
+            queue_delay=_summary([r.started - r.scheduled for r in done]),
+            cpu_seconds=cpu_seconds,
+            cpu_percent=100.0 * cpu_seconds / duration if duration else 0.0,
+            retried_errors=sum(r.retried_errors for r in records),
+            retried_rate_limits=sum(r.retried_rate_limits for r in records),
+            error_types=error_types,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["error_rate"] = self.error_rate
+        data["rate_limit_rate"] = self.rate_limit_rate
+        return data
+
+    def format(self) -> str:
+        """Render the report as a human-readable table."""
+
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.1f}"
+
+        lines = [
+            f"Provider:        {self.provider} ({self.model or 'default model'})",
+            f"Arrivals:        {self.arrival} at {self.target_rate:g} req/s",
+            f"Duration:        {self.duration:.2f} s",
+            f"Requests:        {self.sent} sent, {self.completed} ok, "
+            f"{self.errors} errors, {self.incomplete} incomplete",
+            f"Throughput:      {self.throughput:.2f} req/s, "
+            f"{self.output_chars_per_second:.0f} output chars/s",
+            f"Error rate:      {self.error_rate:.2%} ({self.rate_limit_rate:.2%} 429)",
+            f"Retried:         {self.retried_errors} errors "
+            f"({self.retried_rate_limits} 429) hidden by retries",
+            f"Client CPU:      {self.cpu_seconds:.2f} s ({self.cpu_percent:.1f}% of one core)",
+            "",
+            f"{'(ms)':<13}{'mean':>10}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'max':>10}",
+        ]
+        for name, stats in (
+            ("latency", self.latency),
+            ("ttft", self.ttft),
+            ("queue delay", self.queue_delay),
+        ):
+            lines.append(
+                f"{name:<13}"
+                + "".join(
+                    f"{ms(stats[key]):>10}"
+                    for key in ("mean", "p50", "p90", "p95", "p99", "max")
+                )
+            )
+        if self.error_types:
+            lines.append("")
+            lines.append("Errors:")
+            for name, count in sorted(self.error_types.items()):
+                lines.append(f"  {name}: {count}")
+        return "\n".join(lines)
+
+
+class LoadTest:
+    """Drive a Chat instance at a target request rate with open-loop arrivals.
+
+    Args:
+        chat: Chat instance whose provider receives the traffic
+        prompts: Prompt corpus, cycled in order
+        rate: Target arrival rate in requests per second
+        duration: Stop scheduling arrivals after this many seconds
+        total_requests: Stop scheduling arrivals after this many requests
+        arrival: 'poisson' for exponential inter-arrival times or 'constant'
+        max_in_flight: Worker threads; arrivals beyond this queue client-side
+        stream: Use streaming calls so time to first token can be measured
+        drain_timeout: Seconds to wait for in-flight requests after the last arrival
+        seed: Seed for the arrival process
+        request_kwargs: Extra keyword arguments for every Chat call
+        sdk_retries: Keep the provider SDK's own retries. They are invisible
+            to the report, so they are turned off by default and only the
+            provider retries, which the report counts, remain.
+    """
+
+    ARRIVALS = ("poisson", "constant")
+
+    def __init__(
+        self,
+        chat: Chat,
+        prompts: Sequence[str],
+        rate: float,
+        duration: Optional[float] = None,
+        total_requests: Optional[int] = None,
+        arrival: str = "poisson",
+        max_in_flight: int = 256,
+        stream: bool = False,
+        drain_timeout: float = 30.0,
+        seed: Optional[int] = None,
+        request_kwargs: Optional[Dict[str, Any]] = None,
+        sdk_retries: bool = False,
+    ):
+        if rate <= 0:
+            raise ValueError("Request rate must be positive")
+        if arrival not in self.ARRIVALS:
+            raise ValueError(
+                f"Unsupported arrival process: {arrival}. "
+                f"Available processes: {', '.join(self.ARRIVALS)}"
+            )
+        if duration is None and total_requests is None:
+            raise ValueError("Either duration or total_requests is required")
+        if not prompts:
+            raise ValueError("Prompt corpus is empty")
+        self.chat = chat
+        self.prompts = list(prompts)
+        self.rate = rate
+        self.duration = duration
+        self.total_requests = total_requests
+        self.arrival = arrival
+        self.max_in_flight = max_in_flight
+        self.stream = stream
+        self.drain_timeout = drain_timeout
+        self.rng = random.Random(seed)
+        self.request_kwargs = request_kwargs or {}
+        if not sdk_retries:
+            _disable_sdk_retries(chat.provider)
+
+    def _next_gap(self) -> float:
+        if self.arrival == "poisson":
+            return self.rng.expovariate(self.rate)
+        return 1.0 / self.rate
+
+    def _execute(self, record: RequestRecord, prompt: str) -> None:
+        record.started = time.monotonic()
+        token = retry_observer.set(record.observe)
+        try:
+            if self.stream:
+                chars = 0
+                for chunk in self.chat.stream_response(prompt, **self.request_kwargs):
+                    if record.first_chunk is None:
+                        record.first_chunk = time.monotonic()
+                    chars += len(chunk)
+                record.output_chars = chars
+            else:
+                response = self.chat.get_response(prompt, **self.request_kwargs)
+                record.output_chars = len(response or "")
+        except Exception as e:
+            record.error = type(e).__name__
+            record.rate_limited = is_rate_limit_error(e)
+        finally:
+            retry_observer.reset(token)
+            record.finished = time.monotonic()
+
+    def run(self) -> LoadTestReport:
+        """Run the load test and return its report."""
+        records: List[RequestRecord] = []
+        futures = []
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="chatanvil-load"
+        )
+        cpu_start = time.process_time()
+        start = time.monotonic()
+        next_arrival = start
+        try:
+            while True:
+                if (
+                    self.total_requests is not None
+                    and len(records) >= self.total_requests
+                ):
+                    break
+                if self.duration is not None and next_arrival - start >= self.duration:
+                    break
+                delay = next_arrival - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                # Stamp the scheduled time, not the wake-up time, so scheduler
+                # lag is charged to the request like any other queueing
+                record = RequestRecord(scheduled=next_arrival)
+                prompt = self.prompts[len(records) % len(self.prompts)]
+                records.append(record)
+                futures.append(executor.submit(self._execute, record, prompt))
+                next_arrival += self._next_gap()
+            wait(futures, timeout=self.drain_timeout)
+        finally:
+            executor.shutdown(wait=False)
+        elapsed = time.monotonic() - start
+        cpu_seconds = time.process_time() - cpu_start
+        return LoadTestReport.from_records(
+            records,
+            provider=self.chat.provider_name,
+            model=self.request_kwargs.get("model") or self.chat.config.model,
+            target_rate=self.rate,
+            arrival=self.arrival,
+            duration=elapsed,
+            cpu_seconds=cpu_seconds,
+        )
+
+
+def _disable_sdk_retries(provider: Any) -> None:
+    """Set max_retries=0 on the provider's SDK clients that are already built."""
+    clients = getattr(provider, "clients", None)
+    if clients:
+        provider.clients = [
+            c.with_options(max_retries=0) if hasattr(c, "with_options") else c
+            for c in clients
+        ]
+        provider.client = provider.clients[0]
+        return
+    client = getattr(provider, "client", None)
+    if hasattr(client, "with_options"):
+        provider.client = client.with_options(max_retries=0)
+
+
+def load_prompts(path: Optional[str]) -> List[str]:
+    """Load a prompt corpus.
+
+    ``.jsonl`` files take the ``prompt`` (or ``message``) field of each line;
+    any other file is read as one prompt per non-empty line.
+    """
+    if path is None:
+        return [DEFAULT_PROMPT]
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                item = json.loads(line)
+                prompts.append(item.get("prompt") or item["message"])
+            else:
+                prompts.append(line)
+    return prompts
+
+
+def add_parser(subparsers: Any) -> argparse.ArgumentParser:
+    """Register the ``loadtest`` subcommand."""
+    parser = subparsers.add_parser(
+        "loadtest",
+        help="Drive a provider at a target request rate and report latency.",
+        description=__doc__,
+    )
+    parser.add_argument("--provider", default="openai", help="Service provider name")
+    parser.add_argument("--model", help="Model override")
+    parser.add_argument("--api-key", help="API key override")
+    parser.add_argument(
+        "--base-url", help="Endpoint override, e.g. a local OpenAI-compatible server"
+    )
+    parser.add_argument(
+        "--mock",
+        action="store_true",
+        help="Run against an in-process MockProviderServer (its CPU counts as client CPU)",
+    )
+    parser.add_argument(
+        "--mock-ttft", type=float, default=0.2, help="Mock time to first token (s)"
+    )
+    parser.add_argument(
+        "--mock-tokens-per-second", type=float, default=100.0, help="Mock token rate"
+    )
+    parser.add_argument(
+        "--mock-rate-limit", type=float, default=0.0, help="Mock 429 probability"
+    )
+    parser.add_argument("--prompts", help="Prompt corpus (.txt lines or .jsonl)")
+    parser.add_argument("--system-prompt", help="System prompt for every request")
+    parser.add_argument(
+        "--rate", type=float, required=True, help="Target requests per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, help="Arrival window in seconds (default 10)"
+    )
+    parser.add_argument("--requests", type=int, help="Total number of requests to send")
+    parser.add_argument("--arrival", choices=LoadTest.ARRIVALS, default="poisson")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=256, help="Worker thread cap"
+    )
+    parser.add_argument("--max-tokens", type=int, help="max_tokens for every request")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--stream", action="store_true", help="Stream to measure TTFT")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, help="Seed for the arrival process")
+    parser.add_argument(
+        "--sdk-retries",
+        action="store_true",
+        help="Keep the SDK's own retries, which the report cannot count",
+    )
+    parser.add_argument(
+        "--log-requests",
+        action="store_true",
+        help="Keep per-request chat transcript logging (costs client CPU)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.set_defaults(handler=run)
+    return parser
+
+
+def run(args: argparse.Namespace) -> int:
+    """Execute the ``loadtest`` subcommand."""
+    duration = args.duration
+    if duration is None and args.requests is None:
+        duration = 10.0
+
+    server = None
+    provider_kwargs: Dict[str, Any] = {}
+    api_key = args.api_key
+    if args.mock:
+        from ..testing import MockProviderServer
+
+        server = MockProviderServer(
+            ttft=args.mock_ttft,
+            tokens_per_second=args.mock_tokens_per_second,
+            rate_limit_rate=args.mock_rate_limit,
+        ).start()
+        provider_kwargs["base_url"] = server.base_url(args.provider)
+        api_key = api_key or "mock"
+    elif args.base_url:
+        provider_kwargs["base_url"] = args.base_url
+
+    try:
+        chat = Chat(args.provider, api_key=api_key, model=args.model, **provider_kwargs)
+        if args.system_prompt:
+            chat.set_system_prompt(args.system_prompt)
+        if not args.log_requests:
+            logging.getLogger(f"chatanvil.{chat.provider_name}.chat").setLevel(
+                logging.WARNING
+            )
+
+        request_kwargs: Dict[str, Any] = {"temperature": args.temperature}
+        if args.model:
+            request_kwargs["model"] = args.model
+        if args.max_tokens:
+            request_kwargs["max_tokens"] = args.max_tokens
+
+        report = LoadTest(
+            chat,
+            load_prompts(args.prompts),
+            rate=args.rate,
+            duration=duration,
+            total_requests=args.requests,
+            arrival=args.arrival,
+            max_in_flight=args.max_in_flight,
+            stream=args.stream,
+            drain_timeout=args.drain_timeout,
+            seed=args.seed,
+            request_kwargs=request_kwargs,
+            sdk_retries=args.sdk_retries,
+        ).run()
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.format())
+    return 0 if report.errors == 0 and report.incomplete == 0 else 1
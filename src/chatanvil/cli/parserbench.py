@@ -0,0 +1,361 @@
+"""
+Throughput benchmark for the response parsers on a synthetic corpus.
+
+Every parser meant for a corpus kind is timed on ``parse_response`` and
+``extract_code`` at each size, with a fresh parser per call so the parse cache
+never answers. Results report MB/s, per-call latency and peak memory. Between
+consecutive sizes the growth exponent of the call time is estimated; cases
+growing clearly faster than linearly (catastrophic regex backtracking,
+quadratic scans) or failing outright are flagged. Sizes whose predicted time
+exceeds the time budget are skipped and flagged instead of being run.
+"""
+
+import argparse
+import json
+import math
+import re
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..parsers.factory import ParserFactory
+from ..testing.corpus import DEFAULT_SIZES, GENERATORS, CorpusCase, generate_case
+from .loadtest import percentile
+
+METHODS = ("parse_response", "extract_code")
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmg]?)b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as ``512``, ``100k`` or ``10MB`` into bytes.
+
+    Raises:
+        ValueError: If the value is not a size
+    """
+    match = _SIZE_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def format_size(size: int) -> str:
+    for unit, factor in (("MB", 1 << 20), ("KB", 1 << 10)):
+        if size >= factor:
+            return f"{size / factor:.1f} {unit}"
+    return f"{size} B"
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one parser method on one corpus response.
+
+    Latencies are in seconds; ``peak_memory`` is the peak traced allocation
+    of one call in bytes, or None if it was not measured.
+    """
+
+    kind: str
+    parser: str
+    method: str
+    size: int
+    calls: int = 0
+    latency: Dict[str, Optional[float]] = field(default_factory=dict)
+    mb_per_second: Optional[float] = None
+    peak_memory: Optional[int] = None
+    exponent: Optional[float] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
+
+@dataclass
+class ParserBenchmarkReport:
+    """Results of a benchmark run, with the cases flagged as worst cases."""
+
+    results: List[BenchmarkResult]
+    flagged: List[Dict[str, Any]]
+    duration: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def format(self) -> str:
+        """Render the report as a human-readable table."""
+
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.2f}"
+
+        lines = [
+            f"{'kind':<22}{'parser':<10}{'method':<16}{'size':>10}"
+            f"{'MB/s':>10}{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}"
+            f"{'peak mem':>11}{'growth':>8}",
+        ]
+        for r in self.results:
+            if r.skipped or r.error:
+                note = "skipped (over budget)" if r.skipped else f"error: {r.error}"
+                lines.append(
+                    f"{r.kind:<22}{r.parser:<10}{r.method:<16}"
+                    f"{format_size(r.size):>10}  {note}"
+                )
+                continue
+            memory = "-" if r.peak_memory is None else format_size(r.peak_memory)
+            growth = "-" if r.exponent is None else f"n^{r.exponent:.1f}"
+            lines.append(
+                f"{r.kind:<22}{r.parser:<10}{r.method:<16}{format_size(r.size):>10}"
+                f"{r.mb_per_second or 0:>10.1f}{ms(r.latency['mean']):>10}"
+                f"{ms(r.latency['p50']):>10}{ms(r.latency['max']):>10}"
+                f"{memory:>11}{growth:>8}"
+            )
+        lines.append("")
+        lines.append(f"Duration: {self.duration:.1f} s")
+        if self.flagged:
+            lines.append("")
+            lines.append("Flagged worst cases:")
+            for flag in self.flagged:
+                lines.append(
+                    f"  {flag['kind']} / {flag['parser']}.{flag['method']}: {flag['reason']}"
+                )
+        return "\n".join(lines)
+
+
+class ParserBenchmark:
+    """Time the parsers on synthetic responses of increasing size.
+
+    Args:
+        sizes: Response sizes in bytes
+        kinds: Corpus kinds to run (default: all)
+        parsers: Parser types to run (default: every parser meant for a kind)
+        methods: Parser methods to time
+        repeat: Calls per measurement; fewer are made once the budget is spent
+        budget: Seconds allowed per measurement; larger sizes predicted to
+            take longer are skipped
+        superlinear_exponent: Growth exponent above which a case is flagged
+        measure_memory: Trace the peak memory of one call per measurement
+        seed: Seed for the corpus generators
+    """
+
+    def __init__(
+        self,
+        sizes: Sequence[int] = DEFAULT_SIZES,
+        kinds: Optional[Sequence[str]] = None,
+        parsers: Optional[Sequence[str]] = None,
+        methods: Sequence[str] = METHODS,
+        repeat: int = 3,
+        budget: float = 10.0,
+        superlinear_exponent: float = 1.5,
+        measure_memory: bool = True,
+        seed: int = 0,
+    ):
+        self.sizes = sorted(sizes)
+        self.kinds = list(kinds) if kinds else list(GENERATORS)
+        self.parsers = set(parsers) if parsers else None
+        self.methods = list(methods)
+        self.repeat = max(1, repeat)
+        self.budget = budget
+        self.superlinear_exponent = superlinear_exponent
+        self.measure_memory = measure_memory
+        self.seed = seed
+
+    def run(self) -> ParserBenchmarkReport:
+        started = time.perf_counter()
+        results: List[BenchmarkResult] = []
+        flagged: List[Dict[str, Any]] = []
+        for kind in self.kinds:
+            cases: Dict[int, CorpusCase] = {}
+
+            def case_for(size: int) -> CorpusCase:
+                if size not in cases:
+                    cases[size] = generate_case(kind, size, self.seed)
+                return cases[size]
+
+            parser_types = GENERATORS[kind][1]
+            for parser_type in parser_types:
+                if self.parsers is not None and parser_type not in self.parsers:
+                    continue
+                for method in self.methods:
+                    series = self._run_series(kind, parser_type, method, case_for)
+                    results.extend(series)
+                    flag = self._flag(series)
+                    if flag:
+                        flagged.append(
+                            {
+                                "kind": kind,
+                                "parser": parser_type,
+                                "method": method,
+                                **flag,
+                            }
+                        )
+        return ParserBenchmarkReport(results, flagged, time.perf_counter() - started)
+
+    def _run_series(
+        self, kind: str, parser_type: str, method: str, case_for: Any
+    ) -> List[BenchmarkResult]:
+        series: List[BenchmarkResult] = []
+        previous: Optional[BenchmarkResult] = None
+        for size in self.sizes:
+            if previous is not None and previous.latency.get("mean"):
+                exponent = max(1.0, previous.exponent or 1.0)
+                predicted = (
+                    previous.latency["mean"] * (size / previous.size) ** exponent
+                )
+                if predicted > self.budget:
+                    series.append(
+                        BenchmarkResult(kind, parser_type, method, size, skipped=True)
+                    )
+                    break
+            case = case_for(size)
+            result = self._measure(kind, parser_type, method, case)
+            if previous is not None and result.error is None:
+                result.exponent = self._exponent(previous, result)
+            series.append(result)
+            if result.error:
+                break
+            previous = result
+        return series
+
+    def _measure(
+        self, kind: str, parser_type: str, method: str, case: CorpusCase
+    ) -> BenchmarkResult:
+        result = BenchmarkResult(kind, parser_type, method, case.size)
+        times: List[float] = []
+        for _ in range(self.repeat):
+            # A fresh parser per call, so its parse cache never answers
+            call = getattr(ParserFactory.get_parser(parser_type), method)
+            start = time.perf_counter()
+            try:
+                call(case.text)
+            except Exception as e:
+                result.error = type(e).__name__
+                return result
+            times.append(time.perf_counter() - start)
+            if sum(times) > self.budget:
+                break
+        times.sort()
+        mean = sum(times) / len(times)
+        result.calls = len(times)
+        result.latency = {
+            "mean": mean,
+            "p50": percentile(times, 50),
+            "max": times[-1],
+        }
+        result.mb_per_second = case.size / (1 << 20) / mean if mean else None
+        # Tracing slows calls down several times, so skip it for slow ones
+        if self.measure_memory and mean * 5 <= self.budget:
+            result.peak_memory = self._peak_memory(parser_type, method, case.text)
+        return result
+
+    @staticmethod
+    def _peak_memory(parser_type: str, method: str, text: str) -> int:
+        call = getattr(ParserFactory.get_parser(parser_type), method)
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            call(text)
+            return max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+    @staticmethod
+    def _exponent(smaller: BenchmarkResult, larger: BenchmarkResult) -> Optional[float]:
+        """Estimate k in time ~ size**k from the median times of two sizes."""
+        small_time, large_time = smaller.latency["p50"], larger.latency["p50"]
+        # Timings of a few microseconds are dominated by noise and fixed costs
+        if not small_time or small_time < 5e-5 or larger.size <= smaller.size:
+            return None
+        return math.log(large_time / small_time) / math.log(larger.size / smaller.size)
+
+    def _flag(self, series: List[BenchmarkResult]) -> Optional[Dict[str, Any]]:
+        for result in series:
+            if result.error:
+                return {
+                    "reason": f"fails at {format_size(result.size)} with {result.error}"
+                }
+        exponents = [r.exponent for r in series if r.exponent is not None]
+        worst = max(exponents) if exponents else None
+        skipped = [r for r in series if r.skipped]
+        if worst is not None and worst > self.superlinear_exponent:
+            reason = f"time grows as n^{worst:.1f}"
+            if skipped:
+                reason += f"; {format_size(skipped[0].size)} would exceed the budget"
+            return {"reason": reason, "exponent": worst}
+        if skipped:
+            return {
+                "reason": f"{format_size(skipped[0].size)} would exceed the "
+                f"{self.budget:g} s budget",
+                "exponent": worst,
+            }
+        return None
+
+
+def add_parser(subparsers: Any) -> argparse.ArgumentParser:
+    """Register the ``parserbench`` subcommand."""
+    parser = subparsers.add_parser(
+        "parserbench",
+        help="Benchmark the parsers on a synthetic corpus and flag worst cases.",
+        description=__doc__,
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1k,100k,1m,10m",
+        help="Comma-separated response sizes, e.g. 1k,100k,1m (default up to 10m)",
+    )
+    parser.add_argument(
+        "--kinds", help=f"Comma-separated corpus kinds ({', '.join(GENERATORS)})"
+    )
+    parser.add_argument("--parsers", help="Comma-separated parser types to run")
+    parser.add_argument(
+        "--methods", default=",".join(METHODS), help="Comma-separated parser methods"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Calls per measurement")
+    parser.add_argument(
+        "--budget", type=float, default=10.0, help="Seconds allowed per measurement"
+    )
+    parser.add_argument(
+        "--superlinear",
+        type=float,
+        default=1.5,
+        help="Flag cases whose time grows faster than size to this power",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Skip memory tracing")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the corpus")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.set_defaults(handler=run)
+    return parser
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    return (
+        [item.strip() for item in value.split(",") if item.strip()] if value else None
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    """Execute the ``parserbench`` subcommand."""
+    kinds = _split(args.kinds)
+    for kind in kinds or []:
+        if kind not in GENERATORS:
+            raise SystemExit(
+                f"Unknown corpus kind: {kind}. Available kinds: {', '.join(GENERATORS)}"
+            )
+    report = ParserBenchmark(
+        sizes=[parse_size(size) for size in _split(args.sizes) or []],
+        kinds=kinds,
+        parsers=_split(args.parsers),
+        methods=_split(args.methods) or METHODS,
+        repeat=args.repeat,
+        budget=args.budget,
+        superlinear_exponent=args.superlinear,
+        measure_memory=not args.no_memory,
+        seed=args.seed,
+    ).run()
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.format())
+    return 1 if report.flagged else 0
@@ -2,7 +2,27 @@
 Core functionality for ChatAnvil.
 """
 
+from .batch import BatchJob, BatchRequest, BatchResult
 from .chat import Chat
+from .concurrency import AdaptiveLimiter
 from .config import Config
+from .embeddings import Embedder, EmbeddingCache
+from .scheduler import DeadlineExceeded, RequestScheduler
+from .semantic_cache import SemanticCache
+from .submit import BackgroundLoop, Submitter
 
-__all__ = ["Chat", "Config"] 
\ No newline at end of file
+__all__ = [
+    "Chat",
+    "Config",
+    "BatchJob",
+    "BatchRequest",
+    "BatchResult",
+    "Embedder",
+    "EmbeddingCache",
+    "SemanticCache",
+    "Submitter",
+    "BackgroundLoop",
+    "RequestScheduler",
+    "DeadlineExceeded",
+    "AdaptiveLimiter",
+]
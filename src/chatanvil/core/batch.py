@@ -0,0 +1,165 @@
+"""
+Provider batch-job support (OpenAI Batch API, Anthropic Message Batches).
+
+Batch jobs trade latency for cost and throughput: requests are uploaded in
+one go, processed asynchronously by the provider and collected later.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+
+@dataclass
+class BatchRequest:
+    """A single request in a batch job, mirroring ``get_chat_completion``.
+
+    Attributes:
+        custom_id: Caller-chosen id used to map results back to inputs
+        messages: List of message dictionaries with 'role' and 'content'
+        model: Optional model override
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens in response
+        kwargs: Provider-specific parameters
+    """
+
+    custom_id: str
+    messages: List[Dict[str, str]]
+    model: Optional[str] = None
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], index: int = 0) -> "BatchRequest":
+        """Build a request from a ``get_chat_completion``-style dictionary.
+
+        Unknown keys are kept as provider-specific parameters. Requests without
+        a ``custom_id`` are numbered by their position.
+        """
+        data = dict(data)
+        # Both keys are taken out so neither is sent as a provider parameter
+        custom_id, alias = data.pop("custom_id", None), data.pop("id", None)
+        if custom_id is None:
+            custom_id = alias if alias is not None else index
+        custom_id = str(custom_id)
+        if "message" in data and "messages" not in data:
+            data["messages"] = [{"role": "user", "content": data.pop("message")}]
+        if "messages" not in data:
+            raise ValueError(f"Batch request {custom_id} has no messages")
+        return cls(
+            custom_id=custom_id,
+            messages=data.pop("messages"),
+            model=data.pop("model", None),
+            temperature=data.pop("temperature", 0.7),
+            max_tokens=data.pop("max_tokens", None),
+            kwargs=data,
+        )
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch request, keyed by its ``custom_id``."""
+
+    custom_id: str
+    response: Optional[str] = None
+    error: Optional[str] = None
+    raw: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchJob:
+    """Provider-side state of a batch job.
+
+    ``status`` is normalised across providers to one of ``in_progress``,
+    ``completed``, ``failed``, ``expired`` or ``cancelled``.
+    """
+
+    id: str
+    provider: str
+    status: str
+    request_counts: Dict[str, int] = field(default_factory=dict)
+    custom_ids: List[str] = field(default_factory=list)
+    raw: Any = None
+
+    TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+    @property
+    def done(self) -> bool:
+        return self.status in self.TERMINAL_STATUSES
+
+
+def as_batch_requests(
+    requests: Iterable[Union[BatchRequest, Dict[str, Any]]],
+) -> List[BatchRequest]:
+    """Normalise dictionaries and BatchRequest objects, checking id uniqueness."""
+    normalized = [
+        r if isinstance(r, BatchRequest) else BatchRequest.from_dict(r, index)
+        for index, r in enumerate(requests)
+    ]
+    seen = set()
+    for request in normalized:
+        if request.custom_id in seen:
+            raise ValueError(f"Duplicate custom_id in batch: {request.custom_id}")
+        seen.add(request.custom_id)
+    return normalized
+
+
+def wait_for_batch(
+    get_batch: Callable[[str], BatchJob],
+    job: BatchJob,
+    poll_interval: float = 5.0,
+    max_poll_interval: float = 60.0,
+    timeout: Optional[float] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BatchJob:
+    """Poll a batch job with exponential backoff until it reaches a terminal state.
+
+    Args:
+        get_batch: Callable fetching the current job state by id
+        job: The job returned when the batch was created
+        poll_interval: Initial delay between polls in seconds
+        max_poll_interval: Maximum delay between polls in seconds
+        timeout: Give up after this many seconds; the job keeps running
+        sleep: Sleep function, replaceable in tests
+
+    Raises:
+        TimeoutError: If the job is not finished within ``timeout``
+    """
+    started = time.monotonic()
+    delay = poll_interval
+    while not job.done:
+        wait = delay
+        if timeout is not None:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Batch {job.id} still {job.status} after {timeout:.0f} seconds"
+                )
+            wait = min(delay, remaining)
+        sleep(wait)
+        delay = min(delay * 2, max_poll_interval)
+        custom_ids = job.custom_ids
+        job = get_batch(job.id)
+        job.custom_ids = job.custom_ids or custom_ids
+    return job
+
+
+def collect_results(
+    results: Iterable[BatchResult], job: BatchJob
+) -> Iterator[BatchResult]:
+    """Yield provider results, then an error result for every id never answered."""
+    pending = set(job.custom_ids)
+    for result in results:
+        pending.discard(result.custom_id)
+        yield result
+    for custom_id in job.custom_ids:
+        if custom_id in pending:
+            yield BatchResult(
+                custom_id=custom_id,
+                error=f"No result returned (batch {job.status})",
+            )
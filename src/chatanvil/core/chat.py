@@ -1,7 +1,37 @@
-from typing import Any, Dict, List, Optional, Type, Union
-from ..providers.base import ChatProvider
-from .config import Config
+import asyncio
+import contextvars
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, as_completed
+from contextlib import AsyncExitStack, ExitStack, contextmanager, nullcontext
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Type, Union
+
+from ..parsers.completion import Until, get_detector
 from ..parsers.factory import ParserFactory
+from ..parsers.parsed import ParsedResponse
+from ..parsers.structured import StructuredParser
+from ..providers.base import ChatProvider, ProviderResponse, TextStream
+from ..utils.retry import (
+    DeadlineExceeded,
+    deadline_scope,
+    is_timeout_error,
+    remaining_time,
+)
+from .batch import (
+    BatchJob,
+    BatchRequest,
+    BatchResult,
+    as_batch_requests,
+    collect_results,
+    wait_for_batch,
+)
+from .concurrency import AdaptiveLimiter, Permit
+from .config import Config
+from .embeddings import Embedder
+from .scheduler import INTERACTIVE, RequestScheduler
+from .semantic_cache import SemanticCache, cache_scope
+from .submit import Submitter
 
 
 class Chat:
@@ -13,13 +43,30 @@ class Chat:
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         parser_type: str = "default",
+        parser_options: Optional[Dict[str, Any]] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
         **kwargs: Any,
     ):
-        self.config = Config(service_provider=service_provider)
+        # Transport settings are kept in the config, which fills in the rest
+        transport = {
+            name: kwargs.pop(name)
+            for name in (
+                *Config.ENV_TRANSPORT,
+                "http_client",
+                "async_http_client",
+                "prewarm",
+            )
+            if name in kwargs
+        }
+        self.config = Config(
+            service_provider=service_provider, api_key=api_key, model=model, **transport
+        )
         self.provider_name = service_provider.lower()
 
         # Initialize the parser
-        self.parser = ParserFactory.get_parser(parser_type)
+        self.parser = ParserFactory.get_parser(parser_type, **(parser_options or {}))
 
         # Get provider configuration
         provider_config = self.config
@@ -32,14 +79,26 @@ class Chat:
 
         # Initialize the appropriate provider
         self.provider = self._get_provider_instance(provider_config, **kwargs)
+        self._embedder: Optional[Embedder] = None
+        self._submitter: Optional[Submitter] = None
+        if self.config.prewarm:
+            self.prewarm()
+
+        # Opt-in cache answering near-duplicate prompts in get_response
+        self.semantic_cache = semantic_cache
+        # Opt-in admission control, shared by every Chat on the same quota
+        self.scheduler = scheduler
+        # Opt-in concurrency limits that adapt to the provider's capacity
+        self.limiter = limiter
 
     def _get_provider_instance(self, config: Config, **kwargs: Any) -> ChatProvider:
         """Get the appropriate provider instance based on the service name."""
         # Import providers here to avoid circular imports
-        from ..providers.openai import OpenAIChat
         from ..providers.claude import ClaudeChat
         from ..providers.groq import GroqChat
         from ..providers.ollama import OllamaChat
+        from ..providers.openai import OpenAIChat
+        from ..providers.openai_compatible import OpenAICompatibleChat
         from ..providers.openrouter import OpenRouterChat
 
         providers: Dict[str, Type[ChatProvider]] = {
@@ -47,14 +106,182 @@ class Chat:
             "claude": ClaudeChat,
             "groq": GroqChat,
             "ollama": OllamaChat,
-            "openrouter": OpenRouterChat
+            "openrouter": OpenRouterChat,
+            "openai_compatible": OpenAICompatibleChat,
         }
 
         if self.provider_name not in providers:
             raise ValueError(f"Unsupported provider: {self.provider_name}")
 
         provider_class = providers[self.provider_name]
-        return provider_class(api_key=config.api_key, model=config.model, **kwargs)
+        if self.provider_name == "ollama":
+            # Options from the environment, unless given explicitly
+            for name, value in config.ollama_options.items():
+                kwargs.setdefault(name, value)
+        return provider_class(
+            api_key=config.api_key,
+            model=config.model,
+            http_client=config.http_client,
+            http_options=config.http_options,
+            async_http_client=config.async_http_client,
+            **kwargs,
+        )
+
+    def _slot_args(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Take the scheduling and deadline arguments out of a request's keyword arguments.
+
+        ``priority`` is "interactive" (the default) or "batch", ``tenant``
+        names the caller for fair sharing, and ``queue_timeout`` is how many
+        seconds the request may wait for the scheduler and limiter before it
+        is dropped.
+
+        ``timeout`` is how many seconds the whole request may take, and
+        ``deadline`` the ``time.monotonic()`` value by which it must finish;
+        without either, the configured ``total_timeout`` applies. Queueing,
+        retries, backoff sleeps and the SDK's own timeout, passed on as
+        ``timeout`` and never longer than the configured one, all fit within
+        it. Streams also take
+        ``ttft_timeout``, the most seconds to wait for the first chunk, and
+        ``cancel``, a threading.Event that stops the stream when set.
+        """
+        now = time.monotonic()
+        deadline = kwargs.pop("deadline", None)
+        timeout = kwargs.pop("timeout", None)
+        if timeout is None and deadline is None:
+            timeout = self.config.total_timeout
+        if timeout is not None:
+            deadline = (
+                now + timeout if deadline is None else min(deadline, now + timeout)
+            )
+        queue_deadline = deadline
+        queue_timeout = kwargs.pop("queue_timeout", None)
+        if queue_timeout is not None:
+            queue_deadline = min(now + queue_timeout, deadline or float("inf"))
+        ttft_timeout = kwargs.pop("ttft_timeout", None)
+        sdk_timeouts = [
+            budget
+            for budget in (None if deadline is None else deadline - now, ttft_timeout)
+            if budget is not None
+        ]
+        # Timeouts at the caller's budget are the caller's, not the provider's
+        caller_timeout = False
+        if sdk_timeouts:
+            budget = max(0.0, min(sdk_timeouts))
+            configured = self.config.http_options.get("timeout")
+            configured = getattr(configured, "read", configured)
+            caller_timeout = configured is None or budget < configured
+            kwargs["timeout"] = budget if caller_timeout else configured
+        return {
+            "priority": kwargs.pop("priority", INTERACTIVE),
+            "tenant": kwargs.pop("tenant", None),
+            "queue_deadline": queue_deadline,
+            "deadline": deadline,
+            "ttft_timeout": ttft_timeout,
+            "cancel": kwargs.pop("cancel", None),
+            "caller_timeout": caller_timeout,
+        }
+
+    def _limit(self, model: Optional[str], args: Dict[str, Any]) -> Any:
+        """Context manager holding the limiter slot for one provider call, if any."""
+        if self.limiter is None:
+            return nullcontext()
+        return self.limiter.slot(
+            self.provider_name, model or self.provider.model, args["queue_deadline"]
+        )
+
+    @contextmanager
+    def _hold(
+        self, model: Optional[str], args: Dict[str, Any], limit: bool = True
+    ) -> Iterator[Optional[Permit]]:
+        """Hold the scheduler and limiter slots for one provider call.
+
+        Calls inside run under the request's deadline. With ``limit=False``
+        the limiter slot is left to the caller.
+        """
+        with ExitStack() as stack:
+            if self.scheduler is not None:
+                stack.enter_context(
+                    self.scheduler.slot(
+                        args["priority"], args["tenant"], args["queue_deadline"]
+                    )
+                )
+            permit = stack.enter_context(self._limit(model, args)) if limit else None
+            stack.enter_context(deadline_scope(args["deadline"]))
+            # Fail fast if waiting for a slot used up the budget
+            remaining_time()
+            if args["cancel"] is not None and args["cancel"].is_set():
+                raise CancelledError("request cancelled")
+            yield permit
+
+    def _scheduled_stream(
+        self, slot: Any, stream: TextStream, args: Dict[str, Any]
+    ) -> TextStream:
+        """Hold a request's slots while a stream is read; closing it closes the stream.
+
+        The stream is closed, cancelling generation upstream, when the
+        request's deadline passes, when the first chunk takes longer than
+        ``ttft_timeout`` or when ``cancel`` is set. The slots and the deadline
+        are held in a context of the stream's own, so they do not leak into
+        the caller's code between chunks. Returns the provider's finish reason.
+        """
+        deadline, cancel = args["deadline"], args["cancel"]
+        finish_reason = None
+        context = contextvars.copy_context()
+        permit = context.run(slot.__enter__)
+        try:
+            first_chunk_by = (
+                None
+                if args["ttft_timeout"] is None
+                else time.monotonic() + args["ttft_timeout"]
+            )
+            try:
+                while True:
+                    try:
+                        chunk = context.run(next, stream)
+                    except StopIteration as stop:
+                        finish_reason = stop.value
+                        break
+                    now = time.monotonic()
+                    if first_chunk_by is not None and now > first_chunk_by:
+                        raise DeadlineExceeded("no response within ttft_timeout")
+                    first_chunk_by = None
+                    if deadline is not None and now > deadline:
+                        raise DeadlineExceeded(
+                            "request deadline exceeded while streaming"
+                        )
+                    if cancel is not None and cancel.is_set():
+                        raise CancelledError("stream cancelled")
+                    if permit is not None:
+                        # Time to first chunk is the stream's latency
+                        permit.first_token()
+                    yield chunk
+            except Exception as e:
+                # The SDK timeout is set from the same budgets
+                if is_timeout_error(e) and not isinstance(e, DeadlineExceeded):
+                    if args["caller_timeout"]:
+                        raise DeadlineExceeded(f"stream timed out: {e}") from e
+                raise
+            finally:
+                context.run(stream.close)
+        except BaseException:
+            if not context.run(slot.__exit__, *sys.exc_info()):
+                raise
+        else:
+            context.run(slot.__exit__, None, None, None)
+        return finish_reason
+
+    def _output_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the provider's constrained-output parameters for a structured parser.
+
+        Parameters passed explicitly by the caller take precedence.
+        """
+        if not isinstance(self.parser, StructuredParser):
+            return kwargs
+        params = self.provider.structured_output_params(
+            self.parser.json_schema, self.parser.name, strict=self.parser.strict
+        )
+        params.update(kwargs)
+        return params
 
     def get_response(
         self,
@@ -64,24 +291,100 @@ class Chat:
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         **kwargs: Any,
-    ) -> str:
-        """Get a response from the chat provider with parser."""
+    ) -> Union[str, Any]:
+        """Get a response from the chat provider with parser.
+
+        Returns the parsed text, or the decoded value when the parser was
+        created with ``return_objects``. With a semantic cache, a response to
+        a similar enough earlier prompt is returned without calling the
+        provider. ``timeout`` or ``deadline`` bounds the whole request,
+        retries included; see ``_slot_args``.
+        """
         # Format the message
         # formatted_message = self.parser.format_message(message)
 
         # Get the raw response
-        raw_response = self.provider.get_response(
-            message=message,
-            model=model,
-            system_prompt=system_prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            **kwargs,
+        raw_response = self._cached_response(
+            message, model, system_prompt, temperature, max_tokens, kwargs
         )
 
         # Use the parser to process the response
         return self.parser.parse_response(raw_response)
 
+    def get_parsed_response(
+        self,
+        message: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> ParsedResponse:
+        """Get a response parsed once, keeping the parsed document.
+
+        The result's ``text`` matches what ``get_response`` returns and its
+        ``code_blocks`` are extracted from the same parse.
+        """
+        raw_response = self._cached_response(
+            message, model, system_prompt, temperature, max_tokens, kwargs
+        )
+        return self.parser.parse(raw_response)
+
+    def _cached_response(
+        self,
+        message: str,
+        model: Optional[str],
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """Get the raw response, through the semantic cache when one is set.
+
+        Cached responses are shared only between requests with the same
+        provider, model, system prompt, sampling settings and options.
+        Truncated responses are not cached. The lookup, which embeds the
+        prompt, is scheduled and bounded by the deadline like the request.
+        """
+        args = self._slot_args(kwargs)
+        params = self._output_params(kwargs)
+        cache = self.semantic_cache
+        # The limiter learns from chat calls only, so it is held for the call
+        with self._hold(model, args, limit=False):
+            if cache is not None:
+                scope = cache_scope(
+                    self.provider_name,
+                    model or self.provider.model,
+                    system_prompt or self.provider.system_prompt,
+                    # The per-request timeout does not change the response
+                    {
+                        "temperature": temperature,
+                        "max_tokens": max_tokens,
+                        **{k: v for k, v in params.items() if k != "timeout"},
+                    },
+                )
+                vector = cache.embed(message)
+                cached = cache.search(vector, scope)
+                if cached is not None:
+                    return ProviderResponse(cached, "stop")
+
+            with self._limit(model, args):
+                raw_response = self.provider.get_response(
+                    message=message,
+                    model=model,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **params,
+                )
+        if (
+            cache is not None
+            and isinstance(raw_response, str)
+            and not getattr(raw_response, "truncated", False)
+        ):
+            cache.add(vector, scope, raw_response)
+        return raw_response
+
     def get_chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -91,34 +394,480 @@ class Chat:
         **kwargs: Any,
     ) -> Union[str, Dict[str, Any]]:
         """Get a chat completion from the provider with parser."""
-        raw_response = self.provider.get_chat_completion(
+        with self._hold(model, self._slot_args(kwargs)):
+            raw_response = self.provider.get_chat_completion(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **self._output_params(kwargs),
+            )
+
+        # If the response is a string, parse it
+        if isinstance(raw_response, str):
+            return self.parser.parse_response(raw_response)
+
+        # If the response is a dictionary, return it as is
+        return raw_response
+
+    def get_response_until(
+        self,
+        message: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        until: Optional[Until] = None,
+        **kwargs: Any,
+    ) -> Union[str, Any]:
+        """Stream a response and stop reading as soon as it is complete.
+
+        Completion is decided by ``until``: 'json' (first JSON value closed),
+        'code' (first fenced code block closed), 'xml' (root element closed),
+        a predicate called with the text so far, or a CompletionDetector. When
+        it is None the active parser decides, and parsers without a detector
+        read the whole response. Closing the stream cancels generation
+        upstream; text after the complete part is dropped. The result is
+        parsed like ``get_response``.
+        """
+        stream = self.stream_response(
+            message=message,
+            model=model,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+        return self.parser.parse_response(self._read_until(stream, until))
+
+    def get_chat_completion_until(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        until: Optional[Until] = None,
+        **kwargs: Any,
+    ) -> Union[str, Any]:
+        """Stream a chat completion and stop reading as soon as it is complete.
+
+        See ``get_response_until`` for the meaning of ``until``.
+        """
+        stream = self.stream_chat_completion(
             messages=messages,
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
             **kwargs,
         )
+        return self.parser.parse_response(self._read_until(stream, until))
 
-        # If the response is a string, parse it
+    def _read_until(
+        self, stream: TextStream, until: Optional[Until]
+    ) -> ProviderResponse:
+        """Read a stream until the response is complete, then close it.
+
+        A response read to the end keeps the provider's finish reason, so a
+        ``length`` cutoff is still reported as truncated.
+        """
+        detector = (
+            get_detector(until)
+            if until is not None
+            else self.parser.completion_detector()
+        )
+        chunks = []
+        try:
+            while True:
+                try:
+                    chunk = next(stream)
+                except StopIteration as stop:
+                    finish_reason = stop.value
+                    break
+                if detector is None:
+                    chunks.append(chunk)
+                    continue
+                end = detector.feed(chunk)
+                if end is not None:
+                    # The detector saw the response complete, so it was not
+                    # cut off, whatever the provider would have reported
+                    return ProviderResponse(detector.text[:end], "stop")
+        finally:
+            # Closing the provider's stream closes the HTTP response
+            stream.close()
+        return ProviderResponse(
+            detector.text if detector else "".join(chunks), finish_reason
+        )
+
+    def stream_response(
+        self,
+        message: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream the raw response text from the chat provider, chunk by chunk.
+
+        The parser is not applied, since it needs the complete response, but
+        a structured parser's schema still constrains the output. The stream
+        returns the provider's finish reason when it ends.
+        """
+        args = self._slot_args(kwargs)
+        return self._scheduled_stream(
+            self._hold(model, args),
+            self.provider.stream_response(
+                message=message,
+                model=model,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **self._output_params(kwargs),
+            ),
+            args,
+        )
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream the raw chat completion text from the provider, chunk by chunk.
+
+        See ``stream_response``.
+        """
+        args = self._slot_args(kwargs)
+        return self._scheduled_stream(
+            self._hold(model, args),
+            self.provider.stream_chat_completion(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **self._output_params(kwargs),
+            ),
+            args,
+        )
+
+    def submit_batch(
+        self, requests: Iterable[Union[BatchRequest, Dict[str, Any]]]
+    ) -> BatchJob:
+        """Submit requests to the provider's native batch API.
+
+        Each request is a BatchRequest or a ``get_chat_completion``-style dict
+        with ``messages`` (or ``message``) and an optional ``custom_id``.
+        """
+        return self.provider.create_batch(as_batch_requests(requests))
+
+    def collect_batch(
+        self,
+        job: Union[BatchJob, str],
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[BatchResult]:
+        """Wait for a batch job and stream its results with the parser applied.
+
+        Polling backs off exponentially from ``poll_interval`` up to
+        ``max_poll_interval``. Failed requests come back as results with
+        ``error`` set; when the job object from ``submit_batch`` is passed,
+        requests the provider never answered are reported the same way.
+        """
+        if isinstance(job, str):
+            job = self.provider.get_batch(job)
+        job = wait_for_batch(
+            self.provider.get_batch,
+            job,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            timeout=timeout,
+        )
+        for result in collect_results(self.provider.iter_batch_results(job), job):
+            if result.response is not None:
+                result.response = self.parser.parse_response(result.response)
+            yield result
+
+    def run_batch(
+        self,
+        requests: Iterable[Union[BatchRequest, Dict[str, Any]]],
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[BatchResult]:
+        """Submit a batch job, wait for it and stream back one result per request."""
+        job = self.submit_batch(requests)
+        return self.collect_batch(
+            job,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            timeout=timeout,
+        )
+
+    @property
+    def semantic_cache(self) -> Optional[SemanticCache]:
+        """Cache answering near-duplicate prompts in ``get_response``, if any."""
+        return self._semantic_cache
+
+    @semantic_cache.setter
+    def semantic_cache(self, cache: Optional[SemanticCache]) -> None:
+        # A cache without an embedder uses the Chat's, which needs a provider
+        # with an embeddings API and a model; fail here, not on every request
+        if cache is not None and cache.embedder is None:
+            if type(self.provider).embed_batch is ChatProvider.embed_batch or not (
+                self.embedder.model or self.provider.EMBEDDING_MODEL
+            ):
+                raise ValueError(
+                    f"{self.provider_name} has no embedding model; pass "
+                    "SemanticCache(embedder=...) to use a semantic cache"
+                )
+            cache.embedder = self.embedder
+        self._semantic_cache = cache
+
+    @property
+    def embedder(self) -> Embedder:
+        """Embedder used by ``embed``, created with default settings on first use.
+
+        Assign an ``Embedder`` to change batching, concurrency or caching.
+        """
+        if self._embedder is None:
+            self._embedder = Embedder(self.provider)
+        return self._embedder
+
+    @embedder.setter
+    def embedder(self, embedder: Embedder) -> None:
+        self._embedder = embedder
+
+    def embed(
+        self,
+        texts: Union[str, Sequence[str]],
+        model: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Embed texts with the provider's embeddings API.
+
+        Texts are batched up to the provider's request limits, sent
+        concurrently and cached by a hash of the text, so repeated texts are
+        embedded once.
+
+        Returns:
+            A float32 NumPy array of shape (len(texts), dimensions), or of
+            shape (dimensions,) when a single text is given
+        """
+        return self.embedder.embed(texts, model=model, **kwargs)
+
+    @property
+    def submitter(self) -> Submitter:
+        """Submitter used by ``submit``, created with default settings on first use.
+
+        Assign a ``Submitter`` to change concurrency or queue depth.
+        """
+        if self._submitter is None:
+            self._submitter = Submitter()
+        return self._submitter
+
+    @submitter.setter
+    def submitter(self, submitter: Submitter) -> None:
+        self._submitter = submitter
+
+    def submit(
+        self,
+        message: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> "Future[Any]":
+        """Send a message without waiting for the response.
+
+        The request runs on a shared background event loop with the
+        provider's async client, so many can be in flight from synchronous
+        code without a thread each. Bypasses the semantic cache.
+
+        Returns:
+            Future resolving to what ``get_response`` would return;
+            cancelling it cancels the request
+
+        Raises:
+            queue.Full: If the submitter's max_pending requests are unfinished
+        """
+        messages = []
+        if system_prompt or self.provider.system_prompt:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": system_prompt or self.provider.system_prompt,
+                }
+            )
+        messages.append({"role": "user", "content": message})
+        return self.submit_chat_completion(
+            messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+
+    def submit_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> "Future[Any]":
+        """Send a chat completion without waiting for it; see ``submit``."""
+        slot_args = self._slot_args(kwargs)
+        return self.submitter.submit(
+            self._aget_chat_completion,
+            messages,
+            model,
+            temperature,
+            max_tokens,
+            self._output_params(kwargs),
+            slot_args,
+        )
+
+    async def _aget_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        kwargs: Dict[str, Any],
+        slot_args: Dict[str, Any],
+    ) -> Any:
+        queue_deadline = slot_args["queue_deadline"]
+        async with AsyncExitStack() as stack:
+            if self.scheduler is not None:
+                await stack.enter_async_context(
+                    self.scheduler.aslot(
+                        slot_args["priority"], slot_args["tenant"], queue_deadline
+                    )
+                )
+            if self.limiter is not None:
+                await stack.enter_async_context(
+                    self.limiter.aslot(
+                        self.provider_name, model or self.provider.model, queue_deadline
+                    )
+                )
+            stack.enter_context(deadline_scope(slot_args["deadline"]))
+            remaining = remaining_time()
+            call = self.provider.aget_chat_completion(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs,
+            )
+            if remaining is None:
+                raw_response = await call
+            else:
+                try:
+                    # Cancels the call, closing its connection, when time is up
+                    raw_response = await asyncio.wait_for(call, remaining)
+                except asyncio.TimeoutError as e:
+                    if isinstance(e, DeadlineExceeded):
+                        raise
+                    raise DeadlineExceeded("request deadline exceeded") from e
         if isinstance(raw_response, str):
             return self.parser.parse_response(raw_response)
-
-        # If the response is a dictionary, return it as is
         return raw_response
 
+    def map(
+        self,
+        prompts: Iterable[Union[str, List[Dict[str, str]]]],
+        ordered: bool = True,
+        **kwargs: Any,
+    ) -> Iterator[Any]:
+        """Send many requests concurrently and yield their responses.
+
+        Each prompt is a message, sent as with ``submit``, or a list of
+        messages, sent as with ``submit_chat_completion``. Submission waits
+        whenever the submitter's queue is full. Requests still running when
+        the iterator is closed early, or when one fails, are cancelled.
+
+        Args:
+            prompts: Messages or message lists
+            ordered: Yield responses in prompt order; otherwise as they finish
+            **kwargs: Arguments for every request
+
+        Returns:
+            Iterator over the responses
+        """
+        futures = [
+            (
+                self.submit(prompt, **kwargs)
+                if isinstance(prompt, str)
+                else self.submit_chat_completion(prompt, **kwargs)
+            )
+            for prompt in prompts
+        ]
+        try:
+            for future in futures if ordered else as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def warmup(self, model: Optional[str] = None) -> None:
+        """Load the model ahead of the first request (Ollama); a no-op for hosted providers."""
+        self.provider.warmup(model)
+
+    def prewarm(self, connections: int = 1) -> "Future[None]":
+        """Open pooled connections to the provider in the background.
+
+        DNS, TCP and TLS setup then happen before the first real request,
+        which reuses a connection from the pool. Does not block; failures
+        are reported through the returned future only.
+
+        Args:
+            connections: Connections to open, by sending that many
+                lightweight requests concurrently
+
+        Returns:
+            Future resolved once the connections are open
+        """
+        future: "Future[None]" = Future()
+
+        def run() -> None:
+            try:
+                with ThreadPoolExecutor(connections) as executor:
+                    for task in [
+                        executor.submit(self.provider.prewarm)
+                        for _ in range(connections)
+                    ]:
+                        task.result()
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+
+        threading.Thread(target=run, name="chatanvil-prewarm", daemon=True).start()
+        return future
+
     def set_system_prompt(self, prompt: str) -> None:
         """Set the system prompt for future conversations."""
         self.provider.set_system_prompt(prompt)
 
-    def extract_code(self, response: str) -> List[Dict[str, str]]:
-        """Extract code blocks from the response."""
+    def extract_code(self, response: Any) -> List[Dict[str, str]]:
+        """Extract code blocks from the response.
+
+        Responses returned by ``get_response`` or ``get_parsed_response`` are
+        not parsed again; their code blocks come from the first parse.
+        """
         if self.parser.type == "default":
             raise ValueError("Default parser does not support code extraction.")
+        if isinstance(response, ParsedResponse):
+            return [dict(block) for block in response.code_blocks]
         return self.parser.extract_code(response)
 
-    def set_parser(self, parser_type: str) -> None:
+    def set_parser(self, parser_type: str, **options: Any) -> None:
         """Change the current parser."""
-        self.parser = ParserFactory.get_parser(parser_type)
+        self.parser = ParserFactory.get_parser(parser_type, **options)
 
     def get_current_parser(self) -> str:
         """Get the type of the current parser."""
@@ -0,0 +1,371 @@
+"""
+Adaptive concurrency control for provider requests.
+
+An AdaptiveLimiter keeps one concurrency limit per provider and model and
+adjusts it with additive increase, multiplicative decrease (AIMD): while
+requests succeed at normal latency the limit grows by about one per round
+of requests, and a rate limit, timeout or latency inflation cuts it by a
+factor. Throughput then follows what the provider can actually serve.
+"""
+
+import asyncio
+import collections
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from ..utils.retry import DeadlineExceeded, is_overload_error, retry_observer
+
+
+@dataclass(eq=False)
+class Permit:
+    """Permission for one request to run under an AIMDLimit."""
+
+    owner: "AIMDLimit" = field(repr=False)
+    # Cuts made before the request started; feedback from requests that were
+    # already running during a cut does not cut again
+    epoch: int
+    # Whether at least half the limit was in use when the request started;
+    # only then does success show the limit could be higher
+    saturated: bool
+    started: float
+    latency: Optional[float] = None
+    overloaded: bool = False
+
+    def first_token(self) -> None:
+        """Record the time to the first streamed chunk as the request's latency."""
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+
+    def report(self, error: BaseException) -> None:
+        """Feed back an error the request hit, e.g. one that was retried."""
+        if not self.overloaded and is_overload_error(error):
+            self.overloaded = True
+            self.owner._decrease(self)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    wake: Callable[[], None] = field(repr=False)
+    permit: Optional[Permit] = None
+    abandoned: bool = False
+
+
+class AIMDLimit:
+    """Concurrency limit for one provider and model, adjusted by AIMD."""
+
+    # Smoothing of the recent and of the long-run request latency
+    RECENT_WEIGHT = 0.2
+    BASELINE_WEIGHT = 0.02
+    # Latency samples needed before inflation is judged
+    WARMUP_SAMPLES = 10
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.samples = 0
+        self.decreases = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = collections.deque()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current limit, load and latency estimates."""
+        with self._lock:
+            return {
+                "limit": int(self.limit),
+                "inflight": self.inflight,
+                "waiting": len(self._waiters),
+                "latency": self.latency,
+                "baseline_latency": self.baseline,
+                "decreases": self.decreases,
+            }
+
+    # -- admission -----------------------------------------------------------
+
+    def _grant(self) -> Permit:
+        """Start a request. Caller holds the lock and has checked capacity."""
+        self.inflight += 1
+        return Permit(
+            self,
+            self.decreases,
+            self.inflight * 2 >= self.limit,
+            time.monotonic(),
+        )
+
+    def _wake_waiters(self) -> None:
+        """Admit waiting requests up to the limit. Caller holds the lock."""
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.abandoned:
+                continue
+            waiter.permit = self._grant()
+            waiter.wake()
+
+    def _enqueue(self, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(wake)
+        with self._lock:
+            if not self._waiters and self.inflight < int(self.limit):
+                waiter.permit = self._grant()
+            else:
+                self._waiters.append(waiter)
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            waiter.abandoned = True
+            if waiter.permit is None:
+                return
+        self.release(waiter.permit, learn=False)
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("request expired waiting for a concurrency slot")
+        return remaining
+
+    def acquire(self, deadline: Optional[float] = None) -> Permit:
+        """Wait until the request may run.
+
+        Args:
+            deadline: ``time.monotonic()`` value after which waiting stops
+
+        Raises:
+            DeadlineExceeded: If the deadline passed while waiting
+        """
+        event = threading.Event()
+        waiter = self._enqueue(event.set)
+        try:
+            while waiter.permit is None:
+                event.wait(self._remaining(deadline))
+            return waiter.permit
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def aacquire(self, deadline: Optional[float] = None) -> Permit:
+        """Async counterpart of acquire."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = self._enqueue(lambda: loop.call_soon_threadsafe(event.set))
+        try:
+            while waiter.permit is None:
+                try:
+                    await asyncio.wait_for(event.wait(), self._remaining(deadline))
+                except asyncio.TimeoutError:
+                    pass
+            return waiter.permit
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(
+        self,
+        permit: Permit,
+        error: Optional[BaseException] = None,
+        learn: bool = True,
+    ) -> None:
+        """End a request and adjust the limit from how it went.
+
+        Args:
+            permit: The request's permit
+            error: Exception the request failed with, if any
+            learn: False if the request ended too early to say anything
+                about the provider, e.g. when it was cancelled
+        """
+        if error is not None:
+            permit.report(error)
+        elif permit.latency is None:
+            permit.first_token()
+        with self._lock:
+            self.inflight -= 1
+            if learn and error is None and not permit.overloaded:
+                self._observe(permit)
+            self._wake_waiters()
+
+    # -- feedback ------------------------------------------------------------
+
+    def _observe(self, permit: Permit) -> None:
+        """Learn from a successful request. Caller holds the lock."""
+        latency = permit.latency or 0.0
+        if self.latency is None or self.baseline is None:
+            self.latency = self.baseline = latency
+        else:
+            self.latency += self.RECENT_WEIGHT * (latency - self.latency)
+            self.baseline += self.BASELINE_WEIGHT * (latency - self.baseline)
+        self.samples += 1
+        inflated = (
+            self.samples >= self.WARMUP_SAMPLES
+            and self.latency > self.latency_tolerance * self.baseline
+        )
+        if inflated:
+            self._cut(permit)
+        elif permit.saturated:
+            # About +1 per limit's worth of requests, i.e. per round trip
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _decrease(self, permit: Permit) -> None:
+        with self._lock:
+            self._cut(permit)
+
+    def _cut(self, permit: Permit) -> None:
+        """Cut the limit once per overload episode. Caller holds the lock."""
+        if permit.epoch != self.decreases:
+            return
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self.decreases += 1
+        # Requests still running were sent at the old limit; start the next
+        # episode's latency estimate from the baseline
+        self.latency = self.baseline
+
+
+def _settle(limit: AIMDLimit, permit: Permit, error: Optional[BaseException]) -> None:
+    """Release a permit, feeding back how its call ended."""
+    if error is None or isinstance(error, Exception):
+        limit.release(permit, error)
+    else:
+        # Cancelled or closed early: only a streamed first chunk says
+        # anything about the provider
+        limit.release(permit, learn=permit.latency is not None)
+
+
+def _observe(report: Callable[[BaseException], None]) -> Any:
+    """Route retried errors to ``report`` as well as to any enclosing observer."""
+    outer = retry_observer.get()
+    if outer is None:
+        return retry_observer.set(report)
+
+    def observer(error: BaseException) -> None:
+        report(error)
+        outer(error)
+
+    return retry_observer.set(observer)
+
+
+def _reset_observer(token: Any) -> None:
+    try:
+        retry_observer.reset(token)
+    except ValueError:
+        # A stream finished in another thread than the one it started in
+        pass
+
+
+class AdaptiveLimiter:
+    """Adaptive concurrency limits per provider and model.
+
+    Pass one to ``Chat(limiter=...)``, or share it between Chat instances
+    calling the same provider. Each provider and model gets its own
+    AIMDLimit, created on first use with the settings given here.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            initial_limit: Concurrency allowed before any feedback
+            min_limit: Lowest the limit is cut to
+            max_limit: Highest the limit grows to
+            backoff: Factor the limit is multiplied by on overload
+            latency_tolerance: Cut when recent latency exceeds the long-run
+                latency by this factor
+        """
+        self.settings = {
+            "initial_limit": initial_limit,
+            "min_limit": min_limit,
+            "max_limit": max_limit,
+            "backoff": backoff,
+            "latency_tolerance": latency_tolerance,
+        }
+        self._limits: Dict[Tuple[str, Optional[str]], AIMDLimit] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: Optional[str] = None) -> AIMDLimit:
+        """Return the limit for a provider and model, creating it if needed."""
+        key = (provider, model)
+        with self._lock:
+            if key not in self._limits:
+                self._limits[key] = AIMDLimit(**self.settings)
+            return self._limits[key]
+
+    def limit(self, provider: str, model: Optional[str] = None) -> int:
+        """Current concurrency limit for a provider and model."""
+        return int(self.get(provider, model).limit)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return every limit's state, keyed by "provider/model"."""
+        with self._lock:
+            limits = dict(self._limits)
+        return {
+            f"{provider}/{model}": limit.snapshot()
+            for (provider, model), limit in limits.items()
+        }
+
+    @contextmanager
+    def slot(
+        self,
+        provider: str,
+        model: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[Permit]:
+        """Hold a slot for the duration of a provider call.
+
+        Errors the call raises, and errors its retries hide, are fed back
+        into the limit.
+        """
+        limit = self.get(provider, model)
+        permit = limit.acquire(deadline)
+        token = _observe(permit.report)
+        error: Optional[BaseException] = None
+        try:
+            yield permit
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _reset_observer(token)
+            _settle(limit, permit, error)
+
+    @asynccontextmanager
+    async def aslot(
+        self,
+        provider: str,
+        model: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[Permit]:
+        """Async counterpart of slot."""
+        limit = self.get(provider, model)
+        permit = await limit.aacquire(deadline)
+        token = _observe(permit.report)
+        error: Optional[BaseException] = None
+        try:
+            yield permit
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _reset_observer(token)
+            _settle(limit, permit, error)
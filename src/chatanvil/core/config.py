@@ -1,11 +1,14 @@
 import os
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
 from dotenv import load_dotenv
+
+from ..utils.http import http_options
 from ..utils.project import find_project_root
 
 # Try to load .env from current working directory first
-cwd_env = os.path.join(os.getcwd(), '.env')
+cwd_env = os.path.join(os.getcwd(), ".env")
 if os.path.exists(cwd_env):
     load_dotenv(cwd_env, override=True)
 else:
@@ -15,6 +18,27 @@ else:
         load_dotenv(pkg_env, override=True)
 
 
+def parse_keep_alive(value: Union[str, float]) -> Union[str, float]:
+    """Normalise an Ollama keep_alive value.
+
+    Durations such as "10m" are kept as strings; bare numbers (seconds, with
+    negative meaning forever) become numbers, since Ollama rejects durations
+    without a unit.
+    """
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value.strip()
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def parse_flag(value: str) -> bool:
+    """Interpret an environment variable as a boolean flag."""
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass
 class Config:
     """Configuration class for chat providers and logging."""
@@ -25,12 +49,56 @@ class Config:
     model: Optional[str] = None
     log_dir: Optional[str] = None
     debug: bool = False
+    require_api_key: bool = True
+
+    # Ollama model residency and runtime options
+    keep_alive: Optional[Union[str, float]] = None
+    num_ctx: Optional[int] = None
+    num_thread: Optional[int] = None
+    num_gpu: Optional[int] = None
+    hosts: Optional[List[str]] = None
+
+    # HTTP transport; timeouts are in seconds
+    timeout: Optional[float] = None
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    # Wall-clock bound on a whole request, applied by Chat as its deadline
+    total_timeout: Optional[float] = None
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    http2: Optional[bool] = None
+    proxy: Optional[str] = None
+    # Shared httpx.Client used instead of building one from the settings above
+    http_client: Any = field(default=None, repr=False)
+    # Shared httpx.AsyncClient for requests sent with Chat.submit
+    async_http_client: Any = field(default=None, repr=False)
+    # Open connections to the provider in the background when Chat is created
+    prewarm: Optional[bool] = None
 
     # Default configuration values
-    DEFAULT_MAX_TOKENS = {"openai": 4000, "claude": 4000, "groq": 4000, "ollama": 2048, "openrouter": 4000}
+    DEFAULT_MAX_TOKENS = {
+        "openai": 4000,
+        "claude": 4000,
+        "groq": 4000,
+        "ollama": 2048,
+        "openrouter": 4000,
+        "openai_compatible": 4000,
+    }
 
     DEFAULT_TEMPERATURE = 0.3
 
+    # Seconds allowed per request phase; long enough for a slow generation,
+    # short enough that a hung upstream call does not hold a worker for long
+    DEFAULT_TIMEOUT = {
+        "openai": 120.0,
+        "claude": 120.0,
+        "groq": 60.0,
+        "ollama": 600.0,
+        "openrouter": 120.0,
+        "openai_compatible": 300.0,
+    }
+    DEFAULT_CONNECT_TIMEOUT = 5.0
+
     # Provider-specific default models
     PROVIDER_DEFAULT_MODELS = {
         "openai": "gpt-4o-mini",  # Updated to match .env default
@@ -38,6 +106,7 @@ class Config:
         "groq": "mixtral-8x7b-32768",
         "ollama": "llama3.1",  # Updated to match .env default
         "openrouter": "deepseek/deepseek-r1:free",
+        "openai_compatible": None,  # The first model the server lists
     }
 
     # Environment variable mappings
@@ -46,14 +115,19 @@ class Config:
         "claude": "ANTHROPIC_API_KEY",
         "groq": "GROQ_API_KEY",
         "openrouter": "OPENROUTER_API_KEY",
+        "openai_compatible": "OPENAI_COMPATIBLE_API_KEY",
     }
 
+    # Providers that work without an API key, e.g. local servers
+    KEYLESS_PROVIDERS = ("ollama", "openai_compatible")
+
     ENV_DEFAULT_MODELS = {
         "openai": "OPENAI_DEFAULT_MODEL",
         "claude": "ANTHROPIC_DEFAULT_MODEL",
         "groq": "GROQ_DEFAULT_MODEL",
         "ollama": "OLLAMA_DEFAULT_MODEL",
         "openrouter": "OPENROUTER_DEFAULT_MODEL",
+        "openai_compatible": "OPENAI_COMPATIBLE_DEFAULT_MODEL",
     }
 
     ENV_MAX_TOKENS = {
@@ -62,6 +136,28 @@ class Config:
         "groq": "GROQ_MAX_TOKENS",
         "ollama": "OLLAMA_MAX_TOKENS",
         "openrouter": "OPENROUTER_MAX_TOKENS",
+        "openai_compatible": "OPENAI_COMPATIBLE_MAX_TOKENS",
+    }
+
+    # Environment variables for the Ollama options
+    ENV_OLLAMA_OPTIONS = {
+        "keep_alive": "OLLAMA_KEEP_ALIVE",
+        "num_ctx": "OLLAMA_NUM_CTX",
+        "num_thread": "OLLAMA_NUM_THREAD",
+        "num_gpu": "OLLAMA_NUM_GPU",
+        "hosts": "OLLAMA_HOSTS",
+    }
+
+    # Environment variables for the HTTP transport settings
+    ENV_TRANSPORT = {
+        "timeout": "HTTP_TIMEOUT",
+        "connect_timeout": "HTTP_CONNECT_TIMEOUT",
+        "read_timeout": "HTTP_READ_TIMEOUT",
+        "total_timeout": "HTTP_TOTAL_TIMEOUT",
+        "max_connections": "HTTP_MAX_CONNECTIONS",
+        "max_keepalive_connections": "HTTP_MAX_KEEPALIVE_CONNECTIONS",
+        "http2": "HTTP2",
+        "proxy": "HTTP_PROXY_URL",
     }
 
     def __post_init__(self):
@@ -74,7 +170,11 @@ class Config:
             env_key = self.ENV_API_KEYS[self.service_provider]
             self.api_key = os.getenv(env_key)
             # print(f"API key from environment variable: {env_key} - {self.api_key}")
-            if self.api_key is None and self.service_provider != "ollama":
+            if (
+                self.api_key is None
+                and self.require_api_key
+                and self.service_provider not in self.KEYLESS_PROVIDERS
+            ):
                 raise ValueError(
                     f"API key not found in environment variable: {env_key}"
                 )
@@ -115,6 +215,71 @@ class Config:
         else:
             self.max_tokens = self.DEFAULT_MAX_TOKENS[self.service_provider]
 
+        # Set Ollama options from environment if not provided
+        if self.service_provider == "ollama":
+            for name, env_name in self.ENV_OLLAMA_OPTIONS.items():
+                value = os.getenv(env_name)
+                if getattr(self, name) is not None or not value:
+                    continue
+                if name == "keep_alive":
+                    setattr(self, name, parse_keep_alive(value))
+                elif name == "hosts":
+                    # Comma-separated base URLs to balance requests across
+                    hosts = [host.strip() for host in value.split(",")]
+                    setattr(self, name, [host for host in hosts if host])
+                else:
+                    setattr(self, name, int(value))
+
+        # Set transport settings from environment if not provided
+        for name, env_name in self.ENV_TRANSPORT.items():
+            value = os.getenv(env_name)
+            if getattr(self, name) is not None or not value:
+                continue
+            if name == "http2":
+                setattr(self, name, parse_flag(value))
+            elif name == "proxy":
+                setattr(self, name, value)
+            elif name.startswith("max_"):
+                setattr(self, name, int(value))
+            else:
+                setattr(self, name, float(value))
+        if self.prewarm is None:
+            self.prewarm = parse_flag(os.getenv("HTTP_PREWARM", ""))
+
+    @property
+    def ollama_options(self) -> Dict[str, Any]:
+        """Ollama residency and runtime options that are set."""
+        return {
+            name: getattr(self, name)
+            for name in self.ENV_OLLAMA_OPTIONS
+            if getattr(self, name) is not None
+        }
+
+    @property
+    def http_options(self) -> Dict[str, Any]:
+        """``httpx.Client`` keyword arguments for the transport settings.
+
+        Timeouts not set fall back to the provider's defaults, except for a
+        shared client, which keeps its own unless timeouts are set. httpx has
+        no wall-clock timeout, so ``total_timeout`` is left to Chat.
+        """
+        settings = {
+            name: getattr(self, name)
+            for name in self.ENV_TRANSPORT
+            if name != "total_timeout"
+        }
+        timeouts_set = any(
+            settings[name] is not None
+            for name in ("timeout", "connect_timeout", "read_timeout")
+        )
+        shared = self.http_client is not None or self.async_http_client is not None
+        if timeouts_set or not shared:
+            if settings["timeout"] is None:
+                settings["timeout"] = self.DEFAULT_TIMEOUT[self.service_provider]
+            if settings["connect_timeout"] is None:
+                settings["connect_timeout"] = self.DEFAULT_CONNECT_TIMEOUT
+        return http_options(**settings)
+
     @property
     def provider_config(self) -> Dict[str, Any]:
         """Return provider-specific configuration."""
@@ -129,5 +294,6 @@ class Config:
 
         if self.service_provider == "ollama":
             config["host"] = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+            config.update(self.ollama_options)
 
         return config
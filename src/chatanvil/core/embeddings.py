@@ -0,0 +1,214 @@
+"""
+Batched, cached text embeddings returned as NumPy arrays.
+
+Texts are deduplicated, looked up in a cache keyed by a hash of the model and
+text, split into batches within the provider's request limits and sent
+concurrently. Vectors are collected into one contiguous float32 array instead
+of lists of Python floats.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+if TYPE_CHECKING:
+    from ..providers.base import ChatProvider
+
+# Characters per request; keeps batches well under the providers' token limits
+DEFAULT_MAX_BATCH_CHARS = 400_000
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "Embeddings require NumPy. Install it with: pip install chatanvil[embeddings]"
+        )
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of embedding vectors keyed by a hash of the text.
+
+    Keys are digests, so the texts themselves are not kept in memory.
+    """
+
+    def __init__(self, maxsize: int = 50_000):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, text: str, options: Optional[Dict[str, Any]] = None) -> bytes:
+        """Hash a text together with the model and options that embedded it."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(model.encode("utf-8"))
+        if options:
+            digest.update(
+                json.dumps(options, sort_keys=True, default=str).encode("utf-8")
+            )
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        with self._lock:
+            vector = self._items.get(key)
+            if vector is not None:
+                self._items.move_to_end(key)
+            return vector
+
+    def put(self, key: bytes, vector: Any) -> None:
+        with self._lock:
+            self._items[key] = vector
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class Embedder:
+    """Embed texts through a provider's embeddings API.
+
+    Args:
+        provider: Provider implementing ``embed_batch``
+        model: Embedding model (default: the provider's EMBEDDING_MODEL)
+        batch_size: Most texts per request (default: the provider's limit)
+        max_batch_chars: Most characters per request; a longer text is sent alone
+        concurrency: Requests in flight at once
+        cache: True for a new cache, an EmbeddingCache to share one, or False
+    """
+
+    def __init__(
+        self,
+        provider: "ChatProvider",
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_chars: int = DEFAULT_MAX_BATCH_CHARS,
+        concurrency: int = 4,
+        cache: Union[bool, EmbeddingCache] = True,
+    ):
+        _require_numpy()
+        self.provider = provider
+        self.model = model
+        self.batch_size = max(1, batch_size or provider.EMBEDDING_BATCH_SIZE)
+        self.max_batch_chars = max_batch_chars
+        self.concurrency = max(1, concurrency)
+        if cache is True:
+            cache = EmbeddingCache()
+        self.cache = cache if isinstance(cache, EmbeddingCache) else None
+
+    def embed(
+        self,
+        texts: Union[str, Sequence[str]],
+        model: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "np.ndarray":
+        """Embed texts.
+
+        Args:
+            texts: One text or a sequence of texts
+            model: Optional embedding model override
+            **kwargs: Provider-specific parameters, e.g. ``dimensions``
+
+        Returns:
+            A C-contiguous float32 array of shape (len(texts), dimensions), or
+            of shape (dimensions,) for a single text
+        """
+        if isinstance(texts, str):
+            return self.embed([texts], model=model, **kwargs)[0]
+        texts = list(texts)
+        model = model or self.model or self.provider.EMBEDDING_MODEL
+        if not model:
+            raise ValueError(
+                f"{self.provider.__class__.__name__} has no default embedding model; "
+                "pass model="
+            )
+        keys = [EmbeddingCache.key(model, text, kwargs) for text in texts]
+
+        cached: Dict[bytes, Any] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in cached or key in missing:
+                continue
+            vector = self.cache.get(key) if self.cache is not None else None
+            if vector is not None:
+                cached[key] = vector
+            else:
+                missing[key] = text
+
+        fetched = self._fetch(list(missing.values()), model, kwargs)
+        rows = dict(cached)
+        for key, vector in zip(missing, fetched):
+            rows[key] = vector
+            if self.cache is not None:
+                # A copy, so the cache does not keep the whole batch alive
+                self.cache.put(key, vector.copy())
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        dimensions = len(next(iter(rows.values())))
+        result = np.empty((len(texts), dimensions), dtype=np.float32)
+        for index, key in enumerate(keys):
+            result[index] = rows[key]
+        return result
+
+    def _fetch(
+        self, texts: List[str], model: str, options: Dict[str, Any]
+    ) -> "np.ndarray":
+        """Embed texts in concurrent batches, returning one row per text."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        batches = list(self._batches(texts))
+
+        def embed_batch(batch: List[str]) -> "np.ndarray":
+            vectors = self.provider.embed_batch(batch, model=model, **dict(options))
+            if len(vectors) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} embeddings, got {len(vectors)}"
+                )
+            return _to_array(vectors)
+
+        if len(batches) == 1 or self.concurrency == 1:
+            arrays = [embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.concurrency, len(batches))
+            ) as executor:
+                arrays = list(executor.map(embed_batch, batches))
+        return np.concatenate(arrays)
+
+    def _batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Split texts into batches within the count and character limits."""
+        batch: List[str] = []
+        chars = 0
+        for text in texts:
+            if batch and (
+                len(batch) >= self.batch_size
+                or chars + len(text) > self.max_batch_chars
+            ):
+                yield batch
+                batch, chars = [], 0
+            batch.append(text)
+            chars += len(text)
+        if batch:
+            yield batch
+
+
+def _to_array(vectors: Sequence[Union[Sequence[float], bytes]]) -> "np.ndarray":
+    """Stack one batch of provider vectors into a float32 matrix."""
+    if vectors and isinstance(vectors[0], (bytes, bytearray)):
+        return np.frombuffer(b"".join(vectors), dtype="<f4").reshape(len(vectors), -1)
+    return np.asarray(vectors, dtype=np.float32)
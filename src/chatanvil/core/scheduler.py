@@ -0,0 +1,334 @@
+"""
+Priority scheduling of provider requests.
+
+A RequestScheduler sits in front of the provider call path and decides
+which waiting request may call the provider next. Interactive requests go
+before batch requests, callers within a priority class share capacity by
+weight, and part of the concurrency and rate budget is held back for
+interactive traffic so a bulk job cannot starve it.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..utils.retry import DeadlineExceeded
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Priority classes, highest first
+PRIORITIES = (INTERACTIVE, BATCH)
+
+
+@dataclass(eq=False)
+class _Ticket:
+    """A request waiting for, or holding, a scheduler slot."""
+
+    priority: str
+    tenant: Any
+    deadline: Optional[float]
+    wake: Callable[[], None] = field(repr=False)
+    # "queued", "granted", "released", "expired" or "abandoned"
+    state: str = "queued"
+
+
+class RequestScheduler:
+    """Admits provider requests by priority, tenant weight and deadline.
+
+    Share one scheduler between every ``Chat`` that draws on the same
+    provider quota. Requests are admitted while fewer than
+    ``max_concurrency`` are running and, with ``requests_per_second``, while
+    the rate budget allows. Interactive requests are always admitted before
+    batch requests; batch requests may not use the ``reserved_share`` of
+    either budget, which stays free for interactive bursts.
+
+    Within a priority class, tenants (callers, users, jobs) are served by
+    weighted fair queuing: a tenant with weight 2 gets twice the admissions
+    of a tenant with weight 1 while both have requests waiting, however many
+    each has queued. Requests whose deadline passes while they wait are
+    dropped with DeadlineExceeded instead of being sent late.
+
+    Works with threads (``slot``) and with asyncio tasks (``aslot``).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        requests_per_second: Optional[float] = None,
+        reserved_share: float = 0.25,
+        weights: Optional[Dict[Any, float]] = None,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Most requests calling the provider at once
+            requests_per_second: Most requests admitted per second, or None
+                for no rate limit
+            reserved_share: Share of the concurrency and rate budget only
+                interactive requests may use
+            weights: Tenant weights for fair queuing; tenants not listed
+                weigh 1
+        """
+        if not 0 <= reserved_share < 1:
+            raise ValueError("reserved_share must be at least 0 and less than 1")
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.reserved_share = reserved_share
+        self.weights: Dict[Any, float] = dict(weights or {})
+        self.running: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self.dropped: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self._lock = threading.Lock()
+        # Per class: heap of (virtual start time, sequence, ticket)
+        self._queues: Dict[str, List[Tuple[float, int, _Ticket]]] = {
+            priority: [] for priority in PRIORITIES
+        }
+        self._queued: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        # Per class: virtual time, and each tenant's last virtual finish time
+        self._virtual: Dict[str, float] = {priority: 0.0 for priority in PRIORITIES}
+        self._finish: Dict[str, Dict[Any, float]] = {
+            priority: {} for priority in PRIORITIES
+        }
+        self._sequence = itertools.count()
+        self._tokens = self._bucket_size
+        self._refilled = time.monotonic()
+
+    @property
+    def _bucket_size(self) -> float:
+        # One second of requests may be admitted in a burst
+        return max(1.0, self.requests_per_second or 0.0)
+
+    @property
+    def reserved(self) -> int:
+        """Concurrency slots batch requests may not use."""
+        return min(
+            int(self.max_concurrency * self.reserved_share), self.max_concurrency - 1
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return running, queued and dropped request counts per priority class."""
+        with self._lock:
+            return {
+                "running": dict(self.running),
+                "queued": dict(self._queued),
+                "dropped": dict(self.dropped),
+            }
+
+    # -- admission -----------------------------------------------------------
+
+    def _enqueue(
+        self,
+        priority: str,
+        tenant: Any,
+        deadline: Optional[float],
+        wake: Callable[[], None],
+    ) -> _Ticket:
+        if priority not in PRIORITIES:
+            raise ValueError(
+                f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}"
+            )
+        ticket = _Ticket(priority, tenant, deadline, wake)
+        with self._lock:
+            # Start-time fair queuing: a tenant's next request starts where
+            # its previous one finished, or now if it has been idle
+            finish = self._finish[priority]
+            start = max(self._virtual[priority], finish.get(tenant, 0.0))
+            finish[tenant] = start + 1.0 / self.weights.get(tenant, 1.0)
+            heapq.heappush(
+                self._queues[priority], (start, next(self._sequence), ticket)
+            )
+            self._queued[priority] += 1
+            self._dispatch()
+        return ticket
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests while the budgets allow. Caller holds the lock."""
+        now = time.monotonic()
+        self._refill(now)
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                start, _, ticket = queue[0]
+                if ticket.state != "queued":
+                    heapq.heappop(queue)
+                    continue
+                if ticket.deadline is not None and ticket.deadline <= now:
+                    heapq.heappop(queue)
+                    self._expire(ticket)
+                    continue
+                if not self._admissible(priority):
+                    break
+                heapq.heappop(queue)
+                self._virtual[priority] = start
+                self._queued[priority] -= 1
+                self.running[priority] += 1
+                if self.requests_per_second:
+                    self._tokens -= 1
+                ticket.state = "granted"
+                ticket.wake()
+            if not self._queued[priority]:
+                # Idle tenants start afresh; forget them so the map stays small
+                self._finish[priority].clear()
+
+    def _admissible(self, priority: str) -> bool:
+        reserve = priority != PRIORITIES[0]
+        limit = self.max_concurrency - (self.reserved if reserve else 0)
+        if sum(self.running.values()) >= limit:
+            return False
+        if self.requests_per_second:
+            size = self._bucket_size
+            held_back = min(size * self.reserved_share, size - 1.0) if reserve else 0.0
+            return self._tokens >= 1.0 + held_back
+        return True
+
+    def _refill(self, now: float) -> None:
+        if self.requests_per_second:
+            self._tokens = min(
+                self._bucket_size,
+                self._tokens + (now - self._refilled) * self.requests_per_second,
+            )
+        self._refilled = now
+
+    def _expire(self, ticket: _Ticket) -> None:
+        ticket.state = "expired"
+        self._queued[ticket.priority] -= 1
+        self.dropped[ticket.priority] += 1
+
+    def _poll(self, ticket: _Ticket) -> Optional[float]:
+        """Admit what can be admitted and settle the ticket if its wait is over.
+
+        Returns how long to wait before polling again, or None to wait for a
+        slot to be released. Raises DeadlineExceeded if the ticket expired.
+        """
+        with self._lock:
+            self._dispatch()
+            if ticket.state == "queued" and ticket.deadline is not None:
+                if ticket.deadline <= time.monotonic():
+                    self._expire(ticket)
+            if ticket.state == "expired":
+                raise DeadlineExceeded(
+                    f"{ticket.priority} request expired while queued"
+                )
+            if ticket.state == "granted":
+                return 0.0
+            waits = []
+            if ticket.deadline is not None:
+                waits.append(ticket.deadline - time.monotonic())
+            if self.requests_per_second:
+                # The rate budget refills without a release to wake waiters
+                waits.append(1.0 / self.requests_per_second)
+            return max(0.0, min(waits)) if waits else None
+
+    def _abandon(self, ticket: _Ticket) -> None:
+        """Withdraw a ticket whose waiter gave up, e.g. on cancellation."""
+        with self._lock:
+            if ticket.state == "queued":
+                ticket.state = "abandoned"
+                self._queued[ticket.priority] -= 1
+                return
+        if ticket.state == "granted":
+            self.release(ticket)
+
+    def acquire(
+        self,
+        priority: str = INTERACTIVE,
+        tenant: Any = None,
+        deadline: Optional[float] = None,
+    ) -> _Ticket:
+        """Wait until the request may call the provider.
+
+        Args:
+            priority: "interactive" or "batch"
+            tenant: Caller to share capacity fairly with others in its class
+            deadline: ``time.monotonic()`` value after which the request is
+                dropped instead of admitted
+
+        Returns:
+            Ticket to hand to release once the call is done
+
+        Raises:
+            DeadlineExceeded: If the deadline passed while waiting
+        """
+        event = threading.Event()
+        ticket = self._enqueue(priority, tenant, deadline, event.set)
+        try:
+            while True:
+                wait = self._poll(ticket)
+                if ticket.state == "granted":
+                    return ticket
+                event.wait(wait)
+                event.clear()
+        except DeadlineExceeded:
+            raise
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    async def aacquire(
+        self,
+        priority: str = INTERACTIVE,
+        tenant: Any = None,
+        deadline: Optional[float] = None,
+    ) -> _Ticket:
+        """Async counterpart of acquire; cancelling it withdraws the request."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        ticket = self._enqueue(
+            priority, tenant, deadline, lambda: loop.call_soon_threadsafe(event.set)
+        )
+        try:
+            while True:
+                wait = self._poll(ticket)
+                if ticket.state == "granted":
+                    return ticket
+                try:
+                    await asyncio.wait_for(event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        except DeadlineExceeded:
+            raise
+        except BaseException:
+            self._abandon(ticket)
+            raise
+
+    def release(self, ticket: _Ticket) -> None:
+        """Return a ticket's slot and admit the next waiting request."""
+        with self._lock:
+            if ticket.state != "granted":
+                return
+            ticket.state = "released"
+            self.running[ticket.priority] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self,
+        priority: str = INTERACTIVE,
+        tenant: Any = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[None]:
+        """Hold a slot for the duration of a provider call; see acquire."""
+        ticket = self.acquire(priority, tenant, deadline)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def aslot(
+        self,
+        priority: str = INTERACTIVE,
+        tenant: Any = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        """Async counterpart of slot."""
+        ticket = await self.aacquire(priority, tenant, deadline)
+        try:
+            yield
+        finally:
+            self.release(ticket)
@@ -0,0 +1,187 @@
+"""
+Semantic response cache: answer near-duplicate prompts from earlier responses.
+
+Prompt embeddings are kept, normalised, in one float32 matrix, so a lookup is
+a single matrix-vector product (cosine similarity against every entry) masked
+to entries of the same scope: provider, model, system prompt and request
+options. The best match at or above the threshold is returned. Capacity is
+bounded, with least recently used entries evicted first, and the matrix is
+saved as a ``.npy`` file that ``load`` can memory-map.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .embeddings import Embedder, _require_numpy
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+EmbedFunction = Callable[[List[str]], Any]
+
+_VECTORS_FILE = "vectors.npy"
+_ENTRIES_FILE = "entries.json"
+
+
+def cache_scope(*parts: Any) -> int:
+    """Hash the parts identifying a cache scope into a 63-bit integer."""
+    data = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big") >> 1
+
+
+class SemanticCache:
+    """Cache of responses looked up by prompt similarity.
+
+    Args:
+        embedder: An Embedder, or a callable taking a list of texts and
+            returning one vector per text (e.g. a local sentence-transformers
+            model's ``encode``). None uses the embedder of the Chat it is
+            attached to, whose provider must then support embeddings.
+        threshold: Cosine similarity a cached prompt needs to be returned
+        capacity: Most entries kept; the least recently used are evicted
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Union[Embedder, EmbedFunction]] = None,
+        threshold: float = 0.95,
+        capacity: int = 10_000,
+    ):
+        _require_numpy()
+        self.embedder = embedder
+        self.threshold = threshold
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._vectors: Optional[Any] = None
+        self._scopes = np.zeros(capacity, dtype=np.int64)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._responses: List[Optional[str]] = [None] * capacity
+        self._count = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def embed(self, text: str) -> Any:
+        """Embed a prompt as a normalised float32 vector."""
+        if self.embedder is None:
+            raise ValueError("SemanticCache has no embedder")
+        if isinstance(self.embedder, Embedder):
+            vector = self.embedder.embed(text)
+        else:
+            vector = self.embedder([text])[0]
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def search(self, vector: Any, scope: int) -> Optional[str]:
+        """Return the response of the most similar prompt in the scope, if similar enough."""
+        with self._lock:
+            if not self._count or self._vectors is None:
+                self.misses += 1
+                return None
+            count = self._count
+            similarities = self._vectors[:count] @ vector
+            similarities = np.where(
+                self._scopes[:count] == scope, similarities, -np.inf
+            )
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clock += 1
+            self._last_used[best] = self._clock
+            return self._responses[best]
+
+    def add(self, vector: Any, scope: int, response: str) -> None:
+        """Store a response under its prompt vector, evicting if full."""
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+            if self._count < self.capacity:
+                index = self._count
+                self._count += 1
+            else:
+                index = int(np.argmin(self._last_used))
+            self._clock += 1
+            self._vectors[index] = vector
+            self._scopes[index] = scope
+            self._last_used[index] = self._clock
+            self._responses[index] = str(response)
+
+    def get(self, prompt: str, scope: int) -> Optional[str]:
+        """Embed a prompt and return the cached response for it, if any."""
+        return self.search(self.embed(prompt), scope)
+
+    def put(self, prompt: str, scope: int, response: str) -> None:
+        """Embed a prompt and store its response."""
+        self.add(self.embed(prompt), scope, response)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._count = 0
+            self._clock = 0
+            self._last_used[:] = 0
+            self._responses = [None] * self.capacity
+
+    def save(self, path: str) -> None:
+        """Save the cache to a directory.
+
+        The vectors are written as ``vectors.npy`` (the whole preallocated
+        matrix, so a memory-mapped load has room to grow) and the responses
+        as ``entries.json``. Files are replaced atomically, which keeps a
+        cache loaded from the same directory valid.
+        """
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            entries = {
+                "threshold": self.threshold,
+                "capacity": self.capacity,
+                "clock": self._clock,
+                "scopes": self._scopes[: self._count].tolist(),
+                "last_used": self._last_used[: self._count].tolist(),
+                "responses": self._responses[: self._count],
+            }
+            if self._vectors is not None:
+                tmp = os.path.join(path, _VECTORS_FILE + ".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, self._vectors)
+                os.replace(tmp, os.path.join(path, _VECTORS_FILE))
+        tmp = os.path.join(path, _ENTRIES_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, os.path.join(path, _ENTRIES_FILE))
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        embedder: Optional[Union[Embedder, EmbedFunction]] = None,
+        mmap: bool = True,
+    ) -> "SemanticCache":
+        """Load a cache saved with ``save``.
+
+        With ``mmap`` the vectors are memory-mapped copy-on-write: pages are
+        read on demand, and new entries stay in memory until the next save.
+        """
+        with open(os.path.join(path, _ENTRIES_FILE), encoding="utf-8") as f:
+            entries: Dict[str, Any] = json.load(f)
+        cache = cls(embedder, entries["threshold"], entries["capacity"])
+        count = len(entries["responses"])
+        cache._count = count
+        cache._clock = entries["clock"]
+        cache._scopes[:count] = entries["scopes"]
+        cache._last_used[:count] = entries["last_used"]
+        cache._responses[:count] = entries["responses"]
+        vectors_path = os.path.join(path, _VECTORS_FILE)
+        if os.path.exists(vectors_path):
+            cache._vectors = np.load(vectors_path, mmap_mode="c" if mmap else None)
+        return cache
@@ -0,0 +1,157 @@
+"""
+Concurrent request submission from synchronous code.
+
+Requests run as tasks on one event loop in a background thread, using the
+providers' async SDK clients, so many requests can be in flight without a
+thread each. Callers get ``concurrent.futures.Future`` objects, which work
+with ``concurrent.futures.as_completed`` and ``wait``.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional
+
+
+class BackgroundLoop:
+    """An asyncio event loop running in a daemon thread."""
+
+    _shared: Optional["BackgroundLoop"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, name: str = "chatanvil-loop"):
+        self.loop = asyncio.new_event_loop()
+        # A forked child gets a copy of the loop but not its thread
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls) -> "BackgroundLoop":
+        """Return the loop shared by all submitters, starting it if needed."""
+        with cls._shared_lock:
+            if cls._shared is None or not cls._shared.running:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def running(self) -> bool:
+        """True if the loop can run coroutines in this process."""
+        return (
+            self._pid == os.getpid()
+            and self._thread.is_alive()
+            and not self.loop.is_closed()
+        )
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            # Cancel what is still running so no coroutine is left unfinished
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            if hasattr(self.loop, "shutdown_default_executor"):  # Python 3.9+
+                self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+
+    def run(self, coroutine: Awaitable[Any]) -> "Future[Any]":
+        """Schedule a coroutine on the loop and return its future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def close(self) -> None:
+        """Stop the loop, cancelling running tasks, and wait for its thread."""
+        if self.running:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+
+
+class Submitter:
+    """Runs async calls on a background loop and hands back futures.
+
+    At most ``max_concurrency`` calls run at once; the rest wait on the loop
+    in submission order. At most ``max_pending`` calls may be submitted and
+    not yet finished. Past that, submit waits up to ``timeout`` seconds for
+    one to finish and then raises ``queue.Full``, so a fast producer cannot
+    queue unbounded work.
+
+    Cancelling a future cancels its task, which closes the upstream request.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        max_pending: int = 1024,
+        timeout: Optional[float] = None,
+        loop: Optional[BackgroundLoop] = None,
+    ):
+        """Initialize the submitter.
+
+        Args:
+            max_concurrency: Most calls running at once
+            max_pending: Most calls submitted and not yet finished
+            timeout: Seconds submit waits for a free slot; None waits as
+                long as it takes, 0 raises at once
+            loop: Loop to run on; defaults to the shared BackgroundLoop
+        """
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._loop = loop
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # asyncio semaphores belong to one loop; keep one per loop in use
+        self._limits: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def loop(self) -> BackgroundLoop:
+        """The loop calls run on."""
+        return self._loop or BackgroundLoop.shared()
+
+    def submit(
+        self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> "Future[Any]":
+        """Schedule ``fn(*args, **kwargs)`` on the loop.
+
+        Args:
+            fn: Async function to call
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Future resolving to fn's result
+
+        Raises:
+            queue.Full: If max_pending calls are still unfinished after
+                waiting ``timeout`` seconds
+        """
+        if self.timeout == 0:
+            acquired = self._slots.acquire(blocking=False)
+        else:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        if not acquired:
+            raise queue.Full(f"{self.max_pending} submitted requests are unfinished")
+        try:
+            # The coroutine is created on the loop, so a call cancelled before
+            # it starts leaves no coroutine behind un-awaited
+            future = self.loop.run(self._call(fn, args, kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def _call(
+        self, fn: Callable[..., Awaitable[Any]], args: Any, kwargs: Any
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        if loop not in self._limits:
+            self._limits[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with self._limits[loop]:
+            return await fn(*args, **kwargs)
@@ -2,18 +2,25 @@
 Chat-Anvil parsers for handling different response formats.
 """
 
+from .auto import AutoParser
 from .base import BaseParser
 from .default import DefaultParser
-from .markdown import MarkdownParser
+from .factory import ParserFactory
 from .json_parser import JSONParser
+from .markdown import MarkdownParser
+from .parsed import ParsedResponse
+from .structured import StructuredOutputError, StructuredParser
 from .xml_parser import XMLParser
-from .factory import ParserFactory
 
 __all__ = [
     "BaseParser",
+    "ParsedResponse",
     "DefaultParser",
     "MarkdownParser",
     "JSONParser",
     "XMLParser",
+    "StructuredParser",
+    "StructuredOutputError",
+    "AutoParser",
     "ParserFactory",
 ]
@@ -0,0 +1,65 @@
+import re
+from typing import Any, Dict, List
+
+from .base import BaseParser
+from .default import DefaultParser
+from .json_parser import JSONParser
+from .markdown import MarkdownParser
+from .parsed import ParsedResponse
+from .xml_parser import XMLParser
+
+
+class AutoParser(BaseParser):
+    """Parser that detects the response format and delegates to its parser.
+
+    The format is sniffed with a single scan that stops at the first decisive
+    marker: a leading ``{`` or ``[`` is JSON, a leading ``<`` is XML, and
+    otherwise the first fenced block decides (``json`` and ``xml`` fences go
+    to those parsers, any other fence to the markdown parser). Responses with
+    none of these are plain text. Only the chosen parser then reads the
+    response, and ``ParsedResponse.format`` records which one it was.
+
+    Args:
+        repair: Repair slightly broken JSON, as for the JSON parser
+        pretty: Re-indent XML, as for the XML parser
+    """
+
+    SNIFF_PATTERN = re.compile(r"\A\s*(?:([{\[])|<)|```(\w*)")
+    FENCE_FORMATS = {"json": "json", "xml": "xml"}
+
+    def __init__(self, repair: bool = True, pretty: bool = True):
+        self.type = "auto"
+        self.parsers: Dict[str, BaseParser] = {
+            "json": JSONParser(repair=repair),
+            "xml": XMLParser(pretty=pretty),
+            "markdown": MarkdownParser(),
+            "default": DefaultParser(),
+        }
+
+    def detect_format(self, response: str) -> str:
+        """Return the name of the parser for the response."""
+        match = self.SNIFF_PATTERN.search(response)
+        if not match:
+            return "default"
+        if match.group(2) is not None:
+            return self.FENCE_FORMATS.get(match.group(2).lower(), "markdown")
+        return "json" if match.group(1) else "xml"
+
+    def _build(self, response: str) -> ParsedResponse:
+        format_name = self.detect_format(response)
+        # Build directly so the response is cached once, by this parser
+        parsed = self.parsers[format_name]._build(response)
+        parsed.format = format_name
+        return parsed
+
+    def parse_response(self, response: str) -> str:
+        """Return the response formatted by the parser for its format."""
+        return self._parsed_text(response)
+
+    def extract_code(self, response: str) -> List[Dict[str, Any]]:
+        """Extract code blocks with the parser for the response's format.
+
+        Returns:
+            List of dicts with 'language' and 'content' keys
+        """
+        return [dict(block) for block in self.parse(response).code_blocks]
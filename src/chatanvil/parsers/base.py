@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 
+from .completion import CompletionDetector
+from .parsed import ParseCache, ParsedResponse
+
 
 class BaseParser(ABC):
     """Base class for response parsers."""
 
+    # Number of parsed responses each parser instance keeps for reuse
+    cache_size = 256
+
     @abstractmethod
     def parse_response(self, response: str) -> str:
         """Parse the response string.
@@ -28,3 +34,63 @@ class BaseParser(ABC):
             List of dictionaries containing code blocks with language and content
         """
         pass
+
+    def completion_detector(self) -> Optional[CompletionDetector]:
+        """Create a detector telling when a streamed response is complete.
+
+        Returns:
+            A new detector, or None if responses must be read to the end
+        """
+        return None
+
+    def parse(self, response: str) -> ParsedResponse:
+        """Parse the response once, memoized by its content and finish reason.
+
+        Args:
+            response: Raw response string from the model
+
+        Returns:
+            ParsedResponse holding the parsed document, with formatted text and
+            code blocks computed on first access
+        """
+        cache = self._cache()
+        # The same text cut off at max_tokens is truncated; finished, it is not
+        key = (response, getattr(response, "finish_reason", None))
+        parsed = cache.get(key)
+        if parsed is None:
+            parsed = self._build(response)
+            cache.put(key, parsed)
+        return parsed
+
+    def _build(self, response: str) -> ParsedResponse:
+        """Create the ParsedResponse for a response not in the cache.
+
+        Parsers that build a document override this so ``parse_response`` and
+        ``extract_code`` can share a single parsing pass.
+        """
+        return ParsedResponse(
+            response,
+            format_text=lambda: self.parse_response(response),
+            extract_code=lambda: self.extract_code(response),
+        )
+
+    def _parsed_text(self, response: str) -> str:
+        """Return the formatted text and remember it as an alias of the response.
+
+        ``Chat.extract_code`` is usually called with the text ``parse_response``
+        returned, so that text is cached too and maps back to the same parse.
+        """
+        parsed = self.parse(response)
+        text = parsed.text
+        if text is not response:
+            self._cache().put((text, None), parsed)
+        return text
+
+    def _cache(self) -> ParseCache:
+        # Parsers do not call super().__init__(), so the cache is created lazily
+        cache = self.__dict__.get("_parse_cache")
+        if cache is None:
+            cache = self.__dict__.setdefault(
+                "_parse_cache", ParseCache(self.cache_size)
+            )
+        return cache
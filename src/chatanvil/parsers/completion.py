@@ -0,0 +1,315 @@
+import bisect
+import json
+import re
+from typing import Callable, List, Optional, Union
+
+from ..utils import json_backend
+
+# Fence delimiting markdown code blocks
+FENCE = "```"
+
+_JSON_START = re.compile(r"[{\[]")
+_JSON_STRUCTURE = re.compile(r'["{}\[\]]')
+_JSON_STRING_RUN = re.compile(r'[^"\\]*')
+_XML_TAG = re.compile(
+    r"<(?:!--.*?-->|!\[CDATA\[.*?\]\]>|[?!][^>]*>|(/?)[A-Za-z_][\w:.-]*[^>]*?(/?)>)",
+    re.DOTALL,
+)
+
+
+class CompletionDetector:
+    """Detects, while a response streams in, that it already has what is needed.
+
+    ``feed`` is called with each chunk of the response and scans only the new
+    text. Once the response is complete it returns the length of the useful
+    prefix; anything after that is commentary that can be dropped. Detectors
+    keep state, so each one is used for a single response.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._end: Optional[int] = None
+        # True if the payload sits in a fenced block that must be closed too
+        self._fenced = False
+        # End positions of the fences seen so far, and the tail of the text
+        # after the last one that may hold the start of the next
+        self._fence_ends: List[int] = []
+        self._fence_tail = ""
+
+    @property
+    def text(self) -> str:
+        """The response text received so far."""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """Add a chunk of the response.
+
+        Returns:
+            Length of the complete response, or None if more text is needed
+        """
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        self._track_fences(chunk, offset)
+        if self._end is None:
+            self._end = self._scan(chunk, offset)
+            if self._end is None:
+                return None
+        if not self._fenced:
+            return self._end
+        # The first fence starting after the payload closes its block
+        index = bisect.bisect_left(self._fence_ends, self._end + len(FENCE))
+        return self._fence_ends[index] if index < len(self._fence_ends) else None
+
+    def _track_fences(self, chunk: str, offset: int) -> None:
+        """Record the fences in a new chunk, including ones split across chunks."""
+        window = self._fence_tail + chunk
+        start = offset - len(self._fence_tail)
+        end = 0
+        while True:
+            index = window.find(FENCE, end)
+            if index < 0:
+                break
+            end = index + len(FENCE)
+            self._fence_ends.append(start + end)
+        self._fence_tail = window[max(end, len(window) - len(FENCE) + 1) :]
+
+    def _scan(self, chunk: str, offset: int) -> Optional[int]:
+        """Scan a new chunk starting at ``offset`` in the response.
+
+        Returns:
+            End of the payload in the response once it is complete
+        """
+        raise NotImplementedError
+
+    def _starts_fenced(self, start: int) -> bool:
+        # An odd number of fences before the payload means one is still open
+        return bisect.bisect_right(self._fence_ends, start) % 2 == 1
+
+
+class JSONValueDetector(CompletionDetector):
+    """Complete once the first JSON object or array is closed.
+
+    Brackets in prose are not mistaken for the payload: only a value that
+    decodes counts, an array only when it starts a line (so a citation such
+    as ``[1]`` is skipped), and inside a fenced block only a value starting
+    a line.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # Text of the candidate value from earlier chunks
+        self._value: List[str] = []
+        # True if only whitespace follows the last newline before the chunk
+        self._line_start = True
+
+    def _at_line_start(self, chunk: str, i: int, line_start: bool) -> bool:
+        newline = chunk.rfind("\n", 0, i)
+        if chunk[newline + 1 : i].strip():
+            return False
+        return newline >= 0 or line_start
+
+    def _scan(self, chunk: str, offset: int) -> Optional[int]:
+        line_start = self._line_start
+        newline = chunk.rfind("\n")
+        self._line_start = not chunk[newline + 1 :].strip() and (
+            newline >= 0 or line_start
+        )
+        i, n = 0, len(chunk)
+        value_start = 0
+        while i < n:
+            if self._depth == 0:
+                start = _JSON_START.search(chunk, i)
+                if not start:
+                    return None
+                i = value_start = start.start()
+                self._fenced = self._starts_fenced(offset + i)
+                if (self._fenced or chunk[i] == "[") and not self._at_line_start(
+                    chunk, i, line_start
+                ):
+                    i += 1
+                    continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                i = _JSON_STRING_RUN.match(chunk, i).end()
+                if i < n:
+                    if chunk[i] == "\\":
+                        self._escape = True
+                    else:
+                        self._in_string = False
+                    i += 1
+                continue
+            match = _JSON_STRUCTURE.search(chunk, i)
+            if not match:
+                break
+            token, i = match.group(), match.end()
+            if token == '"':
+                self._in_string = True
+            elif token in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    value = "".join(self._value) + chunk[value_start:i]
+                    self._value = []
+                    if self._decodes(value):
+                        return offset + i
+        if self._depth:
+            self._value.append(chunk[value_start:])
+        return None
+
+    @staticmethod
+    def _decodes(text: str) -> bool:
+        try:
+            json_backend.loads(text)
+        except json.JSONDecodeError:
+            return False
+        return True
+
+
+class FencedCodeDetector(CompletionDetector):
+    """Complete once the first fenced code block is closed."""
+
+    def __init__(self):
+        super().__init__()
+        # Tail of the response that may still hold part of a fence
+        self._window = ""
+        # 0: before the opening fence, 1: in its info line, 2: in the code
+        self._state = 0
+
+    def _scan(self, chunk: str, offset: int) -> Optional[int]:
+        window = self._window + chunk
+        start = offset - len(self._window)
+        while True:
+            if self._state == 0:
+                index = window.find(FENCE)
+                if index < 0:
+                    break
+                self._state = 1
+                start += index + len(FENCE)
+                window = window[index + len(FENCE) :]
+            elif self._state == 1:
+                index = window.find("\n")
+                if index < 0:
+                    break
+                # Keep the newline: the closing fence must start a line
+                self._state = 2
+                start += index
+                window = window[index:]
+            else:
+                index = window.find("\n" + FENCE)
+                if index >= 0:
+                    return start + index + 1 + len(FENCE)
+                break
+        # Fences can be split across chunks, so keep a few characters back
+        keep = len(window) if self._state == 1 else min(len(window), len(FENCE))
+        self._window = window[len(window) - keep :]
+        return None
+
+
+class XMLRootDetector(CompletionDetector):
+    """Complete once the root element of the first XML document is closed."""
+
+    def __init__(self):
+        super().__init__()
+        # Tail of the response from a tag that has not been read completely
+        self._window = ""
+        self._depth = 0
+
+    def _scan(self, chunk: str, offset: int) -> Optional[int]:
+        window = self._window + chunk
+        start = offset - len(self._window)
+        position = 0
+        while True:
+            lt = window.find("<", position)
+            if lt < 0:
+                position = len(window)
+                break
+            match = _XML_TAG.match(window, lt)
+            if not match:
+                rest = window[lt:]
+                is_tag = len(rest) == 1 or rest[1].isalpha() or rest[1] in "_/!?"
+                if is_tag and (
+                    ">" not in rest or rest.startswith(("<!--", "<![CDATA["))
+                ):
+                    # Wait for the rest of the tag
+                    position = lt
+                    break
+                # A bare "<" in prose before the document
+                position = lt + 1
+                continue
+            position = match.end()
+            closing, self_closing = match.group(1), match.group(2)
+            if closing is None:
+                # Comment, CDATA, processing instruction or declaration
+                continue
+            if closing:
+                if self._depth == 0:
+                    continue
+                self._depth -= 1
+            elif not self_closing:
+                if self._depth == 0:
+                    self._fenced = self._starts_fenced(start + lt)
+                self._depth += 1
+            elif self._depth == 0:
+                self._fenced = self._starts_fenced(start + lt)
+            if self._depth == 0:
+                return start + position
+        self._window = window[position:]
+        return None
+
+
+class PredicateDetector(CompletionDetector):
+    """Complete once a caller-supplied predicate accepts the text so far."""
+
+    def __init__(self, predicate: Callable[[str], bool]):
+        super().__init__()
+        self.predicate = predicate
+        self._buffer = ""
+
+    def _scan(self, chunk: str, offset: int) -> Optional[int]:
+        # Held only by the local while it grows, so CPython extends the
+        # string in place instead of copying the whole response per chunk
+        text, self._buffer = self._buffer, ""
+        text += chunk
+        self._buffer = text
+        return len(text) if self.predicate(text) else None
+
+
+DETECTORS = {
+    "json": JSONValueDetector,
+    "code": FencedCodeDetector,
+    "xml": XMLRootDetector,
+}
+
+Until = Union[str, Callable[[str], bool], CompletionDetector]
+
+
+def get_detector(until: Until) -> CompletionDetector:
+    """Create the detector for an ``until`` argument.
+
+    Args:
+        until: Name of a built-in detector ('json', 'code', 'xml'), a predicate
+            called with the text received so far, or a detector instance
+
+    Raises:
+        ValueError: If the name is not a built-in detector
+    """
+    if isinstance(until, CompletionDetector):
+        return until
+    if isinstance(until, str):
+        detector_class = DETECTORS.get(until.lower())
+        if not detector_class:
+            raise ValueError(
+                f"Unsupported completion detector: {until}. "
+                f"Available detectors: {', '.join(DETECTORS.keys())}"
+            )
+        return detector_class()
+    return PredicateDetector(until)
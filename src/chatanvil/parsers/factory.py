@@ -1,11 +1,30 @@
-from typing import Optional, Type
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Type
+
+from .auto import AutoParser
 from .base import BaseParser
 from .default import DefaultParser
-from .markdown import MarkdownParser
 from .json_parser import JSONParser
+from .markdown import MarkdownParser
+from .structured import StructuredParser
 from .xml_parser import XMLParser
 
 
+def _parse_chunk(
+    parser_class: Type[BaseParser],
+    options: Dict[str, Any],
+    method: str,
+    chunk: List[str],
+) -> List[Any]:
+    """Run one parser method over a chunk of responses inside a worker."""
+    parser = parser_class(**options)
+    parse = getattr(parser, method)
+    return [parse(response) for response in chunk]
+
+
 class ParserFactory:
     """Factory for creating response parsers."""
 
@@ -14,14 +33,18 @@ class ParserFactory:
         "markdown": MarkdownParser,
         "json": JSONParser,
         "xml": XMLParser,
+        "structured": StructuredParser,
+        "auto": AutoParser,
     }
 
     @classmethod
-    def get_parser(cls, parser_type: str = "default") -> BaseParser:
+    def get_parser(cls, parser_type: str = "default", **options: Any) -> BaseParser:
         """Get a parser instance by type.
 
         Args:
-            parser_type: Type of parser to create ('default', 'markdown', 'json', 'xml')
+            parser_type: Type of parser to create ('default', 'markdown', 'json',
+                'xml', 'structured', 'auto')
+            **options: Parser-specific options, e.g. ``return_objects`` for 'json'
 
         Returns:
             Instance of the requested parser
@@ -35,7 +58,7 @@ class ParserFactory:
                 f"Unsupported parser type: {parser_type}. "
                 f"Available types: {', '.join(cls._parsers.keys())}"
             )
-        return parser_class()
+        return parser_class(**options)
 
     @classmethod
     def register_parser(cls, parser_type: str, parser_class: Type[BaseParser]) -> None:
@@ -54,3 +77,90 @@ class ParserFactory:
                 f"got {parser_class.__name__}"
             )
         cls._parsers[parser_type.lower()] = parser_class
+
+    @classmethod
+    def parse_many(
+        cls,
+        responses: Iterable[str],
+        parser_type: str = "default",
+        workers: Optional[int] = None,
+        mode: str = "process",
+        chunksize: int = 256,
+        extract_code: bool = False,
+        **options: Any,
+    ) -> Iterator[Any]:
+        """Parse a large set of responses in parallel, yielding results in order.
+
+        Responses are split into chunks that are sharded across a worker pool;
+        only a few chunks per worker are in flight at a time, so the input can
+        be a lazy iterable over far more responses than fit in memory. The
+        pool starts when the first result is read and shuts down once the
+        iterator is exhausted or closed.
+
+        Args:
+            responses: Raw response strings
+            parser_type: Type of parser to apply
+            workers: Number of workers (defaults to the CPU count)
+            mode: 'process' for CPU-bound parsers (json, xml), 'thread' for the
+                regex-light ones (markdown, default) where pickling would dominate
+            chunksize: Number of responses sent to a worker at a time
+            extract_code: Yield ``extract_code`` results instead of ``parse_response``
+            **options: Parser-specific options passed to every worker's parser
+
+        Returns:
+            Iterator over the parsed responses, in input order
+
+        Raises:
+            ValueError: If parser_type or mode is not supported
+        """
+        if mode not in ("process", "thread"):
+            raise ValueError(
+                f"Unsupported parse mode: {mode}. Available modes: process, thread"
+            )
+        if chunksize < 1:
+            raise ValueError("Chunk size must be at least 1")
+        # Resolve in the parent so unknown types fail before any work starts
+        parser_class = type(cls.get_parser(parser_type, **options))
+        method = "extract_code" if extract_code else "parse_response"
+        workers = workers or os.cpu_count() or 1
+        executor_class = (
+            ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+        )
+        return cls._parse_chunks(
+            executor_class,
+            workers,
+            parser_class,
+            options,
+            method,
+            iter(responses),
+            chunksize,
+        )
+
+    @staticmethod
+    def _parse_chunks(
+        executor_class: Type[Executor],
+        workers: int,
+        parser_class: Type[BaseParser],
+        options: Dict[str, Any],
+        method: str,
+        responses: Iterator[str],
+        chunksize: int,
+    ) -> Iterator[Any]:
+        # Created on the first next(), so an iterator that is never read
+        # leaves no pool behind
+        max_pending = 2 * workers
+        pending: Deque[Any] = deque()
+        with executor_class(max_workers=workers) as executor:
+            while True:
+                while len(pending) < max_pending:
+                    chunk = list(islice(responses, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(
+                        executor.submit(
+                            _parse_chunk, parser_class, options, method, chunk
+                        )
+                    )
+                if not pending:
+                    return
+                yield from pending.popleft().result()
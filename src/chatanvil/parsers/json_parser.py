@@ -1,7 +1,12 @@
 import json
 import re
-from typing import Dict, List, Any, Union
+from typing import Any, Dict, List, Tuple, Union
+
+from ..utils import json_backend
+from ..utils.json_repair import CLOSED_BRACKETS, repair_json
 from .base import BaseParser
+from .completion import CompletionDetector, JSONValueDetector
+from .parsed import ParsedResponse
 
 
 class JSONParser(BaseParser):
@@ -22,28 +27,96 @@ class JSONParser(BaseParser):
         "script",
     ]
 
-    def __init__(self):
-        self.type = "json"
+    FENCE_PATTERN = re.compile(r"```json\n(.*?)\n```", re.DOTALL)
 
-    def parse_response(self, response: str) -> str:
-        """Parse JSON from response, including from markdown code blocks."""
+    def __init__(self, return_objects: bool = False, repair: bool = True):
+        """
+        Args:
+            return_objects: Make parse_response return the decoded value instead
+                of re-serialized text; unparseable responses are still returned
+                as strings
+            repair: Repair slightly broken JSON (prose around it, trailing
+                commas, single quotes, truncated output) instead of treating
+                the response as unparseable
+        """
+        self.type = "json"
+        self.return_objects = return_objects
+        self.repair = repair
+        # Field order is kept so blocks come out in CODE_FIELDS order
+        self._code_fields = tuple(
+            (field, self._guess_language(field)) for field in self.CODE_FIELDS
+        )
+
+    def _payload(self, response: str) -> str:
         # First try to extract JSON from markdown code block
-        pattern = r"```json\n(.*?)\n```"
-        match = re.search(pattern, response, re.DOTALL)
-        if match:
-            response = match.group(1)
+        match = self.FENCE_PATTERN.search(response)
+        return match.group(1) if match else response
 
+    def completion_detector(self) -> CompletionDetector:
+        """Responses are complete once the first JSON value is closed."""
+        return JSONValueDetector()
+
+    def _load(self, payload: str) -> Tuple[Any, List[str]]:
+        """Decode the payload, repairing it if needed.
+
+        Returns:
+            The decoded value and the repairs that were applied
+
+        Raises:
+            json.JSONDecodeError: If the payload is invalid and cannot be repaired
+        """
+        try:
+            return json_backend.loads(payload), []
+        except json.JSONDecodeError:
+            repaired = repair_json(payload) if self.repair else None
+            if repaired is None:
+                raise
+            return repaired
+
+    @staticmethod
+    def _truncated(response: str, repairs: List[str]) -> bool:
+        # Providers report whether max_tokens was hit; for plain strings,
+        # having to close the document is the best evidence available
+        finish_reason = getattr(response, "finish_reason", None)
+        if finish_reason is not None:
+            return finish_reason == "length"
+        return CLOSED_BRACKETS in repairs
+
+    def _build(self, response: str) -> ParsedResponse:
+        """Load the JSON once; formatting and code extraction reuse the value."""
+        payload = self._payload(response)
         try:
-            parsed = json.loads(response)
-            return json.dumps(parsed, indent=2)
+            data, repairs = self._load(payload)
         except json.JSONDecodeError:
-            return response
+            return ParsedResponse(
+                response,
+                format_text=lambda: payload,
+                ok=False,
+                truncated=self._truncated(response, []),
+            )
+        return ParsedResponse(
+            response,
+            data=data,
+            format_text=lambda: json_backend.dumps_pretty(data),
+            extract_code=lambda: self._extract_code_blocks(data),
+            repairs=repairs,
+            truncated=self._truncated(response, repairs),
+        )
+
+    def parse_response(self, response: str) -> Union[str, Any]:
+        """Parse JSON from response, including from markdown code blocks."""
+        if self.return_objects:
+            parsed = self.parse(response)
+            if parsed.ok:
+                return parsed.data
+        return self._parsed_text(response)
+
+    def _extract_code_blocks(self, data: Any) -> List[Dict[str, str]]:
+        """Extract code blocks from a nested JSON structure.
 
-    def _extract_code_recursive(
-        self, data: Union[Dict, List, Any]
-    ) -> List[Dict[str, str]]:
-        """Recursively extract code blocks from nested JSON structure.
-        Only for code blocks in the format of {language: "...", content: "..."}
+        Walks the structure iteratively, visiting every node once, so deeply
+        nested output cannot hit the recursion limit. Blocks are returned in
+        depth-first document order.
 
         Args:
             data: JSON data structure (can be dict, list, or primitive type)
@@ -52,66 +125,59 @@ class JSONParser(BaseParser):
             List of code blocks found in the structure
         """
         code_blocks = []
-
-        if isinstance(data, dict):
-            # check if the format is {language: "...", content: "..."}
-            if "content" in data and isinstance(data.get("content"), str):
-                language = data.get("language", "")
-                code_blocks.append({"language": language, "content": data["content"]})
-                return code_blocks
-
-            # Check for code fields at current level
-            for field in self.CODE_FIELDS:
-                if field in data:
-                    code = data[field]
+        code_fields = self._code_fields
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                # check if the format is {language: "...", content: "..."}
+                content = node.get("content")
+                if isinstance(content, str):
+                    code_blocks.append(
+                        {"language": node.get("language", ""), "content": content}
+                    )
+                    continue
+
+                # Check for code fields at current level
+                for field, guessed_language in code_fields:
+                    code = node.get(field)
                     if isinstance(code, str):
-                        # Try to determine language from context
-                        language = data.get("language", "")
-                        if not language:
-                            # Try to guess language from field name or parent keys
-                            if "python" in field.lower() or "py" in field.lower():
-                                language = "python"
-                            elif "javascript" in field.lower() or "js" in field.lower():
-                                language = "javascript"
-                            # Add more language detection rules as needed
-
+                        language = node.get("language", "") or guessed_language
                         code_blocks.append({"language": language, "content": code})
-                    elif isinstance(code, dict):
-                        # recursively process nested code objects
-                        code_blocks.extend(self._extract_code_recursive(code))
-
-            # Recursively check all values
-            for value in data.values():
-                code_blocks.extend(self._extract_code_recursive(value))
-
-        elif isinstance(data, list):
-            # Recursively check all items in list
-            for item in data:
-                code_blocks.extend(self._extract_code_recursive(item))
 
+                # Nested dicts, including code objects, are visited from the stack
+                stack.extend(
+                    value
+                    for value in reversed(list(node.values()))
+                    if isinstance(value, (dict, list))
+                )
+            elif isinstance(node, list):
+                stack.extend(
+                    item for item in reversed(node) if isinstance(item, (dict, list))
+                )
         return code_blocks
 
-    def extract_code(self, response: str) -> List[Dict[str, str]]:
+    @staticmethod
+    def _guess_language(field: str) -> str:
+        # Try to guess language from field name
+        field = field.lower()
+        if "python" in field or "py" in field:
+            return "python"
+        if "javascript" in field or "js" in field:
+            return "javascript"
+        # Add more language detection rules as needed
+        return ""
+
+    def extract_code(self, response: Union[str, Any]) -> List[Dict[str, str]]:
         """Extract code blocks from JSON response.
 
         Looks for code blocks in various code-related fields at any nesting level.
         Also handles code blocks in arrays and nested code objects with language/content format.
+        Already parsed values, as returned with ``return_objects``, are walked directly.
 
         Returns:
             List of dicts with 'language' and 'content' keys
         """
-        code_blocks = []
-        try:
-            # First try to extract JSON from markdown block
-            pattern = r"```json\n(.*?)\n```"
-            match = re.search(pattern, response, re.DOTALL)
-            if match:
-                response = match.group(1)
-
-            data = json.loads(response)
-            code_blocks = self._extract_code_recursive(data)
-
-        except json.JSONDecodeError:
-            pass
-
-        return code_blocks
+        if not isinstance(response, str):
+            return self._extract_code_blocks(response)
+        return [dict(block) for block in self.parse(response).code_blocks]
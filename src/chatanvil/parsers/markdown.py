@@ -1,14 +1,36 @@
 import re
 from typing import Dict, List
+
 from .base import BaseParser
+from .completion import CompletionDetector, FencedCodeDetector
+from .parsed import ParsedResponse
 
 
 class MarkdownParser(BaseParser):
     """Parser for markdown formatted responses."""
 
+    CODE_PATTERN = re.compile(r"```(\w+)?\n(.*?)\n```", re.DOTALL)
+
     def __init__(self):
         self.type = "markdown"
 
+    def completion_detector(self) -> CompletionDetector:
+        """Responses are complete once the first code block is closed."""
+        return FencedCodeDetector()
+
+    def _build(self, response: str) -> ParsedResponse:
+        return ParsedResponse(
+            response, extract_code=lambda: self._code_blocks(response)
+        )
+
+    def _code_blocks(self, response: str) -> List[Dict[str, str]]:
+        code_blocks = []
+        for match in self.CODE_PATTERN.finditer(response):
+            language = match.group(1) or ""
+            content = match.group(2).strip()
+            code_blocks.append({"language": language, "content": content})
+        return code_blocks
+
     def parse_response(self, response: str) -> str:
         """Return the response with markdown formatting intact."""
         return response
@@ -19,13 +41,4 @@ class MarkdownParser(BaseParser):
         Returns:
             List of dicts with 'language' and 'content' keys
         """
-        code_blocks = []
-        pattern = r"```(\w+)?\n(.*?)\n```"
-        matches = re.finditer(pattern, response, re.DOTALL)
-
-        for match in matches:
-            language = match.group(1) or ""
-            content = match.group(2).strip()
-            code_blocks.append({"language": language, "content": content})
-
-        return code_blocks
+        return [dict(block) for block in self.parse(response).code_blocks]
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class ParsedResponse:
+    """A response parsed once by a parser.
+
+    Keeps the parsed document (a JSON value or an XML root element) from the
+    single parsing pass; the formatted text and the code blocks are derived
+    from it on first access and then reused.
+
+    Attributes:
+        raw: Raw response string from the model
+        data: Parsed document, or None if the parser does not build one or
+            the response could not be parsed
+        ok: False if the parser failed to parse the response
+        errors: Problems found while parsing or validating the response
+        repairs: Repairs applied to make the response parseable
+        truncated: True if the response was cut off before it was complete
+        format: Format the response was parsed as, when the parser chose it
+    """
+
+    def __init__(
+        self,
+        raw: str,
+        data: Any = None,
+        format_text: Optional[Callable[[], str]] = None,
+        extract_code: Optional[Callable[[], List[Dict[str, str]]]] = None,
+        ok: bool = True,
+        errors: Optional[List[str]] = None,
+        repairs: Optional[List[str]] = None,
+        truncated: bool = False,
+        format: Optional[str] = None,
+    ):
+        self.raw = raw
+        self.data = data
+        self.ok = ok
+        self.errors = errors or []
+        self.repairs = repairs or []
+        self.truncated = truncated
+        self.format = format
+        self._format_text = format_text
+        self._extract_code = extract_code
+        self._text: Optional[str] = None
+        self._code_blocks: Optional[List[Dict[str, str]]] = None
+
+    @property
+    def text(self) -> str:
+        """Formatted response text, as returned by ``parse_response``."""
+        if self._text is None:
+            self._text = self._format_text() if self._format_text else self.raw
+        return self._text
+
+    @property
+    def code_blocks(self) -> List[Dict[str, str]]:
+        """Code blocks found in the response, as returned by ``extract_code``."""
+        if self._code_blocks is None:
+            self._code_blocks = self._extract_code() if self._extract_code else []
+        return self._code_blocks
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        preview = self.raw if len(self.raw) <= 40 else self.raw[:37] + "..."
+        return f"ParsedResponse({preview!r})"
+
+
+class ParseCache:
+    """Thread-safe LRU cache of ParsedResponse objects keyed by response."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, ParsedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[ParsedResponse]:
+        with self._lock:
+            parsed = self._items.get(key)
+            if parsed is not None:
+                self._items.move_to_end(key)
+            return parsed
+
+    def put(self, key: Hashable, parsed: ParsedResponse) -> None:
+        with self._lock:
+            self._items[key] = parsed
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
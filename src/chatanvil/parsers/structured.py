@@ -0,0 +1,423 @@
+import dataclasses
+import enum
+import json
+import re
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from ..utils import json_backend
+from .json_parser import JSONParser
+from .parsed import ParsedResponse
+
+Validator = Callable[[Any, str, List[str]], None]
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a response does not match the requested schema.
+
+    Attributes:
+        errors: Validation errors, each prefixed with the JSON path
+        response: Raw response string from the model
+    """
+
+    def __init__(self, message: str, errors: List[str], response: str):
+        super().__init__(f"{message}: {'; '.join(errors)}" if errors else message)
+        self.errors = errors
+        self.response = response
+
+
+def schema_from_dataclass(cls: Type[Any], strict: bool = False) -> Dict[str, Any]:
+    """Build a JSON Schema for a dataclass from its type hints.
+
+    Supports str, int, float, bool, Any, Optional, List, Dict, Literal, Enum
+    and nested dataclasses.
+
+    Args:
+        cls: Dataclass to describe
+        strict: Mark every field as required, as OpenAI strict mode demands;
+            otherwise only fields without defaults are required
+
+    Raises:
+        TypeError: If cls is not a dataclass or uses an unsupported type
+    """
+    if not (dataclasses.is_dataclass(cls) and isinstance(cls, type)):
+        raise TypeError(f"Expected a dataclass, got {cls!r}")
+    return _dataclass_schema(cls, strict, ())
+
+
+def _dataclass_schema(cls: Type[Any], strict: bool, seen: tuple) -> Dict[str, Any]:
+    if cls in seen:
+        raise TypeError(f"Recursive dataclass {cls.__name__} cannot be described")
+    hints = get_type_hints(cls)
+    properties = {}
+    required = []
+    for f in dataclasses.fields(cls):
+        properties[f.name] = _type_schema(hints[f.name], strict, seen + (cls,))
+        has_default = (
+            f.default is not dataclasses.MISSING
+            or f.default_factory is not dataclasses.MISSING
+        )
+        if strict or not has_default:
+            required.append(f.name)
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": required,
+        "additionalProperties": False,
+    }
+
+
+_PRIMITIVE_SCHEMAS = {
+    str: {"type": "string"},
+    int: {"type": "integer"},
+    float: {"type": "number"},
+    bool: {"type": "boolean"},
+    type(None): {"type": "null"},
+}
+
+
+def _type_schema(hint: Any, strict: bool, seen: tuple) -> Dict[str, Any]:
+    if hint is Any:
+        return {}
+    if hint in _PRIMITIVE_SCHEMAS:
+        return dict(_PRIMITIVE_SCHEMAS[hint])
+    if dataclasses.is_dataclass(hint):
+        return _dataclass_schema(hint, strict, seen)
+    if isinstance(hint, type) and issubclass(hint, enum.Enum):
+        return {"enum": [member.value for member in hint]}
+    origin, args = get_origin(hint), get_args(hint)
+    if origin is Union:
+        return {"anyOf": [_type_schema(arg, strict, seen) for arg in args]}
+    if origin is Literal:
+        return {"enum": list(args)}
+    if hint is list or origin is list:
+        schema: Dict[str, Any] = {"type": "array"}
+        if args:
+            schema["items"] = _type_schema(args[0], strict, seen)
+        return schema
+    if hint is dict or origin is dict:
+        schema = {"type": "object"}
+        if len(args) == 2:
+            schema["additionalProperties"] = _type_schema(args[1], strict, seen)
+        return schema
+    raise TypeError(f"Unsupported type in structured output schema: {hint!r}")
+
+
+def _from_data(hint: Any, value: Any) -> Any:
+    """Convert validated JSON data into instances of the hinted types."""
+    if value is None:
+        return None
+    if dataclasses.is_dataclass(hint) and isinstance(value, dict):
+        hints = get_type_hints(hint)
+        return hint(
+            **{
+                f.name: _from_data(hints[f.name], value[f.name])
+                for f in dataclasses.fields(hint)
+                if f.name in value
+            }
+        )
+    if isinstance(hint, type) and issubclass(hint, enum.Enum):
+        return hint(value)
+    origin, args = get_origin(hint), get_args(hint)
+    if origin is Union:
+        # Try each alternative; the first one that fits the data wins
+        for arg in args:
+            if arg is type(None):
+                continue
+            try:
+                return _from_data(arg, value)
+            except (TypeError, ValueError, KeyError):
+                continue
+        return value
+    if origin is list and args and isinstance(value, list):
+        return [_from_data(args[0], item) for item in value]
+    if origin is dict and len(args) == 2 and isinstance(value, dict):
+        return {key: _from_data(args[1], item) for key, item in value.items()}
+    if hint is float and isinstance(value, int):
+        return float(value)
+    return value
+
+
+_JSON_TYPES: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+}
+
+
+def compile_validator(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """Compile a JSON Schema into a function returning validation errors.
+
+    Compiled validators are cached by the schema's canonical JSON, so equal
+    schemas are compiled once per process. Supports type, enum, const,
+    properties, required, additionalProperties, items, anyOf/oneOf/allOf,
+    length and range bounds, pattern and local $ref.
+    """
+    return _compile_cached(json.dumps(schema, sort_keys=True))
+
+
+@lru_cache(maxsize=128)
+def _compile_cached(schema_json: str) -> Callable[[Any], List[str]]:
+    root = json.loads(schema_json)
+    refs: Dict[str, Validator] = {}
+
+    def resolve(ref: str) -> Validator:
+        if ref not in refs:
+            if not ref.startswith("#"):
+                raise ValueError(f"Only local $ref is supported, got {ref}")
+            target: Any = root
+            for part in ref.lstrip("#/").split("/") if ref != "#" else []:
+                target = target[part.replace("~1", "/").replace("~0", "~")]
+            # Placeholder first so recursive references terminate
+            refs[ref] = lambda value, path, errors: None
+            refs[ref] = build(target)
+        return refs[ref]
+
+    def build(schema: Any) -> Validator:
+        if schema is True or schema == {}:
+            return lambda value, path, errors: None
+        if schema is False:
+            return lambda value, path, errors: errors.append(f"{path}: not allowed")
+        checks: List[Validator] = []
+
+        if "$ref" in schema:
+            ref = schema["$ref"]
+            checks.append(lambda value, path, errors: resolve(ref)(value, path, errors))
+
+        if "type" in schema:
+            names = (
+                schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            )
+            testers = [_JSON_TYPES[name] for name in names]
+            expected = " or ".join(names)
+
+            def check_type(value: Any, path: str, errors: List[str]) -> None:
+                if not any(test(value) for test in testers):
+                    errors.append(
+                        f"{path}: expected {expected}, got {type(value).__name__}"
+                    )
+
+            checks.append(check_type)
+
+        if "enum" in schema:
+            allowed = schema["enum"]
+            checks.append(
+                lambda value, path, errors: value in allowed
+                or errors.append(f"{path}: {value!r} is not one of {allowed!r}")
+            )
+        if "const" in schema:
+            const = schema["const"]
+            checks.append(
+                lambda value, path, errors: value == const
+                or errors.append(f"{path}: expected {const!r}")
+            )
+
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [build(option) for option in schema[key]]
+
+                def check_any(
+                    value: Any, path: str, errors: List[str], options=options
+                ) -> None:
+                    for option in options:
+                        option_errors: List[str] = []
+                        option(value, path, option_errors)
+                        if not option_errors:
+                            return
+                    errors.append(f"{path}: does not match any allowed schema")
+
+                checks.append(check_any)
+        if "allOf" in schema:
+            parts = [build(part) for part in schema["allOf"]]
+
+            def check_all(value: Any, path: str, errors: List[str]) -> None:
+                for part in parts:
+                    part(value, path, errors)
+
+            checks.append(check_all)
+
+        properties = {
+            name: build(sub) for name, sub in schema.get("properties", {}).items()
+        }
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        extra = build(additional) if isinstance(additional, dict) else None
+        if properties or required or additional is not True:
+
+            def check_object(value: Any, path: str, errors: List[str]) -> None:
+                if not isinstance(value, dict):
+                    return
+                for name in required:
+                    if name not in value:
+                        errors.append(f"{path}: missing required property '{name}'")
+                for name, item in value.items():
+                    validator = properties.get(name)
+                    if validator is not None:
+                        validator(item, f"{path}.{name}", errors)
+                    elif additional is False:
+                        errors.append(f"{path}: unexpected property '{name}'")
+                    elif extra is not None:
+                        extra(item, f"{path}.{name}", errors)
+
+            checks.append(check_object)
+
+        if "items" in schema:
+            items = build(schema["items"])
+
+            def check_items(value: Any, path: str, errors: List[str]) -> None:
+                if isinstance(value, list):
+                    for index, item in enumerate(value):
+                        items(item, f"{path}[{index}]", errors)
+
+            checks.append(check_items)
+
+        bounds = [
+            ("minItems", list, len, lambda n, b: n >= b, "at least {} items"),
+            ("maxItems", list, len, lambda n, b: n <= b, "at most {} items"),
+            ("minLength", str, len, lambda n, b: n >= b, "at least {} characters"),
+            ("maxLength", str, len, lambda n, b: n <= b, "at most {} characters"),
+            ("minimum", (int, float), float, lambda n, b: n >= b, "at least {}"),
+            ("maximum", (int, float), float, lambda n, b: n <= b, "at most {}"),
+        ]
+        for key, kind, measure, ok, message in bounds:
+            if key in schema:
+
+                def check_bound(
+                    value: Any,
+                    path: str,
+                    errors: List[str],
+                    bound=schema[key],
+                    kind=kind,
+                    measure=measure,
+                    ok=ok,
+                    message=message,
+                ) -> None:
+                    if isinstance(value, kind) and not isinstance(value, bool):
+                        if not ok(measure(value), bound):
+                            errors.append(f"{path}: expected {message.format(bound)}")
+
+                checks.append(check_bound)
+
+        if "pattern" in schema:
+            pattern = re.compile(schema["pattern"])
+            checks.append(
+                lambda value, path, errors: not isinstance(value, str)
+                or pattern.search(value)
+                or errors.append(f"{path}: does not match {pattern.pattern!r}")
+            )
+
+        def validate(value: Any, path: str, errors: List[str]) -> None:
+            for check in checks:
+                check(value, path, errors)
+
+        return validate
+
+    validator = build(root)
+
+    def validate_root(value: Any) -> List[str]:
+        errors: List[str] = []
+        validator(value, "$", errors)
+        return errors
+
+    return validate_root
+
+
+class StructuredParser(JSONParser):
+    """Parser returning typed objects validated against a JSON Schema.
+
+    When used through ``Chat``, the schema also drives the provider's native
+    constrained output (OpenAI json_schema response format, Ollama ``format``,
+    a forced tool call on Claude), so responses are valid on the first call.
+    Responses that still fail validation raise StructuredOutputError.
+
+    Args:
+        schema: JSON Schema dictionary or a dataclass
+        name: Schema name sent to the provider (defaults to the dataclass name)
+        strict: Ask the provider to enforce the schema strictly; for
+            dataclasses this also marks every field as required
+        repair: Repair slightly broken JSON before validating it
+    """
+
+    def __init__(
+        self,
+        schema: Union[Dict[str, Any], Type[Any], None] = None,
+        name: Optional[str] = None,
+        strict: bool = False,
+        repair: bool = True,
+    ):
+        if schema is None:
+            raise ValueError("Structured parser requires a schema")
+        super().__init__(repair=repair)
+        self.type = "structured"
+        self.strict = strict
+        if isinstance(schema, dict):
+            self.model: Optional[Type[Any]] = None
+            self.json_schema = schema
+        else:
+            self.model = schema
+            self.json_schema = schema_from_dataclass(schema, strict=strict)
+        self.name = name or (self.model.__name__ if self.model else "response")
+        self._validate = compile_validator(self.json_schema)
+
+    def _build(self, response: str) -> ParsedResponse:
+        """Decode, validate and convert the response in one pass."""
+        payload = self._payload(response)
+        try:
+            data, repairs = self._load(payload)
+        except json.JSONDecodeError as e:
+            return ParsedResponse(
+                response,
+                format_text=lambda: payload,
+                ok=False,
+                errors=[f"$: invalid JSON ({e.msg} at position {e.pos})"],
+                truncated=self._truncated(response, []),
+            )
+        truncated = self._truncated(response, repairs)
+        errors = self._validate(data)
+        if errors:
+            return ParsedResponse(
+                response,
+                format_text=lambda: payload,
+                ok=False,
+                errors=errors,
+                repairs=repairs,
+                truncated=truncated,
+            )
+        return ParsedResponse(
+            response,
+            data=_from_data(self.model, data) if self.model else data,
+            format_text=lambda: json_backend.dumps_pretty(data),
+            extract_code=lambda: self._extract_code_blocks(data),
+            repairs=repairs,
+            truncated=truncated,
+        )
+
+    def parse_response(self, response: str) -> Any:
+        """Return the validated response as a typed object.
+
+        Raises:
+            StructuredOutputError: If the response is not valid JSON or does not
+                match the schema
+        """
+        parsed = self.parse(response)
+        if not parsed.ok:
+            raise StructuredOutputError(
+                "Response does not match the schema", parsed.errors, response
+            )
+        return parsed.data
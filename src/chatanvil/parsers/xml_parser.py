@@ -1,59 +1,149 @@
 import re
 import xml.etree.ElementTree as ET
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
+
 from .base import BaseParser
+from .completion import CompletionDetector, XMLRootDetector
+from .parsed import ParsedResponse
 
 
 class XMLParser(BaseParser):
-    """Parser for XML formatted responses."""
+    """Parser for XML formatted responses.
+
+    Args:
+        pretty: Re-indent valid XML in ``parse_response``; when False the XML
+            is returned as received
+        streaming: Extract code in a single streaming pass that frees elements
+            as it goes instead of building the whole tree; blocks are then
+            returned in document order and ``ParsedResponse.data`` is None
+    """
+
+    FENCE_PATTERN = re.compile(r"```xml\n(.*?)\n```", re.DOTALL)
+    CODE_TAGS = ("code", "source")
+    # Characters fed to the pull parser at a time in streaming mode
+    FEED_SIZE = 65536
 
-    def __init__(self):
+    def __init__(self, pretty: bool = True, streaming: bool = False):
         self.type = "xml"
+        self.pretty = pretty
+        self.streaming = streaming
 
-    def parse_response(self, response: str) -> str:
-        """Parse XML from response, including from markdown code blocks."""
+    def completion_detector(self) -> CompletionDetector:
+        """Responses are complete once the root element is closed."""
+        return XMLRootDetector()
+
+    def _build(self, response: str) -> ParsedResponse:
+        """Parse the XML once; formatting and code extraction reuse the tree."""
         # First try to extract XML from markdown code block
-        pattern = r"```xml\n(.*?)\n```"
-        match = re.search(pattern, response, re.DOTALL)
-        if match:
-            response = match.group(1)
+        match = self.FENCE_PATTERN.search(response)
+        payload = match.group(1) if match else response
+
+        if self.streaming:
+            return ParsedResponse(
+                response,
+                format_text=lambda: self._format(payload),
+                extract_code=lambda: self._stream_code_elements(payload),
+            )
 
         try:
-            root = ET.fromstring(response)
-            # Return pretty formatted XML
+            root = ET.fromstring(payload)
+        except ET.ParseError:
+            return ParsedResponse(response, format_text=lambda: payload, ok=False)
+        return ParsedResponse(
+            response,
+            data=root,
+            format_text=lambda: self._pretty(root) if self.pretty else payload,
+            extract_code=lambda: self._code_elements(root),
+        )
+
+    def _format(self, payload: str) -> str:
+        if not self.pretty:
+            return payload
+        try:
+            return self._pretty(ET.fromstring(payload))
+        except ET.ParseError:
+            return payload
+
+    @staticmethod
+    def _pretty(root: ET.Element) -> str:
+        """Return pretty formatted XML; the tree is re-indented in place."""
+        if not hasattr(ET, "indent"):
+            # ElementTree.indent is only available from Python 3.9
             from xml.dom import minidom
 
             xml_str = ET.tostring(root, encoding="unicode")
             return minidom.parseString(xml_str).toprettyxml(indent="  ")
+        ET.indent(root, space="  ")
+        return ET.tostring(root, encoding="unicode") + "\n"
+
+    def _code_elements(self, root: ET.Element) -> List[Dict[str, str]]:
+        code_blocks = []
+        # Look for code in common XML tags
+        for tag in self.CODE_TAGS:
+            for elem in root.findall(f".//{tag}"):
+                code_blocks.append(self._code_block(elem))
+        return code_blocks
+
+    @staticmethod
+    def _code_block(elem: ET.Element) -> Dict[str, str]:
+        return {
+            "language": elem.get("language", ""),
+            "content": elem.text.strip() if elem.text else "",
+        }
+
+    def _stream_code_elements(self, payload: str) -> List[Dict[str, str]]:
+        try:
+            return list(
+                self.iter_code(
+                    payload[i : i + self.FEED_SIZE]
+                    for i in range(0, len(payload), self.FEED_SIZE)
+                )
+            )
         except ET.ParseError:
-            return response
+            return []
+
+    def iter_code(self, chunks: Iterable[str]) -> Iterator[Dict[str, str]]:
+        """Extract code blocks from XML arriving in chunks, in document order.
+
+        Blocks are yielded as soon as their closing tag has been read, and
+        every finished element is detached from the tree, so memory stays
+        bounded by the nesting depth rather than the document size.
+
+        Args:
+            chunks: Pieces of an XML document, e.g. streamed response text
+
+        Raises:
+            xml.etree.ElementTree.ParseError: If the XML is malformed
+        """
+        parser = ET.XMLPullParser(events=("start", "end"))
+        open_elements: List[ET.Element] = []
+
+        def drain() -> Iterator[Dict[str, str]]:
+            for event, elem in parser.read_events():
+                if event == "start":
+                    open_elements.append(elem)
+                    continue
+                open_elements.pop()
+                # Only descendants of the root count, as with findall(".//code")
+                if open_elements and elem.tag in self.CODE_TAGS:
+                    yield self._code_block(elem)
+                if open_elements:
+                    # A finished element is always its parent's last child
+                    del open_elements[-1][-1]
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from drain()
+        parser.close()
+        yield from drain()
+
+    def parse_response(self, response: str) -> str:
+        """Parse XML from response, including from markdown code blocks."""
+        return self._parsed_text(response)
 
     def extract_code(self, response: str) -> List[Dict[str, str]]:
         """Extract code blocks from XML response.
 
         Looks for code in <code> or <source> tags.
         """
-        code_blocks = []
-        try:
-            # First try to extract XML from markdown block
-            pattern = r"```xml\n(.*?)\n```"
-            match = re.search(pattern, response, re.DOTALL)
-            if match:
-                response = match.group(1)
-
-            root = ET.fromstring(response)
-
-            # Look for code in common XML tags
-            for tag in ["code", "source"]:
-                for elem in root.findall(f".//{tag}"):
-                    code_blocks.append(
-                        {
-                            "language": elem.get("language", ""),
-                            "content": elem.text.strip() if elem.text else "",
-                        }
-                    )
-
-        except ET.ParseError:
-            pass
-
-        return code_blocks
+        return [dict(block) for block in self.parse(response).code_blocks]
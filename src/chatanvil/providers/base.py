@@ -1,10 +1,62 @@
+import asyncio
+import contextvars
+import functools
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from ..core.batch import BatchJob, BatchRequest, BatchResult
+
+
+# Text chunks of a streamed response; the generator returns the finish reason
+TextStream = Generator[str, None, Optional[str]]
+
+
+class ProviderResponse(str):
+    """Response text that also records why the model stopped generating.
+
+    Behaves like the text itself. ``finish_reason`` is normalised across
+    providers to "stop", "length", "tool_calls" or "content_filter", and is
+    None when the provider did not report one.
+    """
+
+    def __new__(cls, text: str, finish_reason: Optional[str] = None):
+        response = super().__new__(cls, text)
+        response.finish_reason = finish_reason
+        return response
+
+    def __reduce__(self):
+        return (self.__class__, (str(self), self.finish_reason))
+
+    @property
+    def truncated(self) -> bool:
+        """True if generation stopped at the max_tokens limit."""
+        return self.finish_reason == "length"
 
 
 class ChatProvider(ABC):
     """Base class for all chat providers."""
 
+    # Provider stop reasons that differ from ProviderResponse's normalised names
+    FINISH_REASONS: Dict[str, str] = {}
+
+    # Embedding model used when none is given, and the most texts one
+    # embeddings request may carry
+    EMBEDDING_MODEL: Optional[str] = None
+    EMBEDDING_BATCH_SIZE = 256
+
     def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
         self.api_key = api_key
         self.model = model
@@ -64,6 +116,242 @@ class ChatProvider(ABC):
         """
         pass
 
+    async def aget_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Union[str, Dict[str, Any]]:
+        """Get a chat completion without blocking the event loop.
+
+        Providers with an async SDK client override this. The default runs
+        get_chat_completion in the event loop's thread pool, under the
+        caller's request deadline.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Optional model override
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            **kwargs: Provider-specific parameters
+
+        Returns:
+            The model's response, either as a string or structured data
+        """
+        call = functools.partial(
+            self.get_chat_completion,
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+        # Run in a copy of the caller's context, which carries its deadline
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, context.run, call)
+
+    def _async_client(self, factory: Callable[[], Any]) -> Any:
+        """Return the provider's async SDK client for the running event loop.
+
+        httpx async clients are bound to the loop they first run on, so one
+        is created per loop with ``factory``.
+        """
+        loop = asyncio.get_running_loop()
+        clients = self.__dict__.setdefault(
+            "_async_clients", weakref.WeakKeyDictionary()
+        )
+        if loop not in clients:
+            clients[loop] = factory()
+        return clients[loop]
+
+    def stream_response(
+        self,
+        message: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a response from the chat provider as text chunks.
+
+        Args:
+            message: The user's message
+            model: Optional model override
+            system_prompt: Optional system prompt override
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            **kwargs: Provider-specific parameters
+
+        Returns:
+            Generator over the text chunks of the response, returning the
+            normalised finish reason when the stream ends
+        """
+        messages = []
+        if system_prompt or self.system_prompt:
+            messages.append(
+                {"role": "system", "content": system_prompt or self.system_prompt}
+            )
+        messages.append({"role": "user", "content": message})
+        return self.stream_chat_completion(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a chat completion as text chunks.
+
+        Providers without native streaming yield the whole completion as a
+        single chunk.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Optional model override
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            **kwargs: Provider-specific parameters
+
+        Returns:
+            Generator over the text chunks of the response, returning the
+            normalised finish reason when the stream ends
+        """
+        result = self.get_chat_completion(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+        if isinstance(result, str):
+            yield result
+        elif result is not None:
+            yield str(result)
+        return getattr(result, "finish_reason", None)
+
+    @staticmethod
+    def _stop_param(kwargs: Dict[str, Any], name: str = "stop") -> Dict[str, Any]:
+        """Move the provider-agnostic ``stop`` argument to the provider's parameter.
+
+        ``stop`` may be one sequence or a list of them; generation ends before
+        the first one produced. It is always passed on as a list.
+        """
+        stop = kwargs.pop("stop", None)
+        if stop:
+            kwargs[name] = [stop] if isinstance(stop, str) else list(stop)
+        return kwargs
+
+    def _finish_reason(self, finish_reason: Any) -> Optional[str]:
+        """Normalise a provider's stop reason to ProviderResponse's names."""
+        if not isinstance(finish_reason, str):
+            return None
+        return self.FINISH_REASONS.get(finish_reason, finish_reason)
+
+    def _with_finish_reason(self, text: Any, finish_reason: Any) -> Any:
+        """Wrap response text in a ProviderResponse with a normalised finish reason."""
+        if not isinstance(text, str):
+            return text
+        return ProviderResponse(text, self._finish_reason(finish_reason))
+
+    def structured_output_params(
+        self, schema: Dict[str, Any], name: str, strict: bool = False
+    ) -> Dict[str, Any]:
+        """Request parameters constraining the response to a JSON schema.
+
+        Providers without native constrained output return no parameters; the
+        response is still validated by the structured parser.
+
+        Args:
+            schema: JSON Schema the response must match
+            name: Name of the schema
+            strict: Ask the provider to enforce the schema strictly
+
+        Returns:
+            Keyword arguments to pass to get_response or get_chat_completion
+        """
+        return {}
+
+    def warmup(self, model: Optional[str] = None) -> None:
+        """Prepare the model ahead of the first request.
+
+        Local providers load the model into memory; hosted providers have
+        nothing to prepare.
+        """
+
+    def prewarm(self) -> None:
+        """Open a connection to the provider's API ahead of the first request.
+
+        Sends one lightweight request, listing models, whose connection then
+        stays in the SDK client's pool. Providers without a ``models`` API do
+        nothing.
+        """
+        models = getattr(getattr(self, "client", None), "models", None)
+        if models is not None:
+            models.list()
+
+    def embed_batch(
+        self, texts: List[str], model: Optional[str] = None, **kwargs: Any
+    ) -> List[Union[Sequence[float], bytes]]:
+        """Embed one batch of texts with a single request.
+
+        Batching, concurrency and caching are handled by the caller
+        (see ``chatanvil.core.embeddings.Embedder``).
+
+        Args:
+            texts: Texts to embed, at most EMBEDDING_BATCH_SIZE of them
+            model: Optional embedding model override
+            **kwargs: Provider-specific parameters
+
+        Returns:
+            One vector per text in input order, either as floats or as raw
+            little-endian float32 bytes
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support embeddings"
+        )
+
+    def create_batch(self, requests: Sequence["BatchRequest"]) -> "BatchJob":
+        """Submit requests to the provider's native batch API.
+
+        Args:
+            requests: Requests to run, each with a unique custom_id
+
+        Returns:
+            The created batch job
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support batch jobs"
+        )
+
+    def get_batch(self, batch_id: str) -> "BatchJob":
+        """Fetch the current state of a batch job."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support batch jobs"
+        )
+
+    def iter_batch_results(self, job: "BatchJob") -> Iterator["BatchResult"]:
+        """Stream the results of a finished batch job."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support batch jobs"
+        )
+
+    def cancel_batch(self, batch_id: str) -> "BatchJob":
+        """Request cancellation of a batch job."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support batch jobs"
+        )
+
     def set_system_prompt(self, prompt: str) -> None:
         """Set the system prompt for future conversations."""
         self.system_prompt = prompt
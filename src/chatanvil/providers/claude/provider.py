@@ -1,6 +1,12 @@
-from typing import Any, Dict, List, Optional
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
 import anthropic
-from ...providers.base import ChatProvider
+import httpx
+
+from ...core.batch import BatchJob, BatchRequest, BatchResult
+from ...providers.base import ChatProvider, TextStream
+from ...utils.http import sdk_client_options
 from ...utils.logging import ChatLogger
 from ...utils.retry import retry_on_rate_limit
 
@@ -8,13 +14,32 @@ from ...utils.retry import retry_on_rate_limit
 class ClaudeChat(ChatProvider):
     """Anthropic Claude provider implementation."""
 
+    FINISH_REASONS = {
+        "end_turn": "stop",
+        "stop_sequence": "stop",
+        "max_tokens": "length",
+        "tool_use": "tool_calls",
+        "refusal": "content_filter",
+    }
+
     def __init__(
-        self, api_key: Optional[str] = None, model: Optional[str] = None, **kwargs: Any
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
+        http_options: Optional[Dict[str, Any]] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        **kwargs: Any,
     ):
         self.logger = ChatLogger("claude")
+        self.base_url = base_url
+        self.http_client = http_client
+        self.http_options = http_options
+        self.async_http_client = async_http_client
         self.client = None
         if api_key:
-            self.client = anthropic.Client(api_key=api_key)
+            self.client = self._build_client(api_key)
         super().__init__(api_key, model)
 
     def _initialize(self) -> None:
@@ -22,7 +47,16 @@ class ClaudeChat(ChatProvider):
         if not self.api_key:
             raise ValueError("Claude API key is required")
         if not self.client:
-            self.client = anthropic.Client(api_key=self.api_key)
+            self.client = self._build_client(self.api_key)
+
+    def _build_client(self, api_key: str) -> anthropic.Client:
+        return anthropic.Client(
+            api_key=api_key,
+            base_url=self.base_url,
+            **sdk_client_options(
+                self.http_client, self.http_options, anthropic.DefaultHttpxClient
+            ),
+        )
 
     def validate_api_key(self) -> bool:
         """Validate the Claude API key by attempting to create a client."""
@@ -30,12 +64,53 @@ class ClaudeChat(ChatProvider):
             if not self.api_key:
                 return False
             if not self.client:
-                self.client = anthropic.Client(api_key=self.api_key)
+                self.client = self._build_client(self.api_key)
             return True
         except Exception as e:
             self.logger.log_error(e, "API key validation failed")
             return False
 
+    @staticmethod
+    def _split_system_message(
+        messages: List[Dict[str, str]],
+    ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """Separate the system message, which Claude takes as a top-level parameter."""
+        system_message = None
+        chat_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            else:
+                chat_messages.append(msg)
+        return system_message, chat_messages
+
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """Return the response text, or the JSON input of a tool call.
+
+        Structured output is requested as a forced tool call, whose arguments
+        are the structured response.
+        """
+        for block in response.content:
+            if getattr(block, "type", None) == "tool_use":
+                return json.dumps(block.input)
+        return response.content[0].text
+
+    def structured_output_params(
+        self, schema: Dict[str, Any], name: str, strict: bool = False
+    ) -> Dict[str, Any]:
+        """Constrain the response by forcing a call to a tool taking the schema."""
+        return {
+            "tools": [
+                {
+                    "name": name,
+                    "description": "Respond with structured output matching this schema.",
+                    "input_schema": schema,
+                }
+            ],
+            "tool_choice": {"type": "tool", "name": name},
+        }
+
     @retry_on_rate_limit
     def get_response(
         self,
@@ -61,9 +136,12 @@ class ClaudeChat(ChatProvider):
                 messages=[{"role": "user", "content": message}],
                 temperature=temperature,
                 max_tokens=max_tokens if max_tokens else 4000,
+                **self._stop_param(kwargs, "stop_sequences"),
             )
 
-            result = response.content[0].text
+            result = self._with_finish_reason(
+                self._response_text(response), response.stop_reason
+            )
             self.logger.log_response(result)
             return result
 
@@ -85,15 +163,7 @@ class ClaudeChat(ChatProvider):
             raise RuntimeError("Claude client not initialized")
 
         try:
-            # Extract system message if present
-            system_message = None
-            chat_messages = []
-
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_message = msg["content"]
-                else:
-                    chat_messages.append(msg)
+            system_message, chat_messages = self._split_system_message(messages)
 
             response = self.client.messages.create(
                 model=model or self.model,
@@ -101,12 +171,184 @@ class ClaudeChat(ChatProvider):
                 messages=chat_messages,
                 temperature=temperature,
                 max_tokens=max_tokens if max_tokens else 4000,
+                **self._stop_param(kwargs, "stop_sequences"),
+            )
+
+            result = self._with_finish_reason(
+                self._response_text(response), response.stop_reason
+            )
+            self.logger.log_response(result)
+            return result
+
+        except Exception as e:
+            self.logger.log_response("", error=e)
+            raise e
+
+    @retry_on_rate_limit
+    async def aget_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = 4000,
+        **kwargs: Any,
+    ) -> str:
+        """Get a chat completion from Claude with the async client."""
+        if not self.client:
+            raise RuntimeError("Claude client not initialized")
+
+        client = self._async_client(
+            lambda: anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                **sdk_client_options(
+                    self.async_http_client,
+                    self.http_options,
+                    anthropic.DefaultAsyncHttpxClient,
+                ),
+            )
+        )
+        try:
+            system_message, chat_messages = self._split_system_message(messages)
+
+            response = await client.messages.create(
+                model=model or self.model,
+                system=system_message,
+                messages=chat_messages,
+                temperature=temperature,
+                max_tokens=max_tokens if max_tokens else 4000,
+                **self._stop_param(kwargs, "stop_sequences"),
             )
 
-            result = response.content[0].text
+            result = self._with_finish_reason(
+                self._response_text(response), response.stop_reason
+            )
             self.logger.log_response(result)
             return result
 
         except Exception as e:
             self.logger.log_response("", error=e)
             raise e
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = 4000,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a chat completion from Claude."""
+        if not self.client:
+            raise RuntimeError("Claude client not initialized")
+
+        system_message, chat_messages = self._split_system_message(messages)
+        stream = self.client.messages.create(
+            model=model or self.model,
+            system=system_message,
+            messages=chat_messages,
+            temperature=temperature,
+            max_tokens=max_tokens if max_tokens else 4000,
+            stream=True,
+            **self._stop_param(kwargs, "stop_sequences"),
+        )
+        chunks = []
+        stop_reason = None
+        try:
+            for event in stream:
+                if event.type == "message_delta":
+                    stop_reason = event.delta.stop_reason
+                elif event.type != "content_block_delta":
+                    continue
+                elif event.delta.type == "text_delta":
+                    chunks.append(event.delta.text)
+                    yield event.delta.text
+                elif event.delta.type == "input_json_delta":
+                    # Structured output arrives as the forced tool call's input
+                    chunks.append(event.delta.partial_json)
+                    yield event.delta.partial_json
+        except Exception as e:
+            self.logger.log_response("", error=e)
+            raise
+        finally:
+            stream.close()
+        self.logger.log_response("".join(chunks))
+        return self._finish_reason(stop_reason)
+
+    def create_batch(self, requests: Sequence[BatchRequest]) -> BatchJob:
+        """Submit requests through the Message Batches API."""
+        if not self.client:
+            raise RuntimeError("Claude client not initialized")
+
+        batch_requests = []
+        for request in requests:
+            system_message, chat_messages = self._split_system_message(request.messages)
+            params = {
+                "model": request.model or self.model,
+                "messages": chat_messages,
+                "temperature": request.temperature,
+                "max_tokens": request.max_tokens if request.max_tokens else 4000,
+                **request.kwargs,
+            }
+            if system_message:
+                params["system"] = system_message
+            batch_requests.append({"custom_id": request.custom_id, "params": params})
+
+        try:
+            batch = self.client.messages.batches.create(requests=batch_requests)
+        except Exception as e:
+            self.logger.log_error(e, "Batch creation failed")
+            raise
+
+        job = self._to_batch_job(batch)
+        job.custom_ids = [request.custom_id for request in requests]
+        return job
+
+    def get_batch(self, batch_id: str) -> BatchJob:
+        """Fetch the current state of a message batch."""
+        return self._to_batch_job(self.client.messages.batches.retrieve(batch_id))
+
+    def cancel_batch(self, batch_id: str) -> BatchJob:
+        """Request cancellation of a message batch."""
+        return self._to_batch_job(self.client.messages.batches.cancel(batch_id))
+
+    def iter_batch_results(self, job: BatchJob) -> Iterator[BatchResult]:
+        """Stream message batch results as they are decoded."""
+        for entry in self.client.messages.batches.results(job.id):
+            result = entry.result
+            if result.type == "succeeded":
+                text = "".join(
+                    block.text
+                    for block in result.message.content
+                    if block.type == "text"
+                )
+                yield BatchResult(custom_id=entry.custom_id, response=text, raw=entry)
+            elif result.type == "errored":
+                yield BatchResult(
+                    custom_id=entry.custom_id,
+                    error=f"{result.error.error.type}: {result.error.error.message}",
+                    raw=entry,
+                )
+            else:
+                yield BatchResult(
+                    custom_id=entry.custom_id, error=f"Request {result.type}", raw=entry
+                )
+
+    @staticmethod
+    def _to_batch_job(batch: Any) -> BatchJob:
+        # A batch has "ended" once every request succeeded, errored, expired or
+        # was cancelled; per-request outcomes are reported in the results
+        counts = batch.request_counts
+        return BatchJob(
+            id=batch.id,
+            provider="claude",
+            status="completed" if batch.processing_status == "ended" else "in_progress",
+            request_counts={
+                "processing": counts.processing,
+                "succeeded": counts.succeeded,
+                "errored": counts.errored,
+                "canceled": counts.canceled,
+                "expired": counts.expired,
+            },
+            raw=batch,
+        )
@@ -1,6 +1,10 @@
 from typing import Any, Dict, List, Optional, Union
+
 import groq
-from ...providers.base import ChatProvider
+import httpx
+
+from ...providers.base import ChatProvider, TextStream
+from ...utils.http import sdk_client_options
 from ...utils.logging import ChatLogger
 from ...utils.retry import retry_on_rate_limit
 
@@ -9,12 +13,23 @@ class GroqChat(ChatProvider):
     """Groq provider implementation."""
 
     def __init__(
-        self, api_key: Optional[str] = None, model: Optional[str] = None, **kwargs: Any
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
+        http_options: Optional[Dict[str, Any]] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        **kwargs: Any,
     ):
         self.logger = ChatLogger("groq")
+        self.base_url = base_url
+        self.http_client = http_client
+        self.http_options = http_options
+        self.async_http_client = async_http_client
         self.client = None
         if api_key:
-            self.client = groq.Client(api_key=api_key)
+            self.client = self._build_client(api_key)
         super().__init__(api_key, model)
 
     def _initialize(self) -> None:
@@ -22,7 +37,16 @@ class GroqChat(ChatProvider):
         if not self.api_key:
             raise ValueError("Groq API key is required")
         if not self.client:
-            self.client = groq.Client(api_key=self.api_key)
+            self.client = self._build_client(self.api_key)
+
+    def _build_client(self, api_key: str) -> groq.Client:
+        return groq.Client(
+            api_key=api_key,
+            base_url=self.base_url,
+            **sdk_client_options(
+                self.http_client, self.http_options, groq.DefaultHttpxClient
+            ),
+        )
 
     def validate_api_key(self) -> bool:
         """Validate the Groq API key by attempting to create a client."""
@@ -30,7 +54,7 @@ class GroqChat(ChatProvider):
             if not self.api_key:
                 return False
             if not self.client:
-                self.client = groq.Client(api_key=self.api_key)
+                self.client = self._build_client(self.api_key)
             return True
         except Exception as e:
             self.logger.log_error(e, "API key validation failed")
@@ -66,9 +90,13 @@ class GroqChat(ChatProvider):
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens if max_tokens else None,
+                **self._stop_param(kwargs),
             )
 
-            result = response.choices[0].message.content
+            choice = response.choices[0]
+            result = self._with_finish_reason(
+                choice.message.content, choice.finish_reason
+            )
             self.logger.log_response(result)
             return result
 
@@ -95,12 +123,97 @@ class GroqChat(ChatProvider):
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens if max_tokens else None,
+                **self._stop_param(kwargs),
+            )
+
+            choice = response.choices[0]
+            result = self._with_finish_reason(
+                choice.message.content, choice.finish_reason
+            )
+            self.logger.log_response(result)
+            return result
+
+        except Exception as e:
+            self.logger.log_response("", error=e)
+            raise e
+
+    @retry_on_rate_limit
+    async def aget_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Get a chat completion from Groq with the async client."""
+        if not self.client:
+            raise RuntimeError("Groq client not initialized")
+
+        client = self._async_client(
+            lambda: groq.AsyncGroq(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                **sdk_client_options(
+                    self.async_http_client,
+                    self.http_options,
+                    groq.DefaultAsyncHttpxClient,
+                ),
+            )
+        )
+        try:
+            response = await client.chat.completions.create(
+                model=model or self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens if max_tokens else None,
+                **self._stop_param(kwargs),
             )
 
-            result = response.choices[0].message.content
+            choice = response.choices[0]
+            result = self._with_finish_reason(
+                choice.message.content, choice.finish_reason
+            )
             self.logger.log_response(result)
             return result
 
         except Exception as e:
             self.logger.log_response("", error=e)
             raise e
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a chat completion from Groq."""
+        if not self.client:
+            raise RuntimeError("Groq client not initialized")
+
+        stream = self.client.chat.completions.create(
+            model=model or self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens if max_tokens else None,
+            stream=True,
+            **self._stop_param(kwargs),
+        )
+        chunks = []
+        finish_reason = None
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self.logger.log_response("", error=e)
+            raise
+        finally:
+            stream.close()
+        self.logger.log_response("".join(chunks))
+        return self._finish_reason(finish_reason)
@@ -0,0 +1,92 @@
+"""
+Ollama context arrays kept per conversation.
+
+``/api/generate`` returns a ``context`` array of token ids encoding the whole
+conversation so far. Sending it back with only the next user message lets the
+server skip re-templating and re-tokenizing the history and, on the host that
+served the previous turn, reuse its KV cache instead of re-evaluating the
+prompt. Contexts are stored as compact int32 arrays, keyed by session id and
+a digest of the messages they encode, and evicted least recently used first.
+"""
+
+import hashlib
+import json
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+def history_digest(model: str, messages: Sequence[Dict[str, Any]]) -> bytes:
+    """Digest of a model and message history, used to check a context still applies."""
+    payload = json.dumps([model, list(messages)], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+class ContextStore:
+    """Bounded store of Ollama context arrays.
+
+    Args:
+        max_sessions: Most sessions to keep a context for
+        max_tokens: Most context tokens kept across all sessions (4 bytes each)
+    """
+
+    def __init__(self, max_sessions: int = 1000, max_tokens: int = 4_000_000):
+        self.max_sessions = max_sessions
+        self.max_tokens = max_tokens
+        self.tokens = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, array]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, session_id: str, model: str, messages: Sequence[Dict[str, Any]]
+    ) -> Optional[List[int]]:
+        """Return the context encoding exactly these messages, if it is stored."""
+        digest = history_digest(model, messages)
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry[0] != digest:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry[1].tolist()
+
+    def put(
+        self,
+        session_id: str,
+        model: str,
+        messages: Sequence[Dict[str, Any]],
+        context: Optional[Sequence[int]],
+    ) -> None:
+        """Store the context encoding these messages, replacing the session's last one."""
+        self.discard(session_id)
+        if not context or len(context) > self.max_tokens:
+            return
+        entry = (history_digest(model, messages), array("i", context))
+        with self._lock:
+            self._entries[session_id] = entry
+            self.tokens += len(entry[1])
+            while (
+                len(self._entries) > self.max_sessions or self.tokens > self.max_tokens
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.tokens -= len(evicted)
+
+    def discard(self, session_id: str) -> None:
+        """Forget a session's context."""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self.tokens -= len(entry[1])
+
+    def clear(self) -> None:
+        """Forget every context."""
+        with self._lock:
+            self._entries.clear()
+            self.tokens = 0
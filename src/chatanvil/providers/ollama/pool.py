@@ -0,0 +1,205 @@
+"""
+Load balancing across several Ollama hosts.
+
+Each request goes to the healthy host with the fewest outstanding requests,
+preferring hosts that already have the model loaded. Requests carrying a
+conversation id stick to the host that served the conversation before, whose
+KV cache still holds the prompt prefix. Hosts that fail repeatedly are ejected
+for a while; health checks through ``/api/ps`` re-admit them and refresh which
+models each host has loaded.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set
+
+from ollama import Client, ResponseError
+
+
+def model_key(name: str) -> str:
+    """Normalise a model name the way Ollama reports it, with a tag."""
+    return name if ":" in name else f"{name}:latest"
+
+
+def is_host_failure(error: BaseException) -> bool:
+    """Return True if an error means the host, not the request, is at fault."""
+    if isinstance(error, ResponseError):
+        return error.status_code >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # Transport errors from the HTTP client the SDK is built on
+    return type(error).__module__.split(".")[0] == "httpx"
+
+
+@dataclass
+class OllamaHost:
+    """One Ollama server and what the pool knows about it."""
+
+    url: str
+    client: Any
+    outstanding: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+    models: Set[str] = field(default_factory=set)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+
+class OllamaHostPool:
+    """Route requests across Ollama hosts.
+
+    Args:
+        hosts: Base URLs of the Ollama servers
+        max_failures: Consecutive failures after which a host is ejected
+        eject_seconds: How long an ejected host receives no requests
+        cold_penalty: Outstanding requests a host may have beyond the others
+            before a host without the model loaded is preferred over it
+        max_sessions: Most conversation ids remembered for sticky routing
+        client_factory: Builds the SDK client for a host URL
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        cold_penalty: int = 4,
+        max_sessions: int = 10_000,
+        client_factory: Callable[[str], Any] = lambda url: Client(host=url),
+    ):
+        if not hosts:
+            raise ValueError("At least one Ollama host is required")
+        self.hosts = [OllamaHost(url, client_factory(url)) for url in hosts]
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.cold_penalty = cold_penalty
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, OllamaHost]" = OrderedDict()
+        self._next = 0
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+        self._stop_health = threading.Event()
+
+    def select(self, model: str, session: Optional[str] = None) -> OllamaHost:
+        """Pick the host for a request and count it as outstanding.
+
+        Prefer ``acquire``, which also releases the host.
+        """
+        key = model_key(model)
+        with self._lock:
+            host = self._sessions.get(session) if session is not None else None
+            if host is None or not host.healthy:
+                candidates = [h for h in self.hosts if h.healthy] or self.hosts
+                count = len(self.hosts)
+                host = min(
+                    candidates,
+                    key=lambda h: (
+                        h.outstanding
+                        + h.failures
+                        + (0 if key in h.models else self.cold_penalty),
+                        # Rotate ties so idle hosts share the load
+                        (self.hosts.index(h) - self._next) % count,
+                    ),
+                )
+                self._next += 1
+            if session is not None:
+                self._sessions[session] = host
+                self._sessions.move_to_end(session)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            host.outstanding += 1
+            return host
+
+    def release(
+        self, host: OllamaHost, model: str, error: Optional[BaseException] = None
+    ) -> None:
+        """Finish a request, recording whether the host served it."""
+        with self._lock:
+            host.outstanding -= 1
+            if error is None:
+                host.failures = 0
+                host.models.add(model_key(model))
+            elif is_host_failure(error):
+                self._record_failure(host)
+
+    @contextmanager
+    def acquire(
+        self, model: str, session: Optional[str] = None
+    ) -> Iterator[OllamaHost]:
+        """Select a host for the duration of a request."""
+        host = self.select(model, session)
+        try:
+            yield host
+        except BaseException as e:
+            self.release(host, model, e)
+            raise
+        self.release(host, model)
+
+    def _record_failure(self, host: OllamaHost) -> None:
+        host.failures += 1
+        if host.failures >= self.max_failures:
+            host.ejected_until = time.monotonic() + self.eject_seconds
+
+    def check_health(self) -> Dict[str, bool]:
+        """Probe every host, re-admitting healthy ones and refreshing their models.
+
+        Returns:
+            Host URL to whether it answered
+        """
+        results = {}
+        for host in self.hosts:
+            try:
+                models = {model_key(m.name or m.model) for m in host.client.ps().models}
+            except Exception:
+                with self._lock:
+                    self._record_failure(host)
+                results[host.url] = False
+                continue
+            with self._lock:
+                host.models = models
+                host.failures = 0
+                host.ejected_until = 0.0
+            results[host.url] = True
+        return results
+
+    def start_health_checks(self, interval: float = 10.0) -> None:
+        """Check host health every ``interval`` seconds in a background thread."""
+        if self._health_thread is not None:
+            return
+        self._stop_health.clear()
+
+        def run() -> None:
+            while not self._stop_health.wait(interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(
+            target=run, name="chatanvil-ollama-health", daemon=True
+        )
+        self._health_thread.start()
+
+    def stop_health_checks(self) -> None:
+        """Stop the background health checks."""
+        if self._health_thread is None:
+            return
+        self._stop_health.set()
+        self._health_thread.join()
+        self._health_thread = None
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return the state of every host as plain dictionaries."""
+        with self._lock:
+            return [
+                {
+                    "url": host.url,
+                    "healthy": host.healthy,
+                    "outstanding": host.outstanding,
+                    "failures": host.failures,
+                    "models": sorted(host.models),
+                }
+                for host in self.hosts
+            ]
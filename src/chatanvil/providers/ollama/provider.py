@@ -1,33 +1,99 @@
-from typing import Any, Dict, List, Optional, Union
 import os
-from ollama import Client
-from ...providers.base import ChatProvider
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from ollama import AsyncClient, Client
+
+from ...providers.base import ChatProvider, TextStream
 from ...utils.logging import ChatLogger
 from ...utils.retry import retry_on_rate_limit
+from .context import ContextStore
+from .pool import OllamaHostPool, model_key
 
 
 class OllamaChat(ChatProvider):
-    """Ollama provider implementation using the official Python SDK."""
+    """Ollama provider implementation using the official Python SDK.
+
+    With several hosts (``hosts``, a comma-separated ``base_url`` or
+    ``OLLAMA_HOSTS``), requests are balanced across them by an
+    OllamaHostPool. Pass ``conversation_id`` with a request to keep a
+    conversation on the host that already holds its prompt prefix.
+
+    Pass ``session_id`` to get_chat_completion or stream_chat_completion to
+    continue a conversation from Ollama's returned context, sending only the
+    newest user message instead of the whole history.
+    """
+
+    EMBEDDING_MODEL = "nomic-embed-text"
+    EMBEDDING_BATCH_SIZE = 256
+
+    # Runtime options that change how a model is loaded; a request with
+    # different values makes Ollama reload the model
+    RUNTIME_OPTIONS = ("num_ctx", "num_thread", "num_gpu")
 
     def __init__(
         self,
         api_key: Optional[str] = None,  # Not used for Ollama
         model: Optional[str] = None,
         base_url: Optional[str] = None,
+        keep_alive: Optional[Union[str, float]] = None,
+        num_ctx: Optional[int] = None,
+        num_thread: Optional[int] = None,
+        num_gpu: Optional[int] = None,
+        hosts: Optional[Sequence[str]] = None,
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        health_check_interval: Optional[float] = None,
+        max_sessions: int = 1000,
+        max_session_tokens: int = 4_000_000,
+        http_options: Optional[Dict[str, Any]] = None,
         **kwargs: Any,
     ):
         self.logger = ChatLogger("ollama")
-        self.base_url = base_url or "http://localhost:11434"
-        self.client = Client(host=self.base_url)
+        # How long the server keeps the model loaded after a request, e.g.
+        # "30m"; a negative number keeps it loaded, 0 unloads it at once
+        self.keep_alive = keep_alive
+        self.runtime_options: Dict[str, int] = {
+            name: value
+            for name, value in (
+                ("num_ctx", num_ctx),
+                ("num_thread", num_thread),
+                ("num_gpu", num_gpu),
+            )
+            if value is not None
+        }
+        if not hosts:
+            hosts = (
+                base_url or os.getenv("OLLAMA_HOST", "http://localhost:11434")
+            ).split(",")
+        self.hosts = [host.strip() for host in hosts if host.strip()]
+        # The SDK builds its own httpx client per host, so a shared http_client
+        # cannot be used; the transport settings are applied to each instead
+        http_options = dict(http_options or {})
+        self.http_options = http_options
+        self.pool = OllamaHostPool(
+            self.hosts,
+            max_failures=max_failures,
+            eject_seconds=eject_seconds,
+            client_factory=lambda url: Client(host=url, **http_options),
+        )
+        self.base_url = self.hosts[0]
+        self.client = self.pool.hosts[0].client
+        self.contexts = ContextStore(max_sessions, max_session_tokens)
         super().__init__(api_key, model)
+        if health_check_interval:
+            self.pool.start_health_checks(health_check_interval)
 
     def _initialize(self) -> None:
         """Initialize the Ollama connection."""
-        try:
-            # Test connection by listing models
-            self.client.list()
-        except Exception as e:
-            raise ConnectionError(f"Failed to connect to Ollama: {str(e)}")
+        # Test connections, and learn which models each host has loaded
+        if not any(self.pool.check_health().values()):
+            raise ConnectionError(
+                f"Failed to connect to Ollama at {', '.join(self.hosts)}"
+            )
+
+    def _route(self, model: str, kwargs: Dict[str, Any]) -> Any:
+        """Pick the host for a request, sticky per ``conversation_id``."""
+        return self.pool.acquire(model, kwargs.pop("conversation_id", None))
 
     def validate_api_key(self) -> bool:
         """Validate the Ollama connection.
@@ -35,7 +101,8 @@ class OllamaChat(ChatProvider):
         Note: Ollama doesn't use API keys, so we just validate the connection.
         """
         try:
-            self.client.list()
+            for host in self.pool.hosts:
+                host.client.list()
             return True
         except Exception as e:
             self.logger.error(f"Connection validation failed: {str(e)}")
@@ -61,16 +128,19 @@ class OllamaChat(ChatProvider):
 
             messages.append({"role": "user", "content": message})
 
-            response = self.client.chat(
-                model=model or self.model or "llama3.1",
-                messages=messages,
-                options={
-                    "temperature": temperature,
-                    **({"num_predict": max_tokens} if max_tokens else {}),
-                },
-            )
+            model = model or self.model or "llama3.1"
+            with self._route(model, kwargs) as host:
+                response = host.client.chat(
+                    model=model,
+                    messages=messages,
+                    options=self._options(temperature, max_tokens, kwargs),
+                    format=kwargs.get("format"),
+                    keep_alive=self._keep_alive(kwargs),
+                )
 
-            result = response["message"]["content"]
+            result = self._with_finish_reason(
+                response["message"]["content"], response.get("done_reason")
+            )
             self.logger.log_response(result)
             return result
 
@@ -88,19 +158,276 @@ class OllamaChat(ChatProvider):
     ) -> str:
         """Get a chat completion from Ollama using the Python SDK."""
         try:
-            response = self.client.chat(
-                model=model or self.model or "llama2",
-                messages=messages,
-                options={
-                    "temperature": temperature,
-                    **({"num_predict": max_tokens} if max_tokens else {}),
-                },
+            model = model or self.model or "llama2"
+            session_id = kwargs.pop("session_id", None)
+            request = self._session_request(session_id, model, messages, kwargs)
+            with self._route(model, kwargs) as host:
+                if request is None:
+                    response = host.client.chat(
+                        model=model,
+                        messages=messages,
+                        options=self._options(temperature, max_tokens, kwargs),
+                        format=kwargs.get("format"),
+                        keep_alive=self._keep_alive(kwargs),
+                    )
+                    text = response["message"]["content"]
+                else:
+                    response = host.client.generate(
+                        model=model,
+                        options=self._options(temperature, max_tokens, kwargs),
+                        format=kwargs.get("format"),
+                        keep_alive=self._keep_alive(kwargs),
+                        **request,
+                    )
+                    text = response["response"]
+                    self._save_context(session_id, model, messages, text, response)
+
+            result = self._with_finish_reason(text, response.get("done_reason"))
+            self.logger.log_response(result)
+            return result
+
+        except Exception as e:
+            self.logger.log_response("", error=e)
+            raise e
+
+    @retry_on_rate_limit
+    async def aget_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Get a chat completion from Ollama with the async client.
+
+        Session requests update the shared context store and go through
+        get_chat_completion in the thread pool instead.
+        """
+        if kwargs.get("session_id") is not None:
+            return await super().aget_chat_completion(
+                messages, model, temperature, max_tokens, **kwargs
             )
+        clients = self._async_client(dict)
+        try:
+            model = model or self.model or "llama2"
+            with self._route(model, kwargs) as host:
+                if host.url not in clients:
+                    clients[host.url] = AsyncClient(host=host.url, **self.http_options)
+                response = await clients[host.url].chat(
+                    model=model,
+                    messages=messages,
+                    options=self._options(temperature, max_tokens, kwargs),
+                    format=kwargs.get("format"),
+                    keep_alive=self._keep_alive(kwargs),
+                )
 
-            result = response["message"]["content"]
+            result = self._with_finish_reason(
+                response["message"]["content"], response.get("done_reason")
+            )
             self.logger.log_response(result)
             return result
 
         except Exception as e:
             self.logger.log_response("", error=e)
             raise e
+
+    def _session_request(
+        self,
+        session_id: Optional[str],
+        model: str,
+        messages: List[Dict[str, str]],
+        kwargs: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """Build ``generate`` arguments that send only the newest user message.
+
+        Returns None when the request must send the full history through
+        ``chat``: without a session, when the history does not end with a user
+        message, or when no stored context matches the earlier messages
+        (evicted, edited, or produced by another model).
+        """
+        if session_id is None:
+            return None
+        # Keep the session on the host whose KV cache holds its context
+        kwargs.setdefault("conversation_id", session_id)
+        if not messages or messages[-1].get("role") != "user":
+            return None
+        *history, message = messages
+        context = self.contexts.get(session_id, model, history)
+        if context is not None:
+            return {"prompt": message["content"], "context": context}
+        if all(m.get("role") == "system" for m in history) and len(history) <= 1:
+            # First turn: start a new context
+            system = history[0]["content"] if history else None
+            return {"prompt": message["content"], "system": system}
+        self.contexts.discard(session_id)
+        return None
+
+    def _save_context(
+        self,
+        session_id: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        text: str,
+        response: Any,
+    ) -> None:
+        """Store the context returned for a session turn."""
+        history = list(messages) + [{"role": "assistant", "content": text}]
+        self.contexts.put(session_id, model, history, response.get("context"))
+
+    def _options(
+        self, temperature: float, max_tokens: Optional[int], kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the generation options, including stop sequences and runtime options."""
+        options: Dict[str, Any] = {"temperature": temperature}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        options.update(self.runtime_options)
+        for name in self.RUNTIME_OPTIONS:
+            if kwargs.get(name) is not None:
+                options[name] = kwargs.pop(name)
+        stop = self._stop_param(kwargs).get("stop")
+        if stop:
+            options["stop"] = stop
+        return options
+
+    def _keep_alive(self, kwargs: Dict[str, Any]) -> Optional[Union[str, float]]:
+        """Per-request keep_alive, falling back to the provider's setting."""
+        keep_alive = kwargs.pop("keep_alive", None)
+        return self.keep_alive if keep_alive is None else keep_alive
+
+    def warmup(self, model: Optional[str] = None) -> None:
+        """Load the model into memory with an empty prompt, on every healthy host.
+
+        Uses the provider's keep_alive and runtime options, so the first real
+        request finds the model loaded with the settings it needs.
+        """
+        model = model or self.model or "llama3.1"
+        for host in self.pool.hosts:
+            if not host.healthy:
+                continue
+            try:
+                host.client.generate(
+                    model=model,
+                    prompt="",
+                    options=self.runtime_options or None,
+                    keep_alive=self.keep_alive,
+                )
+            except Exception as e:
+                self.logger.log_error(e, f"Failed to load model {model} on {host.url}")
+                raise
+            host.models.add(model_key(model))
+
+    def prewarm(self) -> None:
+        """Open a connection to every host, refreshing which models they have loaded."""
+        self.pool.check_health()
+
+    def unload(self, model: Optional[str] = None) -> None:
+        """Unload the model from memory now, on every host."""
+        model = model or self.model or "llama3.1"
+        for host in self.pool.hosts:
+            host.client.generate(model=model, prompt="", keep_alive=0)
+            host.models.discard(model_key(model))
+
+    def resident_models(self) -> List[Dict[str, Any]]:
+        """Models currently loaded on the servers, as reported by ``/api/ps``.
+
+        Returns:
+            List of dicts with 'host', 'name', 'size', 'size_vram' (bytes) and
+            'expires_at' (when the model will be unloaded)
+        """
+        return [
+            {
+                "host": host.url,
+                "name": model.name or model.model,
+                "size": model.size,
+                "size_vram": model.size_vram,
+                "expires_at": model.expires_at,
+            }
+            for host in self.pool.hosts
+            for model in host.client.ps().models
+        ]
+
+    def is_resident(self, model: Optional[str] = None) -> bool:
+        """Return True if the model is currently loaded on any host."""
+        # Ollama reports names with a tag, e.g. "llama3.1:latest"
+        key = model_key(model or self.model or "llama3.1")
+        return any(model_key(entry["name"]) == key for entry in self.resident_models())
+
+    def structured_output_params(
+        self, schema: Dict[str, Any], name: str, strict: bool = False
+    ) -> Dict[str, Any]:
+        """Constrain the response with Ollama's JSON schema ``format``."""
+        return {"format": schema}
+
+    @retry_on_rate_limit
+    def embed_batch(
+        self, texts: List[str], model: Optional[str] = None, **kwargs: Any
+    ) -> List[List[float]]:
+        """Embed texts with one call to Ollama's ``/api/embed``."""
+        model = model or self.EMBEDDING_MODEL
+        keep_alive = self._keep_alive(kwargs)
+        try:
+            with self._route(model, kwargs) as host:
+                response = host.client.embed(
+                    model=model, input=texts, keep_alive=keep_alive, **kwargs
+                )
+        except Exception as e:
+            self.logger.log_error(e, "Embedding request failed")
+            raise
+        return list(response["embeddings"])
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a chat completion from Ollama using the Python SDK."""
+        model = model or self.model or "llama3.1"
+        session_id = kwargs.pop("session_id", None)
+        request = self._session_request(session_id, model, messages, kwargs)
+        chunks = []
+        part = None
+        # The host stays outstanding until the stream is consumed or closed
+        with self._route(model, kwargs) as host:
+            if request is None:
+                stream = host.client.chat(
+                    model=model,
+                    messages=messages,
+                    options=self._options(temperature, max_tokens, kwargs),
+                    format=kwargs.get("format"),
+                    keep_alive=self._keep_alive(kwargs),
+                    stream=True,
+                )
+            else:
+                stream = host.client.generate(
+                    model=model,
+                    options=self._options(temperature, max_tokens, kwargs),
+                    format=kwargs.get("format"),
+                    keep_alive=self._keep_alive(kwargs),
+                    stream=True,
+                    **request,
+                )
+            try:
+                for part in stream:
+                    text = (
+                        part["message"]["content"]
+                        if request is None
+                        else part["response"]
+                    )
+                    if text:
+                        chunks.append(text)
+                        yield text
+            except Exception as e:
+                self.logger.log_response("", error=e)
+                raise
+            finally:
+                stream.close()
+        if request is not None and part is not None:
+            # The final part carries the context; a closed stream never gets here
+            self._save_context(session_id, model, messages, "".join(chunks), part)
+        self.logger.log_response("".join(chunks))
+        return self._finish_reason(None if part is None else part.get("done_reason"))
@@ -1,7 +1,14 @@
-from typing import Any, Dict, List, Optional, Union
+import base64
+import json
 import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import httpx
 import openai
-from ...providers.base import ChatProvider
+
+from ...core.batch import BatchJob, BatchRequest, BatchResult
+from ...providers.base import ChatProvider, TextStream
+from ...utils.http import sdk_client_options
 from ...utils.logging import ChatLogger
 from ...utils.retry import retry_on_rate_limit
 
@@ -9,9 +16,35 @@ from ...utils.retry import retry_on_rate_limit
 class OpenAIChat(ChatProvider):
     """OpenAI chat provider implementation."""
 
+    # OpenAI batch statuses mapped onto BatchJob's normalised statuses
+    BATCH_STATUSES = {
+        "validating": "in_progress",
+        "in_progress": "in_progress",
+        "finalizing": "in_progress",
+        "cancelling": "in_progress",
+        "completed": "completed",
+        "failed": "failed",
+        "expired": "expired",
+        "cancelled": "cancelled",
+    }
+
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    EMBEDDING_BATCH_SIZE = 2048
+
     def __init__(
-        self, api_key: Optional[str] = None, model: Optional[str] = None, **kwargs: Any
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None,
+        http_options: Optional[Dict[str, Any]] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        **kwargs: Any,
     ):
+        self.base_url = base_url
+        self.http_client = http_client
+        self.http_options = http_options
+        self.async_http_client = async_http_client
         super().__init__(api_key, model)
         self.logger = ChatLogger("openai")
 
@@ -26,7 +59,14 @@ class OpenAIChat(ChatProvider):
                 "OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass api_key."
             )
 
-        self.client = openai.OpenAI(api_key=api_key)
+        # base_url=None lets the SDK fall back to OPENAI_BASE_URL or its default
+        self.client = openai.OpenAI(
+            api_key=api_key,
+            base_url=self.base_url,
+            **sdk_client_options(
+                self.http_client, self.http_options, openai.DefaultHttpxClient
+            ),
+        )
 
     @retry_on_rate_limit
     def get_response(
@@ -59,10 +99,13 @@ class OpenAIChat(ChatProvider):
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                **kwargs,
+                **self._stop_param(kwargs),
             )
 
-            result = response.choices[0].message.content
+            choice = response.choices[0]
+            result = self._with_finish_reason(
+                choice.message.content, choice.finish_reason
+            )
             self.logger.log_response(result)
             return result
 
@@ -90,15 +133,245 @@ class OpenAIChat(ChatProvider):
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                **kwargs,
+                **self._stop_param(kwargs),
             )
 
-            return response.choices[0].message.content
+            choice = response.choices[0]
+            return self._with_finish_reason(
+                choice.message.content, choice.finish_reason
+            )
 
         except Exception as e:
             self.logger.log_error(e, "Chat completion failed")
             raise
 
+    @retry_on_rate_limit
+    async def aget_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Union[str, Dict[str, Any]]:
+        """Get a chat completion from OpenAI with the async client."""
+        if not hasattr(self, "client"):
+            self._initialize()
+
+        client = self._async_client(
+            lambda: openai.AsyncOpenAI(
+                api_key=self.client.api_key,
+                base_url=self.client.base_url,
+                **sdk_client_options(
+                    self.async_http_client,
+                    self.http_options,
+                    openai.DefaultAsyncHttpxClient,
+                ),
+            )
+        )
+        try:
+            response = await client.chat.completions.create(
+                model=model or self.model or "gpt-4",
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **self._stop_param(kwargs),
+            )
+
+            choice = response.choices[0]
+            return self._with_finish_reason(
+                choice.message.content, choice.finish_reason
+            )
+
+        except Exception as e:
+            self.logger.log_error(e, "Chat completion failed")
+            raise
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a chat completion from OpenAI."""
+        if not hasattr(self, "client"):
+            self._initialize()
+
+        stream = self.client.chat.completions.create(
+            model=model or self.model or "gpt-4",
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **self._stop_param(kwargs),
+        )
+        chunks = []
+        finish_reason = None
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self.logger.log_error(e, "Streaming chat completion failed")
+            raise
+        finally:
+            # Closing the stream releases the upstream connection early
+            stream.close()
+        self.logger.log_response("".join(chunks))
+        return self._finish_reason(finish_reason)
+
+    def structured_output_params(
+        self, schema: Dict[str, Any], name: str, strict: bool = False
+    ) -> Dict[str, Any]:
+        """Constrain the response with a json_schema response format."""
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": name, "schema": schema, "strict": strict},
+            }
+        }
+
+    @retry_on_rate_limit
+    def embed_batch(
+        self, texts: List[str], model: Optional[str] = None, **kwargs: Any
+    ) -> List[bytes]:
+        """Embed texts with one embeddings request.
+
+        Vectors are requested base64-encoded and returned as raw float32
+        bytes, which skips building a Python float for every dimension.
+        """
+        if not hasattr(self, "client"):
+            self._initialize()
+
+        try:
+            response = self.client.embeddings.create(
+                model=model or self.EMBEDDING_MODEL,
+                input=texts,
+                encoding_format="base64",
+                **kwargs,
+            )
+        except Exception as e:
+            self.logger.log_error(e, "Embedding request failed")
+            raise
+
+        items = sorted(response.data, key=lambda item: item.index)
+        return [
+            (
+                base64.b64decode(item.embedding)
+                if isinstance(item.embedding, str)
+                else item.embedding
+            )
+            for item in items
+        ]
+
+    def create_batch(
+        self, requests: Sequence[BatchRequest], completion_window: str = "24h"
+    ) -> BatchJob:
+        """Upload requests as a JSONL file and start an OpenAI batch job."""
+        if not hasattr(self, "client"):
+            self._initialize()
+
+        lines = []
+        for request in requests:
+            body = {
+                "model": request.model or self.model or "gpt-4",
+                "messages": request.messages,
+                "temperature": request.temperature,
+                **request.kwargs,
+            }
+            if request.max_tokens:
+                body["max_tokens"] = request.max_tokens
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": request.custom_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body,
+                    }
+                )
+            )
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+
+        try:
+            input_file = self.client.files.create(
+                file=("batch.jsonl", payload), purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window=completion_window,
+            )
+        except Exception as e:
+            self.logger.log_error(e, "Batch creation failed")
+            raise
+
+        job = self._to_batch_job(batch)
+        job.custom_ids = [request.custom_id for request in requests]
+        return job
+
+    def get_batch(self, batch_id: str) -> BatchJob:
+        """Fetch the current state of an OpenAI batch job."""
+        return self._to_batch_job(self.client.batches.retrieve(batch_id))
+
+    def cancel_batch(self, batch_id: str) -> BatchJob:
+        """Request cancellation of an OpenAI batch job."""
+        return self._to_batch_job(self.client.batches.cancel(batch_id))
+
+    def iter_batch_results(self, job: BatchJob) -> Iterator[BatchResult]:
+        """Stream results from the batch output and error files."""
+        batch = job.raw
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            with self.client.files.with_streaming_response.content(file_id) as response:
+                for line in response.iter_lines():
+                    if line.strip():
+                        yield self._parse_batch_line(json.loads(line))
+
+    def _to_batch_job(self, batch: Any) -> BatchJob:
+        counts = batch.request_counts
+        return BatchJob(
+            id=batch.id,
+            provider="openai",
+            status=self.BATCH_STATUSES.get(batch.status, "in_progress"),
+            request_counts=(
+                {
+                    "total": counts.total,
+                    "completed": counts.completed,
+                    "failed": counts.failed,
+                }
+                if counts
+                else {}
+            ),
+            raw=batch,
+        )
+
+    @staticmethod
+    def _parse_batch_line(item: Dict[str, Any]) -> BatchResult:
+        """Convert one line of a batch output or error file into a BatchResult."""
+        response = item.get("response") or {}
+        body = response.get("body") or {}
+        status = response.get("status_code")
+        if item.get("error") or status != 200:
+            error = item.get("error") or body.get("error") or {}
+            message = error.get("message") if isinstance(error, dict) else str(error)
+            return BatchResult(
+                custom_id=item["custom_id"],
+                error=f"HTTP {status}: {message}" if status else str(message),
+                raw=item,
+            )
+        return BatchResult(
+            custom_id=item["custom_id"],
+            response=body["choices"][0]["message"]["content"],
+            raw=item,
+        )
+
     def validate_api_key(self) -> bool:
         """Validate the OpenAI API key."""
         try:
@@ -0,0 +1,3 @@
+from .provider import OpenAICompatibleChat
+
+__all__ = ["OpenAICompatibleChat"]
@@ -0,0 +1,355 @@
+import itertools
+import os
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import httpx
+import openai
+
+from ...providers.base import ChatProvider, TextStream
+from ...utils.http import sdk_client_options
+from ...utils.logging import ChatLogger
+from ...utils.retry import retry_on_rate_limit
+
+
+class OpenAICompatibleChat(ChatProvider):
+    """Provider for self-hosted servers speaking the OpenAI API.
+
+    Works with vLLM, llama.cpp server, TGI and similar servers. Requests are
+    spread over one or more base URLs, and each has a connection pool sized
+    for many concurrent requests, so servers doing continuous batching see
+    the whole load at once. The provider is safe to share between threads.
+
+    Server-specific parameters the OpenAI SDK does not know (``best_of``,
+    ``guided_json``, ``cache_prompt``, ...) are sent in the request body.
+    """
+
+    # Sampling and decoding parameters of the OpenAI API itself; any other
+    # keyword argument is a server extension and goes into the request body
+    OPENAI_PARAMS = frozenset(
+        {
+            "frequency_penalty",
+            "logit_bias",
+            "logprobs",
+            "top_logprobs",
+            "n",
+            "presence_penalty",
+            "response_format",
+            "seed",
+            "stop",
+            "stream_options",
+            "top_p",
+            "tools",
+            "tool_choice",
+            "parallel_tool_calls",
+            "user",
+            "extra_headers",
+            "extra_query",
+            "extra_body",
+            "timeout",
+        }
+    )
+
+    EMBEDDING_BATCH_SIZE = 256
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        base_url: Optional[Union[str, Sequence[str]]] = None,
+        model_map: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        extra_body: Optional[Dict[str, Any]] = None,
+        embedding_model: Optional[str] = None,
+        max_connections: int = 256,
+        http_client: Optional[httpx.Client] = None,
+        http_options: Optional[Dict[str, Any]] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        **kwargs: Any,
+    ):
+        if base_url is None:
+            base_url = os.getenv(
+                "OPENAI_COMPATIBLE_BASE_URL", "http://localhost:8000/v1"
+            )
+        if isinstance(base_url, str):
+            base_url = base_url.split(",")
+        self.base_urls = [url.strip() for url in base_url if url.strip()]
+        # Model names as the caller knows them -> names the server serves
+        self.model_map = dict(model_map or {})
+        self.headers = dict(headers or {})
+        # Server extensions sent with every request, e.g. {"cache_prompt": True}
+        self.extra_body = dict(extra_body or {})
+        # Servers name their embedding models freely, so there is no default;
+        # the chat model would be rejected by /embeddings
+        self.EMBEDDING_MODEL = embedding_model or os.getenv(
+            "OPENAI_COMPATIBLE_EMBEDDING_MODEL"
+        )
+        self.max_connections = max_connections
+        self.http_client = http_client
+        self.http_options = http_options
+        self.async_http_client = async_http_client
+        self._next = itertools.count()
+        super().__init__(api_key, model)
+        self.logger = ChatLogger("openai_compatible")
+
+    def _initialize(self):
+        """Create one OpenAI client per base URL."""
+        # Self-hosted servers usually accept any key, but the SDK requires one
+        api_key = self.api_key or os.getenv("OPENAI_COMPATIBLE_API_KEY") or "EMPTY"
+        self.clients = [
+            openai.OpenAI(
+                api_key=api_key,
+                base_url=url,
+                default_headers=self.headers or None,
+                **sdk_client_options(
+                    self.http_client,
+                    self.http_options,
+                    openai.DefaultHttpxClient,
+                    # Keep every connection alive so bursts do not reconnect
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                ),
+            )
+            for url in self.base_urls
+        ]
+        self.client = self.clients[0]
+
+    def _index(self, kwargs: Dict[str, Any]) -> int:
+        """Pick the server for a request.
+
+        Requests with a ``conversation_id`` always go to the same server, whose
+        prefix cache holds the conversation; others rotate over the servers.
+        """
+        conversation_id = kwargs.pop("conversation_id", None)
+        if conversation_id is not None:
+            index = zlib.crc32(str(conversation_id).encode("utf-8"))
+        else:
+            index = next(self._next)
+        return index % len(self.clients)
+
+    def _client(self, kwargs: Dict[str, Any]) -> openai.OpenAI:
+        """Pick the client for a request."""
+        return self.clients[self._index(kwargs)]
+
+    def _async_clients(self) -> List[openai.AsyncOpenAI]:
+        """Async clients for the running event loop, one per base URL."""
+        return self._async_client(
+            lambda: [
+                openai.AsyncOpenAI(
+                    api_key=client.api_key,
+                    base_url=client.base_url,
+                    default_headers=self.headers or None,
+                    **sdk_client_options(
+                        self.async_http_client,
+                        self.http_options,
+                        openai.DefaultAsyncHttpxClient,
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                        ),
+                    ),
+                )
+                for client in self.clients
+            ]
+        )
+
+    def _model(self, model: Optional[str]) -> str:
+        """Map a model name to the one the server serves.
+
+        Without a configured model, the first model the server lists is used,
+        which suits servers that serve a single model.
+        """
+        model = model or self.model
+        if model is None:
+            model = self.model = self.client.models.list().data[0].id
+        return self.model_map.get(model, model)
+
+    def _request_params(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Split keyword arguments into SDK parameters and server extensions."""
+        params = self._stop_param(kwargs)
+        extra_body = {**self.extra_body, **params.pop("extra_body", {})}
+        for name in list(params):
+            if name not in self.OPENAI_PARAMS:
+                extra_body[name] = params.pop(name)
+        if extra_body:
+            params["extra_body"] = extra_body
+        return params
+
+    @retry_on_rate_limit
+    def get_response(
+        self,
+        message: str,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Get a response from the server."""
+        self.logger.log_request(message, model, system_prompt)
+
+        try:
+            messages = []
+            if system_prompt or self.system_prompt:
+                messages.append(
+                    {"role": "system", "content": system_prompt or self.system_prompt}
+                )
+
+            messages.append({"role": "user", "content": message})
+
+            result = self._complete(messages, model, temperature, max_tokens, kwargs)
+            self.logger.log_response(result)
+            return result
+
+        except Exception as e:
+            self.logger.log_response("", error=e)
+            raise
+
+    @retry_on_rate_limit
+    def get_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Get a chat completion from the server."""
+        try:
+            return self._complete(messages, model, temperature, max_tokens, kwargs)
+        except Exception as e:
+            self.logger.log_error(e, "Chat completion failed")
+            raise
+
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        kwargs: Dict[str, Any],
+    ) -> str:
+        client = self._client(kwargs)
+        response = client.chat.completions.create(
+            model=self._model(model),
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **self._request_params(kwargs),
+        )
+        choice = response.choices[0]
+        return self._with_finish_reason(choice.message.content, choice.finish_reason)
+
+    @retry_on_rate_limit
+    async def aget_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Get a chat completion from the server with the async clients."""
+        client = self._async_clients()[self._index(kwargs)]
+        try:
+            if model is None and self.model is None:
+                self.model = (await client.models.list()).data[0].id
+            response = await client.chat.completions.create(
+                model=self._model(model),
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **self._request_params(kwargs),
+            )
+        except Exception as e:
+            self.logger.log_error(e, "Chat completion failed")
+            raise
+        choice = response.choices[0]
+        return self._with_finish_reason(choice.message.content, choice.finish_reason)
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a chat completion from the server."""
+        client = self._client(kwargs)
+        stream = client.chat.completions.create(
+            model=self._model(model),
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **self._request_params(kwargs),
+        )
+        chunks = []
+        finish_reason = None
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self.logger.log_error(e, "Streaming chat completion failed")
+            raise
+        finally:
+            # Closing the stream aborts generation on the server
+            stream.close()
+        self.logger.log_response("".join(chunks))
+        return self._finish_reason(finish_reason)
+
+    def structured_output_params(
+        self, schema: Dict[str, Any], name: str, strict: bool = False
+    ) -> Dict[str, Any]:
+        """Constrain the response with a json_schema response format.
+
+        vLLM, llama.cpp server and TGI all turn this into guided decoding.
+        """
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": name, "schema": schema, "strict": strict},
+            }
+        }
+
+    @retry_on_rate_limit
+    def embed_batch(
+        self, texts: List[str], model: Optional[str] = None, **kwargs: Any
+    ) -> List[List[float]]:
+        """Embed texts with one embeddings request."""
+        model = model or self.EMBEDDING_MODEL
+        client = self._client(kwargs)
+        try:
+            response = client.embeddings.create(
+                model=self.model_map.get(model, model),
+                input=texts,
+                encoding_format="float",
+                **kwargs,
+            )
+        except Exception as e:
+            self.logger.log_error(e, "Embedding request failed")
+            raise
+        items = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in items]
+
+    def prewarm(self) -> None:
+        """Open a connection to every server."""
+        for client in self.clients:
+            client.models.list()
+
+    def validate_api_key(self) -> bool:
+        """Validate the key by listing models on every server."""
+        try:
+            for client in self.clients:
+                client.models.list()
+            return True
+        except Exception as e:
+            self.logger.log_error(e, "API key validation failed")
+            return False
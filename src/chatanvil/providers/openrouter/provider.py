@@ -1,27 +1,39 @@
-from typing import Dict, List, Optional, Any, Union, Tuple
-from openai import OpenAI
 import os
-from ...providers.base import ChatProvider
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+
+from ...providers.base import ChatProvider, TextStream
+from ...utils.http import sdk_client_options
 from ...utils.logging import ChatLogger
 from ...utils.retry import retry_on_rate_limit
 
+
 class OpenRouterChat(ChatProvider):
     """
     OpenRouter chat provider implementation.
     """
 
+    EMBEDDING_MODEL = "openai/text-embedding-3-small"
+    EMBEDDING_BATCH_SIZE = 2048
+
     def __init__(
-        self, 
-        api_key: Optional[str] = None, 
+        self,
+        api_key: Optional[str] = None,
         model: Optional[str] = None,
         base_url: str = "https://openrouter.ai/api/v1",
         referer: Optional[str] = None,
         title: Optional[str] = None,
         reasoning: bool = True,
-        **kwargs: Any
+        http_client: Optional[httpx.Client] = None,
+        http_options: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
     ):
-        
+
         self.base_url = base_url
+        self.http_client = http_client
+        self.http_options = http_options
         self.referer = referer
         self.title = title
         super().__init__(api_key, model)
@@ -39,6 +51,9 @@ class OpenRouterChat(ChatProvider):
         self.client = OpenAI(
             base_url=self.base_url,
             api_key=api_key,
+            **sdk_client_options(
+                self.http_client, self.http_options, DefaultHttpxClient
+            ),
         )
 
     @retry_on_rate_limit
@@ -74,7 +89,7 @@ class OpenRouterChat(ChatProvider):
                 temperature=temperature,
                 reasoning=reasoning,
                 max_tokens=max_tokens,
-                **kwargs
+                **kwargs,
             )
 
             self.logger.log_response(response)
@@ -106,22 +121,98 @@ class OpenRouterChat(ChatProvider):
                 kwargs["include_reasoning"] = True
 
             response = self.client.chat.completions.create(
-                model=model or self.model or "microsoft/phi-3-medium-128k-instruct:free",
+                model=model
+                or self.model
+                or "microsoft/phi-3-medium-128k-instruct:free",
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 extra_headers=extra_headers,
-                **kwargs,
+                **self._stop_param(kwargs),
+            )
+            choice = response.choices[0]
+            content = self._with_finish_reason(
+                choice.message.content, choice.finish_reason
             )
             if reasoning:
-                return (response.choices[0].message.content, response.choices[0].message.reasoning)
+                return (content, choice.message.reasoning)
             else:
-                return response.choices[0].message.content
+                return content
 
         except Exception as e:
             self.logger.log_error(e, "Chat completion failed")
             raise
 
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        max_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> TextStream:
+        """Stream a chat completion from OpenRouter. Reasoning tokens are not streamed."""
+        kwargs.pop("reasoning", None)
+        extra_headers = {}
+        if self.referer:
+            extra_headers["HTTP-Referer"] = self.referer
+        if self.title:
+            extra_headers["X-Title"] = self.title
+
+        stream = self.client.chat.completions.create(
+            model=model or self.model or "microsoft/phi-3-medium-128k-instruct:free",
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            extra_headers=extra_headers,
+            stream=True,
+            **self._stop_param(kwargs),
+        )
+        chunks = []
+        finish_reason = None
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self.logger.log_error(e, "Streaming chat completion failed")
+            raise
+        finally:
+            stream.close()
+        self.logger.log_response("".join(chunks))
+        return self._finish_reason(finish_reason)
+
+    @retry_on_rate_limit
+    def embed_batch(
+        self, texts: List[str], model: Optional[str] = None, **kwargs: Any
+    ) -> List[List[float]]:
+        """Embed texts with one request to OpenRouter's embeddings endpoint."""
+        extra_headers = {}
+        if self.referer:
+            extra_headers["HTTP-Referer"] = self.referer
+        if self.title:
+            extra_headers["X-Title"] = self.title
+
+        try:
+            response = self.client.embeddings.create(
+                model=model or self.EMBEDDING_MODEL,
+                input=texts,
+                encoding_format="float",
+                extra_headers=extra_headers,
+                **kwargs,
+            )
+        except Exception as e:
+            self.logger.log_error(e, "Embedding request failed")
+            raise
+
+        return [
+            item.embedding
+            for item in sorted(response.data, key=lambda item: item.index)
+        ]
+
     def validate_api_key(self) -> bool:
         """Validate the OpenRouter API key."""
         try:
@@ -0,0 +1,13 @@
+"""
+Local stand-in servers for offline load and behaviour testing.
+"""
+
+from .profiles import LatencyDistribution, ServerBehavior
+from .server import MockProviderServer, MockServerStats
+
+__all__ = [
+    "LatencyDistribution",
+    "ServerBehavior",
+    "MockProviderServer",
+    "MockServerStats",
+]
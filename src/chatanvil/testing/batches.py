@@ -0,0 +1,316 @@
+"""
+Batch endpoints of the mock provider server.
+
+Implements enough of the OpenAI Files/Batch API and the Anthropic Message
+Batches API for batch clients to run end to end. Every line of a batch goes
+through the server's fault injection, so partial failures can be exercised.
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .wire import AnthropicWire, OpenAIWire
+
+if TYPE_CHECKING:
+    from .server import MockProviderServer, _Handler
+
+
+def parse_multipart(
+    content_type: str, body: bytes
+) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """Parse a multipart/form-data body into {field: (filename, content)}."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+    return fields
+
+
+class BatchStore:
+    """In-memory files and batch jobs for one mock server."""
+
+    def __init__(self, server: "MockProviderServer"):
+        self.server = server
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.routes = [
+            ("POST", re.compile(r".*/messages/batches$"), self._create_anthropic),
+            (
+                "GET",
+                re.compile(r".*/messages/batches/([^/]+)/results$"),
+                self._anthropic_results,
+            ),
+            (
+                "POST",
+                re.compile(r".*/messages/batches/([^/]+)/cancel$"),
+                self._cancel_anthropic,
+            ),
+            ("GET", re.compile(r".*/messages/batches/([^/]+)$"), self._get_anthropic),
+            ("POST", re.compile(r".*/files$"), self._upload_file),
+            ("GET", re.compile(r".*/files/([^/]+)/content$"), self._file_content),
+            ("POST", re.compile(r".*/batches$"), self._create_openai),
+            ("POST", re.compile(r".*/batches/([^/]+)/cancel$"), self._cancel_openai),
+            ("GET", re.compile(r".*/batches/([^/]+)$"), self._get_openai),
+        ]
+
+    def handle(self, handler: "_Handler", method: str, path: str, raw: bytes) -> bool:
+        """Serve a batch or file route; return False if the path is not one."""
+        for route_method, pattern, action in self.routes:
+            match = pattern.match(path)
+            if match and method == route_method:
+                action(handler, raw, *match.groups())
+                return True
+        return False
+
+    # -- shared ----------------------------------------------------------------
+
+    def _run_line(self, wire: Any, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Produce (status, response body) for one batch line."""
+        fault = self.server._roll_fault()
+        if fault is not None:
+            return fault, wire.error(fault, f"Injected error with status {fault}")
+        tokens, finish_reason = self.server._response_tokens(wire, body)
+        ctx = self.server._new_context(wire, body, tokens, finish_reason)
+        return 200, wire.response(ctx, "".join(tokens))
+
+    def _new_batch(
+        self, provider: str, items: List[Tuple[str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        wire = OpenAIWire() if provider == "openai" else AnthropicWire()
+        prefix = "batch" if provider == "openai" else "msgbatch"
+        batch = {
+            "id": f"{prefix}_{uuid.uuid4().hex[:24]}",
+            "created": time.time(),
+            "ready_at": time.time() + self.server.behavior.batch_completion_time,
+            "cancelled": False,
+            "results": [
+                (custom_id,) + self._run_line(wire, body) for custom_id, body in items
+            ],
+        }
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        return batch
+
+    def _lookup(self, handler: "_Handler", batch_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            handler.send_json(404, {"error": {"message": f"No batch {batch_id}"}})
+        return batch
+
+    @staticmethod
+    def _finished(batch: Dict[str, Any]) -> bool:
+        return batch["cancelled"] or time.time() >= batch["ready_at"]
+
+    @staticmethod
+    def _iso(timestamp: float) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+    # -- OpenAI ----------------------------------------------------------------
+
+    def _upload_file(self, handler: "_Handler", raw: bytes) -> None:
+        fields = parse_multipart(handler.headers.get("Content-Type", ""), raw)
+        filename, content = fields.get("file", ("upload.jsonl", b""))
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self.lock:
+            self.files[file_id] = content
+        handler.send_json(200, self._file_object(file_id, filename or "upload.jsonl"))
+
+    def _file_object(self, file_id: str, filename: str) -> Dict[str, Any]:
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(self.files[file_id]),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": "batch",
+            "status": "processed",
+        }
+
+    def _file_content(self, handler: "_Handler", raw: bytes, file_id: str) -> None:
+        with self.lock:
+            content = self.files.get(file_id)
+        if content is None:
+            handler.send_json(404, {"error": {"message": f"No file {file_id}"}})
+            return
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/octet-stream")
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
+
+    def _create_openai(self, handler: "_Handler", raw: bytes) -> None:
+        request = json.loads(raw or b"{}")
+        with self.lock:
+            content = self.files.get(request.get("input_file_id"))
+        if content is None:
+            handler.send_json(400, {"error": {"message": "Unknown input_file_id"}})
+            return
+        items = []
+        for line in content.decode("utf-8").splitlines():
+            if line.strip():
+                item = json.loads(line)
+                items.append((item["custom_id"], item.get("body") or {}))
+        batch = self._new_batch("openai", items)
+        batch["input_file_id"] = request["input_file_id"]
+        batch["endpoint"] = request.get("endpoint", "/v1/chat/completions")
+        batch["completion_window"] = request.get("completion_window", "24h")
+        handler.send_json(200, self._openai_batch(batch))
+
+    def _openai_batch(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        finished = self._finished(batch)
+        if batch["cancelled"]:
+            status = "cancelled"
+        else:
+            status = "completed" if finished else "in_progress"
+        if status == "completed" and "output_file_id" not in batch:
+            self._write_openai_outputs(batch)
+        failed = sum(1 for _, code, _ in batch["results"] if code != 200)
+        total = len(batch["results"])
+        return {
+            "id": batch["id"],
+            "object": "batch",
+            "endpoint": batch["endpoint"],
+            "errors": None,
+            "input_file_id": batch["input_file_id"],
+            "completion_window": batch["completion_window"],
+            "status": status,
+            "output_file_id": batch.get("output_file_id"),
+            "error_file_id": batch.get("error_file_id"),
+            "created_at": int(batch["created"]),
+            "in_progress_at": int(batch["created"]),
+            "completed_at": int(batch["ready_at"]) if status == "completed" else None,
+            "cancelled_at": int(time.time()) if status == "cancelled" else None,
+            "request_counts": {
+                "total": total,
+                "completed": total - failed if status == "completed" else 0,
+                "failed": failed if status == "completed" else 0,
+            },
+            "metadata": None,
+        }
+
+    def _write_openai_outputs(self, batch: Dict[str, Any]) -> None:
+        outputs: Dict[bool, List[str]] = {True: [], False: []}
+        for custom_id, status, body in batch["results"]:
+            line = {
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": status,
+                    "request_id": uuid.uuid4().hex,
+                    "body": body,
+                },
+                "error": None,
+            }
+            outputs[status == 200].append(json.dumps(line))
+        with self.lock:
+            for succeeded, key in ((True, "output_file_id"), (False, "error_file_id")):
+                batch[key] = None
+                if outputs[succeeded]:
+                    file_id = f"file-{uuid.uuid4().hex[:24]}"
+                    self.files[file_id] = (
+                        "\n".join(outputs[succeeded]) + "\n"
+                    ).encode()
+                    batch[key] = file_id
+
+    def _get_openai(self, handler: "_Handler", raw: bytes, batch_id: str) -> None:
+        batch = self._lookup(handler, batch_id)
+        if batch is not None:
+            handler.send_json(200, self._openai_batch(batch))
+
+    def _cancel_openai(self, handler: "_Handler", raw: bytes, batch_id: str) -> None:
+        batch = self._lookup(handler, batch_id)
+        if batch is not None:
+            if not self._finished(batch):
+                batch["cancelled"] = True
+            handler.send_json(200, self._openai_batch(batch))
+
+    # -- Anthropic ---------------------------------------------------------------
+
+    def _create_anthropic(self, handler: "_Handler", raw: bytes) -> None:
+        request = json.loads(raw or b"{}")
+        items = [
+            (item["custom_id"], item.get("params") or {})
+            for item in request.get("requests", [])
+        ]
+        batch = self._new_batch("anthropic", items)
+        handler.send_json(200, self._anthropic_batch(batch))
+
+    def _anthropic_batch(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        ended = self._finished(batch)
+        counts = {
+            "processing": 0,
+            "succeeded": 0,
+            "errored": 0,
+            "canceled": 0,
+            "expired": 0,
+        }
+        for _, status, _ in batch["results"]:
+            if not ended:
+                counts["processing"] += 1
+            elif batch["cancelled"]:
+                counts["canceled"] += 1
+            else:
+                counts["succeeded" if status == 200 else "errored"] += 1
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": self._iso(batch["created"]),
+            "expires_at": self._iso(batch["created"] + 86400),
+            "ended_at": self._iso(time.time()) if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": (
+                self._iso(time.time()) if batch["cancelled"] else None
+            ),
+            "results_url": (
+                f"{self.server.url}/v1/messages/batches/{batch['id']}/results"
+                if ended
+                else None
+            ),
+        }
+
+    def _get_anthropic(self, handler: "_Handler", raw: bytes, batch_id: str) -> None:
+        batch = self._lookup(handler, batch_id)
+        if batch is not None:
+            handler.send_json(200, self._anthropic_batch(batch))
+
+    def _cancel_anthropic(self, handler: "_Handler", raw: bytes, batch_id: str) -> None:
+        batch = self._lookup(handler, batch_id)
+        if batch is not None:
+            if not self._finished(batch):
+                batch["cancelled"] = True
+            handler.send_json(200, self._anthropic_batch(batch))
+
+    def _anthropic_results(
+        self, handler: "_Handler", raw: bytes, batch_id: str
+    ) -> None:
+        batch = self._lookup(handler, batch_id)
+        if batch is None:
+            return
+        lines = []
+        for custom_id, status, body in batch["results"]:
+            if batch["cancelled"]:
+                result: Dict[str, Any] = {"type": "canceled"}
+            elif status == 200:
+                result = {"type": "succeeded", "message": body}
+            else:
+                result = {"type": "errored", "error": body}
+            lines.append(json.dumps({"custom_id": custom_id, "result": result}))
+        content = ("\n".join(lines) + "\n").encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-jsonl")
+        handler.send_header("Content-Length", str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
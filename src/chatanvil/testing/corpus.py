@@ -0,0 +1,197 @@
+"""
+Synthetic model responses for benchmarking the parsers.
+
+Each generator builds a response of roughly the requested size in bytes that
+exercises one code path: ordinary output, output with many code blocks, and
+the pathological shapes a misbehaving model can produce (unterminated fences,
+deeply nested JSON, truncated JSON, very large XML documents). Generation is
+deterministic for a given seed.
+"""
+
+import json
+import random
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_WORDS = (
+    "the model returns a short explanation of the change before the code and "
+    "sometimes adds notes about edge cases tests and performance afterwards"
+).split()
+
+_CODE_LINES = (
+    "def handler(event, context):",
+    "    items = [item for item in event['items'] if item]",
+    "    total = sum(len(item) for item in items)",
+    "    return {'count': len(items), 'total': total}",
+    "for index, value in enumerate(values):",
+    "    print(index, value)",
+)
+
+# Nesting depth of the deep JSON documents; kept below the recursion limit of
+# the JSON decoders, so the documents are valid and decoding succeeds
+JSON_DEPTH = 500
+
+
+@dataclass
+class CorpusCase:
+    """One synthetic response.
+
+    Attributes:
+        kind: Name of the generator that built the response
+        text: The response text
+        parsers: Parser types the response is meant for
+        pathological: True for shapes that stress worst-case behaviour
+    """
+
+    kind: str
+    text: str
+    parsers: Tuple[str, ...]
+    pathological: bool = False
+
+    @property
+    def size(self) -> int:
+        """Size of the response in UTF-8 bytes."""
+        return len(self.text.encode("utf-8"))
+
+
+def _prose(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _code(rng: random.Random, lines: int) -> str:
+    return "\n".join(rng.choice(_CODE_LINES) for _ in range(lines))
+
+
+def _repeat(size: int, piece: Callable[[], str]) -> List[str]:
+    parts, total = [], 0
+    while total < size:
+        part = piece()
+        parts.append(part)
+        total += len(part)
+    return parts
+
+
+def plain_text(size: int, rng: random.Random) -> str:
+    """Prose without any structure."""
+    return "\n\n".join(_repeat(size, lambda: _prose(rng, 60)))
+
+
+def markdown_fences(size: int, rng: random.Random) -> str:
+    """Prose with a fenced code block every paragraph."""
+    languages = ("python", "javascript", "bash", "")
+    return "\n\n".join(
+        _repeat(
+            size,
+            lambda: f"{_prose(rng, 20)}\n\n```{rng.choice(languages)}\n"
+            f"{_code(rng, rng.randint(2, 8))}\n```",
+        )
+    )
+
+
+def markdown_unterminated(size: int, rng: random.Random) -> str:
+    """Many opening fences that are never closed.
+
+    No fence starts a line, so none can close a block. Every opening fence
+    makes a lazy ``.*?`` fence pattern scan to the end of the response, so
+    the work grows with the square of the size.
+    """
+    return "".join(
+        _repeat(size, lambda: f"{_prose(rng, 3)} ```python\n{_code(rng, 2)}\n")
+    )
+
+
+def json_code_objects(size: int, rng: random.Random) -> str:
+    """A wide JSON document with many code fields."""
+    files = []
+    total = 0
+    while total < size:
+        item = {
+            "path": f"src/module_{len(files)}.py",
+            "description": _prose(rng, 12),
+            "code": {"language": "python", "content": _code(rng, 6)},
+        }
+        files.append(item)
+        total += len(json.dumps(item))
+    return json.dumps({"files": files}, indent=2)
+
+
+def json_deep(size: int, rng: random.Random) -> str:
+    """JSON documents nested ``JSON_DEPTH`` levels deep, repeated to size."""
+
+    def document() -> str:
+        leaf = json.dumps({"function": _code(rng, 2), "language": "python"})
+        return '{"child": [' * JSON_DEPTH + leaf + "]}" * JSON_DEPTH
+
+    return "[" + ", ".join(_repeat(size, document)) + "]"
+
+
+def json_truncated(size: int, rng: random.Random) -> str:
+    """A JSON document cut off mid-string, as when max_tokens is reached."""
+    text = "Here is the result:\n" + json_code_objects(size, rng)
+    return text[: max(len(text) - 20, len(text) * 9 // 10)]
+
+
+def xml_large(size: int, rng: random.Random) -> str:
+    """A flat XML document with many code elements."""
+    body = "".join(
+        _repeat(
+            size,
+            lambda: f"<file><description>{_prose(rng, 12)}</description>"
+            f'<code language="python">{_code(rng, 6).replace("<", "&lt;")}</code></file>',
+        )
+    )
+    return f"<response>{body}</response>"
+
+
+def xml_deep(size: int, rng: random.Random) -> str:
+    """XML elements nested ``JSON_DEPTH`` levels deep, repeated to size."""
+
+    def document() -> str:
+        leaf = f'<code language="python">{_code(rng, 2).replace("<", "&lt;")}</code>'
+        return "<node>" * JSON_DEPTH + leaf + "</node>" * JSON_DEPTH
+
+    return "<response>" + "".join(_repeat(size, document)) + "</response>"
+
+
+# Generator, parsers the output is meant for, and whether it is pathological
+GENERATORS: Dict[
+    str, Tuple[Callable[[int, random.Random], str], Tuple[str, ...], bool]
+] = {
+    "plain_text": (plain_text, ("default", "markdown", "auto"), False),
+    "markdown_fences": (markdown_fences, ("markdown", "auto"), False),
+    "markdown_unterminated": (markdown_unterminated, ("markdown", "auto"), True),
+    "json_code_objects": (json_code_objects, ("json", "auto"), False),
+    "json_deep": (json_deep, ("json", "auto"), True),
+    "json_truncated": (json_truncated, ("json", "auto"), True),
+    "xml_large": (xml_large, ("xml", "auto"), False),
+    "xml_deep": (xml_deep, ("xml", "auto"), True),
+}
+
+# 1 KB to 10 MB
+DEFAULT_SIZES = (1 << 10, 100 << 10, 1 << 20, 10 << 20)
+
+
+def generate_case(kind: str, size: int, seed: int = 0) -> CorpusCase:
+    """Generate one response of about ``size`` bytes.
+
+    Raises:
+        ValueError: If kind is not a known generator
+    """
+    if kind not in GENERATORS:
+        raise ValueError(
+            f"Unsupported corpus kind: {kind}. "
+            f"Available kinds: {', '.join(GENERATORS.keys())}"
+        )
+    generator, parsers, pathological = GENERATORS[kind]
+    rng = random.Random(f"{seed}:{kind}:{size}")
+    return CorpusCase(kind, generator(size, rng), parsers, pathological)
+
+
+def generate_corpus(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    kinds: Optional[Iterable[str]] = None,
+    seed: int = 0,
+) -> List[CorpusCase]:
+    """Generate every kind of response at every size, smallest first."""
+    kinds = list(kinds) if kinds is not None else list(GENERATORS)
+    return [generate_case(kind, size, seed) for kind in kinds for size in sorted(sizes)]
@@ -0,0 +1,111 @@
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Union
+
+
+@dataclass
+class LatencyDistribution:
+    """A latency distribution sampled in seconds.
+
+    Use the constructors (``constant``, ``uniform``, ``normal``, ``lognormal``,
+    ``exponential``) rather than building instances by hand.
+    """
+
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    KINDS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+    def __post_init__(self):
+        if self.kind not in self.KINDS:
+            raise ValueError(
+                f"Unsupported latency distribution: {self.kind}. "
+                f"Available kinds: {', '.join(self.KINDS)}"
+            )
+
+    @classmethod
+    def constant(cls, seconds: float) -> "LatencyDistribution":
+        return cls("constant", seconds)
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "LatencyDistribution":
+        return cls("uniform", low, high)
+
+    @classmethod
+    def normal(cls, mean: float, std: float) -> "LatencyDistribution":
+        return cls("normal", mean, std)
+
+    @classmethod
+    def lognormal(cls, median: float, sigma: float) -> "LatencyDistribution":
+        return cls("lognormal", median, sigma)
+
+    @classmethod
+    def exponential(cls, mean: float) -> "LatencyDistribution":
+        return cls("exponential", mean)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one non-negative latency value in seconds."""
+        if self.kind == "constant":
+            value = self.a
+        elif self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            # a is the median: median * exp(N(0, sigma))
+            value = self.a * rng.lognormvariate(0.0, self.b) if self.a > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        return max(0.0, value)
+
+
+def _as_distribution(
+    value: Union[float, int, LatencyDistribution, None],
+) -> LatencyDistribution:
+    if isinstance(value, LatencyDistribution):
+        return value
+    return LatencyDistribution.constant(float(value or 0.0))
+
+
+@dataclass
+class ServerBehavior:
+    """Timing and fault-injection settings for a mock provider server.
+
+    Attributes:
+        ttft: Time to first token, as seconds or a LatencyDistribution
+        tokens_per_second: Token emission rate; None emits all tokens at once
+        output_tokens: Number of tokens in generated responses
+        response_text: Fixed response text; overrides output_tokens
+        responder: Callable building the response text from the request body
+        error_rate: Probability of answering with ``error_status``
+        error_status: HTTP status used for injected errors
+        rate_limit_rate: Probability of answering with a 429
+        retry_after: Retry-After value (seconds) sent with 429 responses
+        max_concurrency: In-flight requests above this limit receive a 429
+        requests_per_second: Token-bucket request rate above which requests get a 429
+        batch_completion_time: Seconds before a submitted batch job completes
+        model_load_time: Seconds an Ollama request waits when its model is not
+            resident, like a cold load on a real server
+        seed: Seed for the random generator, for reproducible runs
+    """
+
+    ttft: Union[float, LatencyDistribution] = 0.0
+    tokens_per_second: Optional[float] = None
+    output_tokens: int = 16
+    response_text: Optional[str] = None
+    responder: Optional[Callable[[Dict[str, Any]], str]] = None
+    error_rate: float = 0.0
+    error_status: int = 500
+    rate_limit_rate: float = 0.0
+    retry_after: Optional[float] = 1.0
+    max_concurrency: Optional[int] = None
+    requests_per_second: Optional[float] = None
+    batch_completion_time: float = 0.0
+    model_load_time: float = 0.0
+    seed: Optional[int] = None
+    rng: random.Random = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.ttft = _as_distribution(self.ttft)
+        self.rng = random.Random(self.seed)
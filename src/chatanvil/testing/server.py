@@ -0,0 +1,483 @@
+import json
+import math
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .batches import BatchStore
+from .profiles import ServerBehavior
+from .wire import (
+    WireFormat,
+    embeddings_response,
+    keep_alive_seconds,
+    match_route,
+    new_context,
+)
+
+_LOREM = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua"
+).split()
+
+# Paths each SDK appends to its base URL, used by MockProviderServer.base_url
+_PROVIDER_PREFIXES = {
+    "openai": "/v1",
+    "claude": "",
+    "groq": "",
+    "openrouter": "/api/v1",
+    "ollama": "",
+    "openai_compatible": "/v1",
+}
+
+
+@dataclass
+class MockServerStats:
+    """Counters describing the traffic a mock server has seen."""
+
+    requests: int = 0
+    completed: int = 0
+    streamed: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    disconnected: int = 0
+    embedded: int = 0
+    model_loads: int = 0
+    inflight: int = 0
+    peak_inflight: int = 0
+    paths: Dict[str, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the counters as a plain dictionary."""
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "completed": self.completed,
+                "streamed": self.streamed,
+                "rate_limited": self.rate_limited,
+                "errors": self.errors,
+                "disconnected": self.disconnected,
+                "embedded": self.embedded,
+                "model_loads": self.model_loads,
+                "inflight": self.inflight,
+                "peak_inflight": self.peak_inflight,
+                "paths": dict(self.paths),
+            }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], owner: "MockProviderServer"):
+        self.owner = owner
+        super().__init__(address, _Handler)
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients dropping idle keep-alive connections is routine under load
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler dispatching to the owning MockProviderServer."""
+
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        self.server.owner._handle(self, "GET")
+
+    def do_POST(self) -> None:
+        self.server.owner._handle(self, "POST")
+
+    def do_DELETE(self) -> None:
+        self.server.owner._handle(self, "DELETE")
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def send_json(
+        self, status: int, body: Any, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def start_stream(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def end_stream(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class MockProviderServer:
+    """Local HTTP stand-in for the OpenAI, Anthropic, Groq, OpenRouter and Ollama APIs.
+
+    A single server answers every provider's wire format; the request path
+    decides which one is spoken. Point a provider at it with ``base_url``:
+
+        with MockProviderServer(ttft=0.2, tokens_per_second=50) as server:
+            chat = Chat("openai", api_key="test", base_url=server.base_url("openai"))
+            chat.get_response("Hello")
+
+    Keyword arguments not consumed by the constructor are forwarded to
+    ServerBehavior, so latency and fault settings can be passed directly.
+    """
+
+    def __init__(
+        self,
+        behavior: Optional[ServerBehavior] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        models: Optional[List[str]] = None,
+        **behavior_kwargs: Any,
+    ):
+        if behavior is not None and behavior_kwargs:
+            raise ValueError(
+                "Pass either a ServerBehavior or behavior keywords, not both"
+            )
+        self.behavior = behavior or ServerBehavior(**behavior_kwargs)
+        self.models = models or ["mock-model"]
+        self.stats = MockServerStats()
+        self.batches = BatchStore(self)
+        self._address = (host, port)
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._rng_lock = threading.Lock()
+        self._bucket_tokens = 0.0
+        self._bucket_updated = time.monotonic()
+        # Ollama model name -> wall-clock time it is unloaded
+        self._resident: Dict[str, float] = {}
+        self._resident_lock = threading.Lock()
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self) -> "MockProviderServer":
+        """Start serving in a background thread."""
+        if self._server is not None:
+            return self
+        self._server = _Server(self._address, self)
+        rps = self.behavior.requests_per_second
+        self._bucket_tokens = max(1.0, rps) if rps else 0.0
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name=f"chatanvil-mock-{self.port}",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and release its socket."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "MockProviderServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        if self._server is None:
+            raise RuntimeError("Mock server is not running")
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        """Root URL of the running server."""
+        return f"http://{self._address[0]}:{self.port}"
+
+    def base_url(self, provider: str) -> str:
+        """Base URL to hand to the given provider's ``base_url`` argument."""
+        provider = provider.lower()
+        if provider not in _PROVIDER_PREFIXES:
+            raise ValueError(f"Unsupported provider: {provider}")
+        return self.url + _PROVIDER_PREFIXES[provider]
+
+    # -- request handling ----------------------------------------------------
+
+    def _handle(self, handler: _Handler, method: str) -> None:
+        raw = handler.read_body()
+        path = handler.path.split("?", 1)[0].rstrip("/")
+        with self.stats.lock:
+            self.stats.requests += 1
+            self.stats.paths[path] = self.stats.paths.get(path, 0) + 1
+
+        wire = match_route(method, path)
+        if wire is None:
+            self._handle_auxiliary(handler, method, path, raw)
+            return
+
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            handler.send_json(400, wire.error(400, "Request body is not valid JSON"))
+            return
+
+        with self.stats.lock:
+            self.stats.inflight += 1
+            self.stats.peak_inflight = max(
+                self.stats.peak_inflight, self.stats.inflight
+            )
+            inflight = self.stats.inflight
+        try:
+            fault = self._pick_fault(inflight)
+            if fault is not None:
+                self._send_fault(handler, wire, fault)
+                return
+            if wire.name == "ollama":
+                self._load_model(body)
+            self._generate(handler, wire, body)
+        except (BrokenPipeError, ConnectionResetError):
+            with self.stats.lock:
+                self.stats.disconnected += 1
+            handler.close_connection = True
+        finally:
+            with self.stats.lock:
+                self.stats.inflight -= 1
+
+    def _handle_auxiliary(
+        self, handler: _Handler, method: str, path: str, raw: bytes
+    ) -> None:
+        """Answer batch, embeddings, model listing and health endpoints."""
+        if self.batches.handle(handler, method, path, raw):
+            return
+        if method == "POST":
+            try:
+                answer = embeddings_response(path, json.loads(raw or b"{}"))
+            except ValueError:
+                answer = None
+            if answer is not None:
+                payload, count = answer
+                with self.stats.lock:
+                    self.stats.embedded += count
+                handler.send_json(200, payload)
+                return
+        now = int(time.time())
+        if method == "GET" and path.endswith("/models"):
+            handler.send_json(
+                200,
+                {
+                    "object": "list",
+                    "data": [
+                        {
+                            "id": name,
+                            "object": "model",
+                            "created": now,
+                            "owned_by": "mock",
+                        }
+                        for name in self.models
+                    ],
+                },
+            )
+        elif method == "GET" and path.endswith("/api/tags"):
+            handler.send_json(
+                200, {"models": [{"name": name, "model": name} for name in self.models]}
+            )
+        elif method == "GET" and path.endswith("/api/ps"):
+            handler.send_json(200, {"models": self.resident_models()})
+        elif method == "GET" and path.endswith("/api/version"):
+            handler.send_json(200, {"version": "0.0.0-mock"})
+        else:
+            handler.send_json(
+                404, {"error": {"message": f"Unknown route: {method} {path}"}}
+            )
+
+    def resident_models(self) -> List[Dict[str, Any]]:
+        """Models an Ollama client has loaded and not yet unloaded, as ``/api/ps`` lists them."""
+        now = time.time()
+        with self._resident_lock:
+            resident = {
+                name: expires
+                for name, expires in self._resident.items()
+                if expires > now
+            }
+        return [
+            {
+                "name": name,
+                "model": name,
+                "size": 0,
+                "size_vram": 0,
+                "expires_at": (
+                    "2318-01-01T00:00:00Z"
+                    if math.isinf(expires)
+                    else time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(expires))
+                ),
+            }
+            for name, expires in resident.items()
+        ]
+
+    def _load_model(self, body: Dict[str, Any]) -> None:
+        """Load the requested Ollama model if needed and apply its keep_alive."""
+        model = body.get("model") or "mock-model"
+        with self._resident_lock:
+            cold = self._resident.get(model, 0.0) <= time.time()
+        if cold:
+            with self.stats.lock:
+                self.stats.model_loads += 1
+            if self.behavior.model_load_time:
+                time.sleep(self.behavior.model_load_time)
+        keep_alive = keep_alive_seconds(body.get("keep_alive"))
+        with self._resident_lock:
+            if keep_alive == 0:
+                self._resident.pop(model, None)
+            else:
+                self._resident[model] = time.time() + keep_alive
+
+    def _pick_fault(self, inflight: int) -> Optional[int]:
+        """Decide whether this request gets an injected 429 or error status."""
+        behavior = self.behavior
+        if behavior.max_concurrency is not None and inflight > behavior.max_concurrency:
+            return 429
+        if behavior.requests_per_second and not self._take_bucket_token():
+            return 429
+        return self._roll_fault()
+
+    def _roll_fault(self) -> Optional[int]:
+        """Apply the random 429 and error probabilities."""
+        behavior = self.behavior
+        with self._rng_lock:
+            roll = behavior.rng.random()
+        if roll < behavior.rate_limit_rate:
+            return 429
+        if roll < behavior.rate_limit_rate + behavior.error_rate:
+            return behavior.error_status
+        return None
+
+    def _take_bucket_token(self) -> bool:
+        rate = self.behavior.requests_per_second or 0.0
+        with self._rng_lock:
+            now = time.monotonic()
+            capacity = max(1.0, rate)
+            self._bucket_tokens = min(
+                capacity, self._bucket_tokens + (now - self._bucket_updated) * rate
+            )
+            self._bucket_updated = now
+            if self._bucket_tokens >= 1.0:
+                self._bucket_tokens -= 1.0
+                return True
+            return False
+
+    def _send_fault(self, handler: _Handler, wire: WireFormat, status: int) -> None:
+        headers: Dict[str, str] = {}
+        if status == 429:
+            with self.stats.lock:
+                self.stats.rate_limited += 1
+            retry_after = self.behavior.retry_after
+            if retry_after is not None:
+                headers["Retry-After"] = str(int(math.ceil(retry_after)))
+                headers["retry-after-ms"] = str(int(retry_after * 1000))
+            message = "Rate limit exceeded (injected by mock server)"
+        else:
+            with self.stats.lock:
+                self.stats.errors += 1
+            message = f"Injected error with status {status}"
+        handler.send_json(status, wire.error(status, message), headers)
+
+    def _response_tokens(
+        self, wire: WireFormat, body: Dict[str, Any]
+    ) -> Tuple[List[str], str]:
+        behavior = self.behavior
+        if behavior.responder is not None:
+            text = behavior.responder(body)
+        elif behavior.response_text is not None:
+            text = behavior.response_text
+        else:
+            text = " ".join(
+                _LOREM[i % len(_LOREM)] for i in range(behavior.output_tokens)
+            )
+        for stop in wire.stop_sequences(body):
+            # Like the real APIs, the stop sequence itself is not returned
+            index = text.find(stop)
+            if index >= 0:
+                text = text[:index]
+        tokens = re.findall(r"\s*\S+", text) or [text]
+        limit = wire.max_tokens(body)
+        if limit and len(tokens) > limit:
+            return tokens[:limit], "length"
+        return tokens, "stop"
+
+    def _new_context(
+        self,
+        wire: WireFormat,
+        body: Dict[str, Any],
+        tokens: List[str],
+        finish_reason: str,
+    ) -> Dict[str, Any]:
+        ctx = new_context(body, wire)
+        ctx["completion_tokens"] = len(tokens)
+        ctx["finish_reason"] = finish_reason
+        return ctx
+
+    def _generate(
+        self, handler: _Handler, wire: WireFormat, body: Dict[str, Any]
+    ) -> None:
+        behavior = self.behavior
+        if wire.name == "ollama" and not wire.prompt_text(body):
+            # An empty prompt only loads the model, as on a real Ollama server
+            tokens, finish_reason = [], "load"
+        else:
+            tokens, finish_reason = self._response_tokens(wire, body)
+        ctx = self._new_context(wire, body, tokens, finish_reason)
+        with self._rng_lock:
+            ttft = behavior.ttft.sample(behavior.rng)
+        gap = 1.0 / behavior.tokens_per_second if behavior.tokens_per_second else 0.0
+
+        if not wire.is_stream(body):
+            time.sleep(ttft + gap * max(0, len(tokens) - 1))
+            handler.send_json(200, wire.response(ctx, "".join(tokens)))
+            with self.stats.lock:
+                self.stats.completed += 1
+            return
+
+        handler.start_stream(wire.stream_content_type)
+        for frame in wire.stream_open(ctx):
+            handler.write_chunk(frame)
+        time.sleep(ttft)
+        for index, token in enumerate(tokens):
+            if index and gap:
+                time.sleep(gap)
+            handler.write_chunk(wire.stream_token(ctx, token))
+        for frame in wire.stream_close(ctx):
+            handler.write_chunk(frame)
+        handler.end_stream()
+        with self.stats.lock:
+            self.stats.completed += 1
+            self.stats.streamed += 1
@@ -0,0 +1,405 @@
+"""
+Wire formats spoken by the mock provider servers.
+
+Each format turns a generated token sequence into the exact HTTP bodies the
+real provider returns, both for single responses and for streams.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class WireFormat:
+    """Base class for a provider wire format."""
+
+    name = "base"
+    stream_content_type = "text/event-stream"
+
+    def is_stream(self, body: Dict[str, Any]) -> bool:
+        return bool(body.get("stream"))
+
+    def prompt_text(self, body: Dict[str, Any]) -> str:
+        """Concatenate the textual prompt content of a request body."""
+        parts: List[str] = []
+        for message in body.get("messages") or []:
+            content = message.get("content")
+            if isinstance(content, str):
+                parts.append(content)
+            elif isinstance(content, list):
+                parts.extend(
+                    block.get("text", "")
+                    for block in content
+                    if isinstance(block, dict)
+                )
+        if isinstance(body.get("system"), str):
+            parts.append(body["system"])
+        if isinstance(body.get("prompt"), str):
+            parts.append(body["prompt"])
+        return " ".join(parts)
+
+    def max_tokens(self, body: Dict[str, Any]) -> Optional[int]:
+        return body.get("max_tokens") or body.get("max_completion_tokens")
+
+    def stop_sequences(self, body: Dict[str, Any]) -> List[str]:
+        stop = body.get("stop") or []
+        return [stop] if isinstance(stop, str) else list(stop)
+
+    def response(self, ctx: Dict[str, Any], text: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def stream_open(self, ctx: Dict[str, Any]) -> List[bytes]:
+        return []
+
+    def stream_token(self, ctx: Dict[str, Any], token: str) -> bytes:
+        raise NotImplementedError
+
+    def stream_close(self, ctx: Dict[str, Any]) -> List[bytes]:
+        return []
+
+    def error(self, status: int, message: str) -> Dict[str, Any]:
+        return {"error": {"message": message, "code": status}}
+
+    @staticmethod
+    def sse(data: Any, event: Optional[str] = None) -> bytes:
+        payload = data if isinstance(data, str) else json.dumps(data)
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {payload}\n\n".encode("utf-8")
+
+
+class OpenAIWire(WireFormat):
+    """OpenAI chat completions, also used by Groq and OpenRouter."""
+
+    name = "openai"
+
+    def _usage(self, ctx: Dict[str, Any]) -> Dict[str, int]:
+        return {
+            "prompt_tokens": ctx["prompt_tokens"],
+            "completion_tokens": ctx["completion_tokens"],
+            "total_tokens": ctx["prompt_tokens"] + ctx["completion_tokens"],
+        }
+
+    def response(self, ctx: Dict[str, Any], text: str) -> Dict[str, Any]:
+        return {
+            "id": ctx["id"],
+            "object": "chat.completion",
+            "created": ctx["created"],
+            "model": ctx["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": ctx["finish_reason"],
+                }
+            ],
+            "usage": self._usage(ctx),
+        }
+
+    def _chunk(
+        self, ctx: Dict[str, Any], delta: Dict[str, Any], finish: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {
+            "id": ctx["id"],
+            "object": "chat.completion.chunk",
+            "created": ctx["created"],
+            "model": ctx["model"],
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+
+    def stream_open(self, ctx: Dict[str, Any]) -> List[bytes]:
+        return [self.sse(self._chunk(ctx, {"role": "assistant", "content": ""}))]
+
+    def stream_token(self, ctx: Dict[str, Any], token: str) -> bytes:
+        return self.sse(self._chunk(ctx, {"content": token}))
+
+    def stream_close(self, ctx: Dict[str, Any]) -> List[bytes]:
+        final = self._chunk(ctx, {}, ctx["finish_reason"])
+        final["usage"] = self._usage(ctx)
+        return [self.sse(final), self.sse("[DONE]")]
+
+    def error(self, status: int, message: str) -> Dict[str, Any]:
+        error_type = "rate_limit_exceeded" if status == 429 else "server_error"
+        return {"error": {"message": message, "type": error_type, "code": status}}
+
+
+class AnthropicWire(WireFormat):
+    """Anthropic Messages API."""
+
+    name = "anthropic"
+
+    STOP_REASONS = {"stop": "end_turn", "length": "max_tokens"}
+
+    def stop_sequences(self, body: Dict[str, Any]) -> List[str]:
+        return list(body.get("stop_sequences") or [])
+
+    def _message(
+        self, ctx: Dict[str, Any], content: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            "id": ctx["id"],
+            "type": "message",
+            "role": "assistant",
+            "model": ctx["model"],
+            "content": content,
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": ctx["prompt_tokens"], "output_tokens": 0},
+        }
+
+    def response(self, ctx: Dict[str, Any], text: str) -> Dict[str, Any]:
+        if ctx.get("tool_name"):
+            # A forced tool call answers with the response text as its input
+            try:
+                tool_input = json.loads(text)
+            except json.JSONDecodeError:
+                tool_input = {}
+            message = self._message(
+                ctx,
+                [
+                    {
+                        "type": "tool_use",
+                        "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                        "name": ctx["tool_name"],
+                        "input": tool_input,
+                    }
+                ],
+            )
+            message["stop_reason"] = "tool_use"
+            message["usage"]["output_tokens"] = ctx["completion_tokens"]
+            return message
+        message = self._message(ctx, [{"type": "text", "text": text}])
+        message["stop_reason"] = self.STOP_REASONS[ctx["finish_reason"]]
+        message["usage"]["output_tokens"] = ctx["completion_tokens"]
+        return message
+
+    def stream_open(self, ctx: Dict[str, Any]) -> List[bytes]:
+        start = {"type": "message_start", "message": self._message(ctx, [])}
+        block = {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "text", "text": ""},
+        }
+        return [
+            self.sse(start, "message_start"),
+            self.sse(block, "content_block_start"),
+            self.sse({"type": "ping"}, "ping"),
+        ]
+
+    def stream_token(self, ctx: Dict[str, Any], token: str) -> bytes:
+        delta = {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": token},
+        }
+        return self.sse(delta, "content_block_delta")
+
+    def stream_close(self, ctx: Dict[str, Any]) -> List[bytes]:
+        delta = {
+            "type": "message_delta",
+            "delta": {
+                "stop_reason": self.STOP_REASONS[ctx["finish_reason"]],
+                "stop_sequence": None,
+            },
+            "usage": {"output_tokens": ctx["completion_tokens"]},
+        }
+        return [
+            self.sse({"type": "content_block_stop", "index": 0}, "content_block_stop"),
+            self.sse(delta, "message_delta"),
+            self.sse({"type": "message_stop"}, "message_stop"),
+        ]
+
+    def error(self, status: int, message: str) -> Dict[str, Any]:
+        error_type = "rate_limit_error" if status == 429 else "api_error"
+        return {"type": "error", "error": {"type": error_type, "message": message}}
+
+
+class OllamaWire(WireFormat):
+    """Ollama native API, streamed as newline-delimited JSON."""
+
+    name = "ollama"
+    stream_content_type = "application/x-ndjson"
+
+    def __init__(self, endpoint: str = "chat"):
+        self.endpoint = endpoint
+
+    def is_stream(self, body: Dict[str, Any]) -> bool:
+        # The Ollama server streams unless told otherwise
+        return body.get("stream", True) is not False
+
+    def max_tokens(self, body: Dict[str, Any]) -> Optional[int]:
+        return (body.get("options") or {}).get("num_predict")
+
+    def stop_sequences(self, body: Dict[str, Any]) -> List[str]:
+        return list((body.get("options") or {}).get("stop") or [])
+
+    def _base(self, ctx: Dict[str, Any], done: bool) -> Dict[str, Any]:
+        return {
+            "model": ctx["model"],
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "done": done,
+        }
+
+    def _content(self, text: str) -> Dict[str, Any]:
+        if self.endpoint == "generate":
+            return {"response": text}
+        return {"message": {"role": "assistant", "content": text}}
+
+    def _done(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
+        done = {
+            "done_reason": ctx["finish_reason"],
+            "prompt_eval_count": ctx["prompt_tokens"],
+            "eval_count": ctx["completion_tokens"],
+            "total_duration": int(ctx["elapsed"]() * 1e9),
+        }
+        if self.endpoint == "generate":
+            # The conversation so far: the request's context plus this turn
+            start = len(ctx["context"])
+            done["context"] = ctx["context"] + list(
+                range(start, start + ctx["prompt_tokens"] + ctx["completion_tokens"])
+            )
+        return done
+
+    def response(self, ctx: Dict[str, Any], text: str) -> Dict[str, Any]:
+        body = self._base(ctx, True)
+        body.update(self._content(text))
+        body.update(self._done(ctx))
+        return body
+
+    def stream_token(self, ctx: Dict[str, Any], token: str) -> bytes:
+        body = self._base(ctx, False)
+        body.update(self._content(token))
+        return (json.dumps(body) + "\n").encode("utf-8")
+
+    def stream_close(self, ctx: Dict[str, Any]) -> List[bytes]:
+        body = self._base(ctx, True)
+        body.update(self._content(""))
+        body.update(self._done(ctx))
+        return [(json.dumps(body) + "\n").encode("utf-8")]
+
+    def error(self, status: int, message: str) -> Dict[str, Any]:
+        return {"error": message}
+
+
+# Seconds Ollama keeps a model loaded when the request does not say
+DEFAULT_KEEP_ALIVE = 300.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def keep_alive_seconds(value: Any) -> float:
+    """Convert an Ollama ``keep_alive`` value to seconds; negative means forever."""
+    if value is None or value == "":
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        text = str(value).strip()
+        try:
+            seconds = float(text)
+        except ValueError:
+            sign = -1.0 if text.startswith("-") else 1.0
+            seconds = sign * sum(
+                float(number) * _DURATION_UNITS[unit]
+                for number, unit in _DURATION_PART.findall(text)
+            )
+    return math.inf if seconds < 0 else seconds
+
+
+# Size of mock embeddings when the request does not ask for one
+EMBEDDING_DIMENSIONS = 8
+
+
+def mock_embedding(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> List[float]:
+    """Deterministic unit vector derived from a hash of the text."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def embeddings_response(
+    path: str, body: Dict[str, Any]
+) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Answer an OpenAI or Ollama embeddings request.
+
+    Returns:
+        The response body and the number of texts embedded, or None if the
+        path is not an embeddings endpoint
+    """
+    inputs = body.get("input", "")
+    texts = [inputs] if isinstance(inputs, str) else [str(text) for text in inputs]
+    model = body.get("model") or "mock-model"
+    dimensions = body.get("dimensions") or EMBEDDING_DIMENSIONS
+    vectors = [mock_embedding(text, dimensions) for text in texts]
+    if path.endswith("/api/embed"):
+        return {"model": model, "embeddings": vectors}, len(texts)
+    if not path.endswith("/embeddings"):
+        return None
+    if body.get("encoding_format") == "base64":
+        encoded: List[Any] = [
+            base64.b64encode(struct.pack(f"<{len(v)}f", *v)).decode("ascii")
+            for v in vectors
+        ]
+    else:
+        encoded = vectors
+    tokens = sum(len(text.split()) for text in texts)
+    return (
+        {
+            "object": "list",
+            "data": [
+                {"object": "embedding", "index": index, "embedding": vector}
+                for index, vector in enumerate(encoded)
+            ],
+            "model": model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        },
+        len(texts),
+    )
+
+
+# (method, path suffix) -> wire format; the longest matching suffix wins
+ROUTES: List[Tuple[str, str, WireFormat]] = [
+    ("POST", "/chat/completions", OpenAIWire()),
+    ("POST", "/v1/messages", AnthropicWire()),
+    ("POST", "/api/chat", OllamaWire("chat")),
+    ("POST", "/api/generate", OllamaWire("generate")),
+]
+
+
+def match_route(method: str, path: str) -> Optional[WireFormat]:
+    """Find the wire format handling a generation request, if any."""
+    path = path.split("?", 1)[0].rstrip("/")
+    for route_method, suffix, wire in ROUTES:
+        if method == route_method and path.endswith(suffix):
+            return wire
+    return None
+
+
+def new_context(body: Dict[str, Any], wire: WireFormat) -> Dict[str, Any]:
+    """Build the per-request context shared by all frames of a response."""
+    started = time.monotonic()
+    prefix = "msg" if wire.name == "anthropic" else "chatcmpl"
+    tool_choice = body.get("tool_choice")
+    return {
+        "id": f"{prefix}-{uuid.uuid4().hex[:24]}",
+        "created": int(time.time()),
+        "model": body.get("model") or "mock-model",
+        "prompt_tokens": len(wire.prompt_text(body).split()),
+        "completion_tokens": 0,
+        "finish_reason": "stop",
+        "context": list(body.get("context") or []),
+        "tool_name": (
+            tool_choice.get("name")
+            if isinstance(tool_choice, dict) and tool_choice.get("type") == "tool"
+            else None
+        ),
+        "elapsed": lambda: time.monotonic() - started,
+    }
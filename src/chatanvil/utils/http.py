@@ -0,0 +1,144 @@
+"""
+HTTP transport settings shared by the provider SDK clients.
+
+Every provider SDK is built on httpx. Providers take either a ready
+``httpx.Client`` to share, or keyword arguments for building their own, so
+timeouts, connection pool limits, HTTP/2 and proxies are set in one place.
+"""
+
+from typing import Any, Dict, Optional, Type
+
+import httpx
+
+# httpx's own pool limits, used for whichever of the two limits is not set
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+def http_options(
+    timeout: Optional[float] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    http2: Optional[bool] = None,
+    proxy: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build ``httpx.Client`` keyword arguments from transport settings.
+
+    Args:
+        timeout: Seconds allowed for each phase of a request (connecting,
+            sending, waiting between reads, waiting for a pooled connection);
+            not a bound on the whole request, since a server trickling bytes
+            resets the read timeout (see ``Config.total_timeout``)
+        connect_timeout: Seconds allowed to connect, overriding ``timeout``
+        read_timeout: Seconds allowed between received bytes, overriding
+            ``timeout``; bounds how long a hung upstream call holds a worker
+        max_connections: Most open connections per client
+        max_keepalive_connections: Most idle connections kept open for reuse;
+            if only one of the two limits is set, the other keeps httpx's
+            default
+        http2: Negotiate HTTP/2, multiplexing requests over few connections
+        proxy: Proxy URL for all requests
+
+    Returns:
+        Keyword arguments for the settings that are given
+    """
+    options: Dict[str, Any] = {}
+    if timeout is not None or connect_timeout is not None or read_timeout is not None:
+        options["timeout"] = httpx.Timeout(
+            timeout, connect=connect_timeout or timeout, read=read_timeout or timeout
+        )
+    if max_connections is not None or max_keepalive_connections is not None:
+        if max_keepalive_connections is None:
+            max_keepalive_connections = min(
+                DEFAULT_MAX_KEEPALIVE_CONNECTIONS, max_connections
+            )
+        if max_connections is None:
+            max_connections = max(DEFAULT_MAX_CONNECTIONS, max_keepalive_connections)
+        options["limits"] = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "HTTP/2 requires the h2 package. Install it with: pip install chatanvil[http2]"
+            )
+        options["http2"] = True
+    if proxy:
+        options["proxy"] = proxy
+    return options
+
+
+def build_http_client(
+    http_client: Optional[httpx.Client] = None,
+    options: Optional[Dict[str, Any]] = None,
+    client_class: Type[httpx.Client] = httpx.Client,
+    **defaults: Any,
+) -> Optional[httpx.Client]:
+    """Return the httpx client a provider's SDK client should use.
+
+    Args:
+        http_client: Shared client to use as is
+        options: ``httpx.Client`` keyword arguments, e.g. from http_options
+        client_class: Client class to build, e.g. the SDK's default client
+            class, which fills in the SDK's own defaults
+        **defaults: Provider defaults for options that are not given
+
+    Returns:
+        ``http_client`` if given, else a new client, or None to let the SDK
+        build its own when nothing is configured
+    """
+    if http_client is not None:
+        return http_client
+    options = {**defaults, **(options or {})}
+    if not options:
+        return None
+    # Same redirect behaviour as the clients the SDKs build themselves
+    options.setdefault("follow_redirects", True)
+    return client_class(**options)
+
+
+def build_async_http_client(
+    http_client: Optional[httpx.AsyncClient] = None,
+    options: Optional[Dict[str, Any]] = None,
+    client_class: Type[httpx.AsyncClient] = httpx.AsyncClient,
+    **defaults: Any,
+) -> Optional[httpx.AsyncClient]:
+    """Async counterpart of build_http_client, for the SDKs' async clients."""
+    return build_http_client(http_client, options, client_class, **defaults)  # type: ignore[arg-type]
+
+
+def sdk_client_options(
+    http_client: Any,
+    options: Optional[Dict[str, Any]],
+    client_class: Type[Any],
+    **defaults: Any,
+) -> Dict[str, Any]:
+    """Return the ``http_client`` and ``timeout`` arguments for an SDK client.
+
+    The timeout goes to the SDK client itself. An httpx client is built only
+    when other settings need one, from ``client_class`` so the SDK's tuned
+    pool and transport defaults still apply. Otherwise the SDK builds its own.
+
+    Args:
+        http_client: Shared client to use as is
+        options: ``httpx.Client`` keyword arguments, e.g. from http_options
+        client_class: The SDK's default sync or async httpx client class
+        **defaults: Provider defaults for options that are not given
+
+    Returns:
+        Keyword arguments for the SDK client's constructor
+    """
+    options = dict(options or {})
+    timeout = options.pop("timeout", None)
+    client = build_http_client(http_client, options, client_class, **defaults)
+    sdk_options: Dict[str, Any] = {}
+    if client is not None:
+        sdk_options["http_client"] = client
+    if timeout is not None:
+        sdk_options["timeout"] = timeout
+    return sdk_options
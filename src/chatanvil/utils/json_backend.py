@@ -0,0 +1,71 @@
+"""
+JSON decoding through the fastest available backend.
+
+orjson is used when installed, then msgspec, then the standard library. The
+optional backends are only used for decoding, and only for input they decode
+exactly like the standard library, so results never depend on which one is
+installed.
+"""
+
+import json
+from typing import Any, Callable, Optional, Tuple, Type
+
+DecodeFunction = Callable[[str], Any]
+
+
+def _load_backend() -> (
+    Tuple[str, Optional[DecodeFunction], Tuple[Type[Exception], ...]]
+):
+    try:
+        import orjson
+
+        return "orjson", orjson.loads, (orjson.JSONDecodeError,)
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        return "msgspec", msgspec.json.decode, (msgspec.DecodeError,)
+    except ImportError:
+        pass
+    return "json", None, ()
+
+
+BACKEND, _fast_loads, _fast_errors = _load_backend()
+
+# Integers beyond 64 bits come back as inexact floats from the optional
+# backends. They are found by mapping digits to "1" and everything else to
+# "0" and searching for a run of 20; both are C-speed byte operations,
+# several times cheaper than a regex scan.
+_DIGITS = bytes(0x31 if 0x30 <= byte <= 0x39 else 0x30 for byte in range(256))
+_LONG_NUMBER = b"1" * 20
+
+
+def _has_long_number(text: str) -> bool:
+    return _LONG_NUMBER in text.encode("utf-8", "surrogatepass").translate(_DIGITS)
+
+
+def loads(text: str) -> Any:
+    """Decode JSON text.
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON
+    """
+    if _fast_loads is not None:
+        try:
+            value = _fast_loads(text)
+        except _fast_errors:
+            # Let the standard library raise its own error; invalid input
+            # usually fails on its first characters, so this is cheap
+            pass
+        else:
+            # Checked only once the text decoded, so prose and broken JSON
+            # never pay for the scan
+            if not _has_long_number(text):
+                return value
+    return json.loads(text)
+
+
+def dumps_pretty(data: Any) -> str:
+    """Encode data as JSON indented by two spaces, like ``json.dumps(indent=2)``."""
+    return json.dumps(data, indent=2)
@@ -0,0 +1,221 @@
+"""
+Local repair of slightly broken JSON from model output.
+
+Handles the common near misses: prose around the JSON value, trailing commas,
+single-quoted strings, Python literals, raw control characters in strings and
+output cut off mid-value (for example when ``max_tokens`` was reached). The
+repair is deterministic and bounded: one linear scan of the text plus at most
+``MAX_CUTS`` attempts to close a truncated value, and texts longer than
+``MAX_LENGTH`` are not repaired at all.
+"""
+
+import json
+import re
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+from . import json_backend
+
+# Names of the repairs reported by repair_json
+EXTRACTED = "extracted_json"
+TRAILING_COMMAS = "removed_trailing_commas"
+SINGLE_QUOTES = "converted_single_quotes"
+PYTHON_LITERALS = "converted_python_literals"
+CONTROL_CHARACTERS = "escaped_control_characters"
+CLOSED_STRING = "closed_string"
+CLOSED_BRACKETS = "closed_brackets"
+DROPPED_INCOMPLETE = "dropped_incomplete_value"
+
+# Longest text, in characters, that repair is attempted on
+MAX_LENGTH = 1 << 20
+# Number of trailing values that may be dropped from a truncated document
+MAX_CUTS = 4
+
+_SPACE = re.compile(r"\s+")
+_WORD = re.compile(r"[-+.\w]+")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+# Runs of characters copied unchanged inside double and single quoted strings
+_DOUBLE_QUOTED_RUN = re.compile(r'[^"\\\x00-\x1f]+')
+_SINGLE_QUOTED_RUN = re.compile(r"[^'\"\\\x00-\x1f]+")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_BRACKET = re.compile(r"[\[\]{}]")
+
+_JSON_LITERALS = {"true", "false", "null"}
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def repair_json(
+    text: str, max_length: int = MAX_LENGTH
+) -> Optional[Tuple[Any, List[str]]]:
+    """Decode JSON that the standard decoder rejects, repairing it locally.
+
+    Args:
+        text: Text containing a JSON object or array
+        max_length: Texts longer than this are not repaired
+
+    Returns:
+        The decoded value and the names of the repairs applied, in the order
+        they were first needed, or None if the text could not be repaired
+    """
+    if len(text) > max_length:
+        return None
+    starts = sorted(i for i in (text.find("{"), text.find("[")) if i >= 0)
+    for start in starts:
+        result = _repair_from(text, start)
+        if result is not None:
+            return result
+    return None
+
+
+def _repair_from(text: str, start: int) -> Optional[Tuple[Any, List[str]]]:
+    out: List[str] = []
+    repairs: List[str] = []
+    stack: List[str] = []
+    # Output positions where the value being written can be dropped again
+    cuts: Deque[int] = deque(maxlen=MAX_CUTS)
+    quote = None
+    i, n = start, len(text)
+
+    def note(repair: str) -> None:
+        if repair not in repairs:
+            repairs.append(repair)
+
+    while i < n:
+        c = text[i]
+        if quote:
+            run = (_DOUBLE_QUOTED_RUN if quote == '"' else _SINGLE_QUOTED_RUN).match(
+                text, i
+            )
+            if run:
+                out.append(run.group())
+                i = run.end()
+            elif c == quote:
+                out.append('"')
+                quote = None
+                i += 1
+            elif c == "\\":
+                escaped = text[i + 1 : i + 2]
+                # \' is not a JSON escape; a lone backslash at the end is dropped
+                out.append("'" if escaped == "'" else c + escaped)
+                i += 2
+            elif c == '"':
+                # Only reached inside single-quoted strings
+                out.append('\\"')
+                i += 1
+            else:
+                out.append(_CONTROL_ESCAPES.get(c) or f"\\u{ord(c):04x}")
+                note(CONTROL_CHARACTERS)
+                i += 1
+            continue
+
+        space = _SPACE.match(text, i)
+        if space:
+            out.append(space.group())
+            i = space.end()
+        elif c in _CLOSERS:
+            stack.append(_CLOSERS[c])
+            out.append(c)
+            cuts.append(len(out))
+            i += 1
+        elif c in "}]":
+            if not stack:
+                break
+            if c != stack[-1]:
+                return None
+            if _drop_trailing_comma(out):
+                note(TRAILING_COMMAS)
+            stack.pop()
+            out.append(c)
+            i += 1
+            if not stack:
+                break
+        elif c == ",":
+            cuts.append(len(out))
+            out.append(c)
+            i += 1
+        elif c == ":":
+            out.append(c)
+            i += 1
+        elif c in "\"'":
+            if c == "'":
+                note(SINGLE_QUOTES)
+            quote = c
+            out.append('"')
+            i += 1
+        else:
+            word = _WORD.match(text, i)
+            if not word:
+                return None
+            value = word.group()
+            if value in _PYTHON_LITERALS:
+                value = _PYTHON_LITERALS[value]
+                note(PYTHON_LITERALS)
+            elif not (
+                value in _JSON_LITERALS
+                or _NUMBER.fullmatch(value)
+                # A word cut off at the end is dropped when closing the value
+                or word.end() == n
+            ):
+                return None
+            out.append(value)
+            i = word.end()
+
+    if text[:start].strip() or text[i:].strip():
+        repairs.insert(0, EXTRACTED)
+
+    if not stack and not quote:
+        return _decode("".join(out), repairs)
+
+    # The text ended inside the value: close it, dropping the last values
+    # one at a time if what was cut off cannot be completed on its own
+    prefix = "".join(out)
+    if quote:
+        prefix += '"'
+        note(CLOSED_STRING)
+    note(CLOSED_BRACKETS)
+    result = _decode(_complete(prefix), repairs)
+    if result is not None:
+        return result
+    if CLOSED_STRING in repairs:
+        repairs.remove(CLOSED_STRING)
+    note(DROPPED_INCOMPLETE)
+    for cut in reversed(cuts):
+        result = _decode(_complete("".join(out[:cut])), repairs)
+        if result is not None:
+            return result
+    return None
+
+
+def _drop_trailing_comma(out: List[str]) -> bool:
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+        return True
+    return False
+
+
+def _complete(prefix: str) -> str:
+    """Close every bracket left open in normalised JSON text."""
+    prefix = prefix.rstrip()
+    if prefix.endswith(","):
+        prefix = prefix[:-1].rstrip()
+    if prefix.endswith(":"):
+        prefix += " null"
+    stack = []
+    for bracket in _BRACKET.findall(_STRING.sub("", prefix)):
+        if bracket in _CLOSERS:
+            stack.append(_CLOSERS[bracket])
+        elif stack:
+            stack.pop()
+    return prefix + "".join(reversed(stack))
+
+
+def _decode(text: str, repairs: List[str]) -> Optional[Tuple[Any, List[str]]]:
+    try:
+        return json_backend.loads(text), list(repairs)
+    except json.JSONDecodeError:
+        return None
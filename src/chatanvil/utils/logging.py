@@ -1,7 +1,8 @@
 import logging
 import os
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Dict, Optional
+
 from ..core.config import Config
 
 
@@ -14,14 +15,15 @@ class ChatLogger:
         Args:
             provider_name (str): The service provider name (e.g., 'openai', 'claude')
         """
-        self.config = Config(service_provider=provider_name)
+        # The logger only needs model and log settings, not credentials
+        self.config = Config(service_provider=provider_name, require_api_key=False)
         self.provider = provider_name
         self._system_prompt_logged = False
 
         # Set up main logger
         self.logger = logging.getLogger(f"chatanvil.{provider_name}")
         # 确保只添加一次handler
-        if not self.logger.handlers:  
+        if not self.logger.handlers:
             self._setup_handlers()
 
         # Set up chat logger for conversation history
@@ -44,28 +46,30 @@ class ChatLogger:
             # Log initial chat session information
             self.chat_logger.info("=== Chat Session Started ===")
             self.chat_logger.info(f"Provider: {provider_name}")
-            self.chat_logger.info(f"Model: {self.transform_file_name_from_slash_to_dot(self.config.model)}")
+            self.chat_logger.info(
+                f"Model: {self.transform_file_name_from_slash_to_dot(self.config.model)}"
+            )
             self.chat_logger.info("-" * 50)
 
     def _setup_handlers(self):
         """配置日志处理器"""
         self.logger.setLevel(logging.DEBUG)
-        
+
         # 控制台handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
-        
+
         # 文件handler（示例）
-        file_handler = logging.FileHandler('chat.log')
+        file_handler = logging.FileHandler("chat.log")
         file_handler.setLevel(logging.DEBUG)
-        
+
         # 统一格式
         formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         )
         console_handler.setFormatter(formatter)
         file_handler.setFormatter(formatter)
-        
+
         self.logger.addHandler(console_handler)
         self.logger.addHandler(file_handler)
 
@@ -122,9 +126,9 @@ class ChatLogger:
         # self.logger.info(f"Request - Model: {model or self.config.model}")
         # if self.config.debug:
         #     self.logger.debug(f"Message: {message}")
-            # if system_prompt:
-            #     self.logger.debug(f"System Prompt: {system_prompt}")
-            # self.logger.debug(f"Additional params: {kwargs}")
+        # if system_prompt:
+        #     self.logger.debug(f"System Prompt: {system_prompt}")
+        # self.logger.debug(f"Additional params: {kwargs}")
 
         # Log system prompt and parameters only once at the beginning
         if not self._system_prompt_logged:
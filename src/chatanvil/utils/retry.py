@@ -1,9 +1,111 @@
+import asyncio
+import inspect
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Any, Callable, Optional, Type, Union, Tuple
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type, Union
+
 from .logging import ChatLogger
 
 
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's deadline passes before it could finish."""
+
+
+# time.monotonic() value by which the current request must finish
+request_deadline: ContextVar[Optional[float]] = ContextVar(
+    "request_deadline", default=None
+)
+
+# Called with each error a retried call fails with, so a caller can react
+# to errors the retries hide (e.g. to lower its concurrency on 429s)
+retry_observer: ContextVar[Optional[Callable[[BaseException], None]]] = ContextVar(
+    "retry_observer", default=None
+)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Run the enclosed calls under a deadline, or under an enclosing earlier one."""
+    outer = request_deadline.get()
+    if deadline is None or (outer is not None and outer <= deadline):
+        yield
+        return
+    token = request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None without one.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return remaining
+
+
+def _within_deadline(kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Cap a numeric ``timeout`` argument at the time left before the deadline.
+
+    Returns:
+        The arguments for the attempt, and whether the deadline, not the
+        timeout asked for, bounds it
+    """
+    remaining = remaining_time()
+    timeout = kwargs.get("timeout")
+    if remaining is None or not isinstance(timeout, (int, float)):
+        return kwargs, False
+    if remaining >= timeout:
+        return kwargs, False
+    return {**kwargs, "timeout": remaining}, True
+
+
+def _check_deadline(error: BaseException, capped: bool) -> None:
+    """Raise DeadlineExceeded for a timeout caused by the request's own deadline."""
+    if capped and is_timeout_error(error):
+        raise DeadlineExceeded(f"request deadline exceeded: {error}") from error
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True if the error is an HTTP 429 from any provider SDK."""
+    return _status_code(error) == 429
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Return True if the error shows the provider is overloaded.
+
+    That is a rate limit (429), an overloaded or unavailable server (503,
+    Anthropic's 529) or a timeout, from any provider SDK or httpx. A
+    request running out of its own deadline says nothing about the provider.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    return _status_code(error) in (429, 503, 529) or is_timeout_error(error)
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """Return True if the error is a timeout from any provider SDK or httpx."""
+    return isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+
 def retry_with_exponential_backoff(
     max_retries: int = 3,
     base_delay: float = 1.0,
@@ -13,6 +115,12 @@ def retry_with_exponential_backoff(
 ) -> Callable:
     """Decorator for retrying functions with exponential backoff.
 
+    Under a request deadline (see deadline_scope), no attempt starts and no
+    backoff sleep ends after the deadline; DeadlineExceeded is raised
+    instead. A numeric ``timeout`` argument is capped at the time left
+    before each attempt, and an attempt timing out at that cap raises
+    DeadlineExceeded too.
+
     Args:
         max_retries: Maximum number of retry attempts
         base_delay: Initial delay between retries in seconds
@@ -21,32 +129,69 @@ def retry_with_exponential_backoff(
         logger: Optional ChatLogger instance for logging retries
     """
 
+    def next_delay(e: Exception, retries: int, delay: float) -> float:
+        """Return the delay before the next attempt, or re-raise when out of retries."""
+        observer = retry_observer.get()
+        if observer is not None:
+            observer(e)
+        if retries > max_retries:
+            if logger:
+                logger.log_error(e, f"Failed after {max_retries} retries")
+            raise e
+
+        # Calculate next delay with exponential backoff
+        delay = min(delay * 2, max_delay)
+
+        deadline = request_deadline.get()
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            raise DeadlineExceeded(f"no time left to retry after: {e}") from e
+
+        if logger:
+            logger.log_error(
+                e,
+                f"Attempt {retries}/{max_retries} failed. "
+                f"Retrying in {delay:.1f} seconds...",
+            )
+        return delay
+
     def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                retries = 0
+                delay = base_delay
+
+                while True:
+                    attempt_kwargs, capped = _within_deadline(kwargs)
+                    try:
+                        return await func(*args, **attempt_kwargs)
+                    except DeadlineExceeded:
+                        raise
+                    except exceptions as e:
+                        _check_deadline(e, capped)
+                        retries += 1
+                        delay = next_delay(e, retries, delay)
+                        # Sleeping on the event loop leaves other requests running
+                        await asyncio.sleep(delay)
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             retries = 0
             delay = base_delay
 
             while True:
+                attempt_kwargs, capped = _within_deadline(kwargs)
                 try:
-                    return func(*args, **kwargs)
+                    return func(*args, **attempt_kwargs)
+                except DeadlineExceeded:
+                    raise
                 except exceptions as e:
+                    _check_deadline(e, capped)
                     retries += 1
-                    if retries > max_retries:
-                        if logger:
-                            logger.log_error(e, f"Failed after {max_retries} retries")
-                        raise
-
-                    # Calculate next delay with exponential backoff
-                    delay = min(delay * 2, max_delay)
-
-                    if logger:
-                        logger.log_error(
-                            e,
-                            f"Attempt {retries}/{max_retries} failed. "
-                            f"Retrying in {delay:.1f} seconds...",
-                        )
-
+                    delay = next_delay(e, retries, delay)
                     time.sleep(delay)
 
         return wrapper
@@ -6,6 +6,23 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
+
+from chatanvil.testing import MockProviderServer  # noqa: E402
+
+
+@pytest.fixture
+def mock_server_options():
+    """MockProviderServer options for ``mock_server``; override per module."""
+    return {}
+
+
+@pytest.fixture
+def mock_server(mock_server_options):
+    """Fixture for a running mock server."""
+    with MockProviderServer(**mock_server_options) as server:
+        yield server
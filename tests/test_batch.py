@@ -0,0 +1,111 @@
+import pytest
+
+from chatanvil.core.batch import (
+    BatchJob,
+    BatchRequest,
+    BatchResult,
+    as_batch_requests,
+    collect_results,
+    wait_for_batch,
+)
+from chatanvil.core.chat import Chat
+from chatanvil.testing import MockProviderServer
+
+
+def test_batch_request_from_dict():
+    """Test building requests from get_chat_completion-style dicts."""
+    request = BatchRequest.from_dict(
+        {"custom_id": "a", "message": "Hello", "max_tokens": 10, "top_p": 0.5}
+    )
+    assert request.custom_id == "a"
+    assert request.messages == [{"role": "user", "content": "Hello"}]
+    assert request.max_tokens == 10
+    assert request.kwargs == {"top_p": 0.5}
+
+    numbered = as_batch_requests([{"message": "x"}, {"message": "y"}])
+    assert [r.custom_id for r in numbered] == ["0", "1"]
+
+    # "id" is an alias, never a provider parameter, and falsy ids are kept
+    request = BatchRequest.from_dict({"custom_id": 0, "id": "b", "message": "x"}, 5)
+    assert request.custom_id == "0"
+    assert request.kwargs == {}
+    assert BatchRequest.from_dict({"id": "b", "message": "x"}).custom_id == "b"
+
+
+def test_batch_request_validation():
+    """Test missing messages and duplicate ids."""
+    with pytest.raises(ValueError, match="has no messages"):
+        BatchRequest.from_dict({"custom_id": "a"})
+    with pytest.raises(ValueError, match="Duplicate custom_id"):
+        as_batch_requests([{"custom_id": "a", "message": "x"}] * 2)
+
+
+def test_wait_for_batch_backoff():
+    """Test that polling delays double up to the maximum."""
+    states = iter(["in_progress", "in_progress", "in_progress", "completed"])
+    sleeps = []
+    job = wait_for_batch(
+        lambda batch_id: BatchJob(id=batch_id, provider="test", status=next(states)),
+        BatchJob(id="b", provider="test", status="in_progress", custom_ids=["1"]),
+        poll_interval=1.0,
+        max_poll_interval=3.0,
+        sleep=sleeps.append,
+    )
+    assert job.status == "completed"
+    assert job.custom_ids == ["1"]
+    assert sleeps == [1.0, 2.0, 3.0, 3.0]
+
+
+def test_wait_for_batch_timeout():
+    """Test that polling gives up after the timeout."""
+    job = BatchJob(id="b", provider="test", status="in_progress")
+    with pytest.raises(TimeoutError, match="Batch b still in_progress"):
+        wait_for_batch(lambda batch_id: job, job, timeout=0.0, sleep=lambda s: None)
+
+
+def test_collect_results_reports_missing():
+    """Test that unanswered requests come back as errors."""
+    job = BatchJob(id="b", provider="test", status="expired", custom_ids=["1", "2"])
+    results = list(collect_results([BatchResult(custom_id="1", response="ok")], job))
+    assert [r.custom_id for r in results] == ["1", "2"]
+    assert results[0].ok
+    assert results[1].error == "No result returned (batch expired)"
+
+
+@pytest.mark.parametrize("provider", ["openai", "claude"])
+def test_run_batch_partial_failures(provider):
+    """Test a batch with injected failures against the mock server."""
+    requests = [{"custom_id": f"r{i}", "message": f"q{i}"} for i in range(20)]
+    with MockProviderServer(
+        error_rate=0.3, seed=7, response_text="done", batch_completion_time=0.2
+    ) as server:
+        chat = Chat(provider, api_key="test_key", base_url=server.base_url(provider))
+        results = {r.custom_id: r for r in chat.run_batch(requests, poll_interval=0.05)}
+
+    assert set(results) == {f"r{i}" for i in range(20)}
+    succeeded = [r for r in results.values() if r.ok]
+    failed = [r for r in results.values() if not r.ok]
+    assert succeeded and failed
+    assert all(r.response == "done" for r in succeeded)
+    assert all("Injected error" in r.error for r in failed)
+
+
+def test_run_batch_applies_parser():
+    """Test that batch responses go through the active parser."""
+    with MockProviderServer(response_text='{"a": 1}') as server:
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            parser_type="json",
+        )
+        (result,) = chat.run_batch([{"message": "x"}], poll_interval=0.01)
+    assert result.response == '{\n  "a": 1\n}'
+
+
+def test_batch_not_supported():
+    """Test providers without a batch API."""
+    with MockProviderServer() as server:
+        chat = Chat("ollama", base_url=server.base_url("ollama"))
+        with pytest.raises(NotImplementedError, match="does not support batch jobs"):
+            chat.submit_batch([{"message": "x"}])
@@ -0,0 +1,189 @@
+import json
+
+import pytest
+
+from chatanvil.cli import main
+from chatanvil.cli.batch import BatchRunner, Checkpoint
+from chatanvil.core.chat import Chat
+from chatanvil.parsers.factory import ParserFactory
+
+
+@pytest.fixture
+def mock_server_options():
+    """Have the mock server answer with a code block."""
+    return {"response_text": "```python\nprint(1)\n```"}
+
+
+def write_input(path, count):
+    """Write a JSONL input file with ``count`` requests."""
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({"id": f"q{i}", "message": f"question {i}"}) + "\n")
+
+
+def read_output(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_batch_runner(tmp_path, mock_server):
+    """Test that every line gets one result with the optional columns."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(input_path, 12)
+    with open(input_path, "a") as f:
+        f.write("\n")
+        f.write(json.dumps({"messages": [{"role": "user", "content": "hi"}]}) + "\n")
+    chat = Chat("ollama", base_url=mock_server.base_url("ollama"))
+
+    summary = BatchRunner(
+        chat,
+        str(input_path),
+        str(output_path),
+        concurrency=4,
+        parser=ParserFactory.get_parser("markdown"),
+        extract_code=True,
+        checkpoint_every=5,
+    ).run()
+
+    records = read_output(output_path)
+    assert summary.processed == 13
+    assert summary.errors == 0
+    assert sorted(r["line"] for r in records) == list(range(12)) + [13]
+    assert {r["id"] for r in records} >= {"q0", "q11", 13}
+    assert all(
+        r["code"] == [{"language": "python", "content": "print(1)"}] for r in records
+    )
+    checkpoint = Checkpoint.load(f"{output_path}.ckpt")
+    assert checkpoint.finished
+    assert checkpoint.watermark == 14
+
+
+def test_batch_runner_resumes(tmp_path, mock_server):
+    """Test that a resumed run only processes lines without a result."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(input_path, 10)
+    # Simulate a run killed after lines 0-2 and 5 were written, with a
+    # checkpoint taken after line 1 and a torn final write
+    with open(output_path, "w") as f:
+        for line in (0, 1):
+            f.write(
+                json.dumps({"id": f"q{line}", "line": line, "response": "x"}) + "\n"
+            )
+        output_bytes = f.tell()
+        for line in (2, 5):
+            f.write(
+                json.dumps({"id": f"q{line}", "line": line, "response": "x"}) + "\n"
+            )
+        f.write('{"id": "q6", "li')
+    Checkpoint(
+        input_path=str(input_path.resolve()), watermark=2, output_bytes=output_bytes
+    ).save(f"{output_path}.ckpt")
+
+    chat = Chat("ollama", base_url=mock_server.base_url("ollama"))
+    summary = BatchRunner(chat, str(input_path), str(output_path), concurrency=2).run()
+
+    records = read_output(output_path)
+    assert summary.skipped == 4
+    assert summary.processed == 6
+    assert sorted(r["line"] for r in records) == list(range(10))
+    assert mock_server.stats.snapshot()["completed"] == 6
+
+
+def test_batch_runner_records_errors(tmp_path, mock_server):
+    """Test that bad lines are written with an error instead of stopping the run."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    input_path.write_text('{"id": "bad"}\n{"id": "good", "prompt": "hi"}\n')
+    chat = Chat("ollama", base_url=mock_server.base_url("ollama"))
+
+    summary = BatchRunner(chat, str(input_path), str(output_path)).run()
+
+    records = {r["id"]: r for r in read_output(output_path)}
+    assert summary.errors == 1
+    assert "no message" in records["bad"]["error"]
+    assert "response" in records["good"]
+
+
+def test_batch_runner_retries_errors_on_resume(tmp_path, mock_server):
+    """Test that a resumed run retries lines that failed, e.g. during an outage."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(input_path, 3)
+    with open(output_path, "w") as f:
+        f.write(json.dumps({"id": "q0", "line": 0, "response": "x"}) + "\n")
+        f.write(json.dumps({"id": "q1", "line": 1, "error": "RateLimitError"}) + "\n")
+    chat = Chat("ollama", base_url=mock_server.base_url("ollama"))
+
+    summary = BatchRunner(chat, str(input_path), str(output_path)).run()
+
+    assert summary.skipped == 1
+    assert summary.processed == 2
+    assert "response" in read_output(output_path)[-1]
+    assert Checkpoint.load(f"{output_path}.ckpt").watermark == 3
+
+
+def test_batch_runner_reports_malformed_lines(tmp_path, mock_server):
+    """Test that a line that is not JSON is reported instead of aborting the run."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    input_path.write_text('{"id": "a", "prompt": "hi"}\n{"id": \n[1]\n')
+    chat = Chat("ollama", base_url=mock_server.base_url("ollama"))
+
+    summary = BatchRunner(chat, str(input_path), str(output_path)).run()
+
+    records = {r["line"]: r for r in read_output(output_path)}
+    assert summary.processed == 3
+    assert summary.errors == 2
+    assert "response" in records[0]
+    assert records[1]["id"] == 1
+    assert records[1]["error"].startswith("JSONDecodeError: ")
+    assert "not a JSON object" in records[2]["error"]
+    checkpoint = Checkpoint.load(f"{output_path}.ckpt")
+    assert checkpoint.finished
+    assert checkpoint.watermark == 1
+
+
+def test_batch_runner_counts_failed_writes(tmp_path, mock_server):
+    """Test that a result that cannot be written is counted and left pending."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(input_path, 2)
+    chat = Chat("ollama", base_url=mock_server.base_url("ollama"))
+    chat.get_response = lambda message, **kwargs: object()
+
+    summary = BatchRunner(chat, str(input_path), str(output_path)).run()
+
+    assert summary.processed == 0
+    assert summary.errors == 2
+    assert read_output(output_path) == []
+    checkpoint = Checkpoint.load(f"{output_path}.ckpt")
+    assert checkpoint.finished
+    assert checkpoint.watermark == 0
+
+
+def test_batch_runner_validation(tmp_path):
+    """Test argument validation."""
+    with pytest.raises(ValueError, match="Concurrency must be at least 1"):
+        BatchRunner(None, "in.jsonl", "out.jsonl", concurrency=0)
+    with pytest.raises(ValueError, match="Code extraction requires"):
+        BatchRunner(None, "in.jsonl", "out.jsonl", extract_code=True)
+
+
+def test_cli_batch(tmp_path, mock_server, capsys):
+    """Test the batch subcommand end to end, including a no-op rerun."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_input(input_path, 5)
+    argv = [
+        "batch",
+        str(input_path),
+        "-o",
+        str(output_path),
+        "--provider",
+        "ollama",
+        "--base-url",
+        mock_server.base_url("ollama"),
+        "--parser",
+        "markdown",
+    ]
+
+    assert main(argv) == 0
+    assert "5 processed" in capsys.readouterr().err
+    assert main(argv) == 0
+    assert "0 processed, 0 errors, 5 already done" in capsys.readouterr().err
+    assert len(read_output(output_path)) == 5
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from chatanvil.cli import main
+from chatanvil.cli.loadtest import LoadTest, load_prompts, percentile
+from chatanvil.core.chat import Chat
+from chatanvil.testing import MockProviderServer
+
+
+@pytest.fixture
+def mock_server_options():
+    """Make the mock server fast."""
+    return {"ttft": 0.01, "tokens_per_second": 1000, "output_tokens": 4}
+
+
+def test_percentile():
+    """Test linear-interpolated percentiles."""
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 100) == 5.0
+    assert percentile(values, 25) == 2.0
+    assert percentile([], 50) is None
+
+
+def test_load_prompts(tmp_path):
+    """Test loading prompt corpora from text and JSONL files."""
+    text_file = tmp_path / "prompts.txt"
+    text_file.write_text("first\n\nsecond\n")
+    assert load_prompts(str(text_file)) == ["first", "second"]
+
+    jsonl_file = tmp_path / "prompts.jsonl"
+    jsonl_file.write_text('{"prompt": "a"}\n{"message": "b"}\n')
+    assert load_prompts(str(jsonl_file)) == ["a", "b"]
+
+
+def test_load_test_run(mock_server):
+    """Test an open-loop run against the mock server."""
+    chat = Chat("openai", api_key="test_key", base_url=mock_server.base_url("openai"))
+    report = LoadTest(
+        chat, ["hello"], rate=50, total_requests=10, stream=True, seed=0
+    ).run()
+
+    assert report.sent == 10
+    assert report.completed == 10
+    assert report.errors == 0
+    assert report.ttft["p50"] is not None
+    assert report.latency["p99"] >= report.ttft["p99"]
+    assert mock_server.stats.snapshot()["streamed"] == 10
+
+
+def test_load_test_counts_rate_limits():
+    """Test that 429 responses are counted separately from other errors."""
+    with MockProviderServer(rate_limit_rate=1.0, retry_after=None) as server:
+        chat = Chat("ollama", base_url=server.base_url("ollama"))
+        report = LoadTest(
+            chat, ["hello"], rate=100, total_requests=5, stream=True
+        ).run()
+
+    assert report.errors == 5
+    assert report.rate_limited == 5
+    assert report.rate_limit_rate == 1.0
+
+
+def test_load_test_counts_retried_rate_limits():
+    """Test that 429s absorbed by provider retries still show in the report."""
+    with MockProviderServer(rate_limit_rate=1.0, retry_after=None) as server:
+        chat = Chat("openai", api_key="test_key", base_url=server.base_url("openai"))
+        # Too little time for a backoff: each request fails after one retried 429
+        report = LoadTest(
+            chat, ["hello"], rate=100, total_requests=3, request_kwargs={"timeout": 1.0}
+        ).run()
+        server_stats = server.stats.snapshot()
+
+    assert report.errors == 3
+    assert report.retried_rate_limits == 3
+    assert report.retried_errors == 3
+    # The SDK's own retries are off, so the server saw one request each
+    assert server_stats["rate_limited"] == 3
+    assert "3 errors (3 429) hidden by retries" in report.format()
+
+
+def test_load_test_validation():
+    """Test argument validation."""
+    with pytest.raises(ValueError, match="Request rate must be positive"):
+        LoadTest(None, ["x"], rate=0, total_requests=1)
+    with pytest.raises(ValueError, match="Unsupported arrival process"):
+        LoadTest(None, ["x"], rate=1, total_requests=1, arrival="bursty")
+
+
+def test_cli_loadtest_json(capsys):
+    """Test the loadtest subcommand against the in-process mock server."""
+    exit_code = main(
+        [
+            "loadtest",
+            "--mock",
+            "--mock-ttft",
+            "0.01",
+            "--rate",
+            "50",
+            "--requests",
+            "5",
+            "--json",
+        ]
+    )
+    report = json.loads(capsys.readouterr().out)
+    assert exit_code == 0
+    assert report["sent"] == 5
+    assert report["completed"] == 5
+    assert "cpu_seconds" in report
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from chatanvil.cli import main
+from chatanvil.cli.parserbench import BenchmarkResult, ParserBenchmark, parse_size
+from chatanvil.testing.corpus import GENERATORS, generate_case, generate_corpus
+
+
+def test_parse_size():
+    """Test parsing sizes with unit suffixes."""
+    assert parse_size("512") == 512
+    assert parse_size("100k") == 100 << 10
+    assert parse_size("10MB") == 10 << 20
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_corpus_is_deterministic_and_sized():
+    """Test that every corpus kind reaches its size and repeats for a seed."""
+    for kind in GENERATORS:
+        case = generate_case(kind, 4096, seed=1)
+        assert case.size >= 4096 * 0.9
+        assert case.text == generate_case(kind, 4096, seed=1).text
+    assert len(generate_corpus([1024, 2048], ["plain_text", "xml_large"])) == 4
+    with pytest.raises(ValueError):
+        generate_case("unknown", 1024)
+
+
+def test_benchmark_measures_each_parser():
+    """Test that every parser meant for a kind is timed on both methods."""
+    report = ParserBenchmark(
+        sizes=[1024, 4096], kinds=["markdown_fences"], repeat=2
+    ).run()
+
+    assert {(r.parser, r.method) for r in report.results} == {
+        ("markdown", "parse_response"),
+        ("markdown", "extract_code"),
+        ("auto", "parse_response"),
+        ("auto", "extract_code"),
+    }
+    for result in report.results:
+        assert result.calls == 2
+        assert result.mb_per_second > 0
+        assert result.latency["p50"] <= result.latency["max"]
+        assert result.peak_memory is not None
+    assert report.flagged == []
+
+
+def test_benchmark_flags_superlinear_growth():
+    """Test that a quadratic case is flagged and larger sizes are skipped."""
+    report = ParserBenchmark(
+        sizes=[4096, 16384, 100 << 20],
+        kinds=["markdown_unterminated"],
+        parsers=["markdown"],
+        methods=["extract_code"],
+        repeat=1,
+        budget=5.0,
+        measure_memory=False,
+    ).run()
+
+    assert report.results[1].exponent > 1.5
+    assert report.results[-1].skipped
+    assert report.flagged[0]["parser"] == "markdown"
+    assert "n^" in report.flagged[0]["reason"]
+
+
+def test_benchmark_flags_errors():
+    """Test that a parser raising on a case is reported, not propagated."""
+    report = ParserBenchmark(
+        sizes=[1024, 4096],
+        kinds=["json_deep"],
+        parsers=["json"],
+        methods=["parse_response"],
+        repeat=1,
+    ).run()
+
+    assert report.results == [
+        BenchmarkResult(
+            "json_deep",
+            "json",
+            "parse_response",
+            report.results[0].size,
+            error="RecursionError",
+        )
+    ]
+    assert "RecursionError" in report.flagged[0]["reason"]
+
+
+def test_parserbench_cli_json(capsys):
+    """Test the parserbench command end to end with JSON output."""
+    exit_code = main(
+        [
+            "parserbench",
+            "--sizes",
+            "1k,2k",
+            "--kinds",
+            "xml_large",
+            "--parsers",
+            "xml",
+            "--repeat",
+            "1",
+            "--json",
+        ]
+    )
+
+    report = json.loads(capsys.readouterr().out)
+    assert exit_code == 0
+    assert len(report["results"]) == 4
+    assert report["flagged"] == []
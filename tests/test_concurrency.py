@@ -0,0 +1,207 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.concurrency import AdaptiveLimiter, AIMDLimit
+from chatanvil.core.scheduler import DeadlineExceeded
+from chatanvil.testing import LatencyDistribution, MockProviderServer
+from chatanvil.utils.retry import retry_observer, retry_with_exponential_backoff
+
+
+class RateLimited(Exception):
+    """Stand-in for an SDK's 429 error."""
+
+    status_code = 429
+
+
+def run_round(limit, latency):
+    """Run as many requests as the limit allows, each taking ``latency``."""
+    permits = [limit.acquire() for _ in range(int(limit.limit))]
+    for permit in permits:
+        permit.latency = latency
+        limit.release(permit)
+
+
+def test_limit_grows_while_healthy():
+    """Test the additive increase of a saturated, healthy limit."""
+    limit = AIMDLimit(initial_limit=4, max_limit=10)
+    for _ in range(5):
+        run_round(limit, 0.1)
+    assert 6 < limit.limit < 10
+    for _ in range(20):
+        run_round(limit, 0.1)
+    assert limit.limit == 10
+
+
+def test_limit_is_cut_once_per_overload():
+    """Test the multiplicative decrease on errors, once for concurrent requests."""
+    limit = AIMDLimit(initial_limit=8)
+    permits = [limit.acquire() for _ in range(4)]
+    for permit in permits:
+        limit.release(permit, RateLimited())
+    assert limit.snapshot()["limit"] == 4
+    assert limit.snapshot()["decreases"] == 1
+
+    permit = limit.acquire()
+    limit.release(permit, TimeoutError())
+    assert limit.snapshot()["limit"] == 2
+
+    # Errors that say nothing about load leave the limit alone
+    permit = limit.acquire()
+    limit.release(permit, ValueError())
+    assert limit.snapshot()["limit"] == 2
+
+
+def test_latency_inflation_cuts_the_limit():
+    """Test that responses slowing down well past the baseline cut the limit."""
+    limit = AIMDLimit(initial_limit=8, max_limit=8)
+    for _ in range(3):
+        run_round(limit, 0.1)
+    assert limit.snapshot()["decreases"] == 0
+    run_round(limit, 1.0)
+    assert limit.snapshot()["limit"] == 4
+
+
+def test_requests_wait_for_the_limit():
+    """Test that requests past the limit wait, and give up at their deadline."""
+    limit = AIMDLimit(initial_limit=1)
+    permit = limit.acquire()
+    with pytest.raises(DeadlineExceeded):
+        limit.acquire(deadline=time.monotonic() + 0.05)
+
+    admitted = threading.Event()
+    waiter = threading.Thread(
+        target=lambda: (limit.release(limit.acquire()), admitted.set())
+    )
+    waiter.start()
+    assert not admitted.wait(0.1)
+    limit.release(permit)
+    assert admitted.wait(5)
+    assert limit.snapshot()["inflight"] == 0
+
+
+def test_retried_rate_limits_are_seen():
+    """Test that 429s hidden by retries still cut the limit."""
+    limiter = AdaptiveLimiter(initial_limit=8)
+    calls = []
+
+    @retry_with_exponential_backoff(max_retries=3, base_delay=0.01)
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RateLimited()
+        return "ok"
+
+    with limiter.slot("openai", "gpt-4o"):
+        assert flaky() == "ok"
+    assert limiter.limit("openai", "gpt-4o") == 4
+    assert limiter.limit("openai", "gpt-4o-mini") == 8
+    assert limiter.snapshot()["openai/gpt-4o"]["decreases"] == 1
+
+
+def test_slot_keeps_the_callers_retry_observer():
+    """Test that a slot reports retried errors to an enclosing observer too."""
+    limiter = AdaptiveLimiter(initial_limit=8)
+    seen = []
+    calls = []
+
+    @retry_with_exponential_backoff(max_retries=3, base_delay=0.01)
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise RateLimited()
+        return "ok"
+
+    token = retry_observer.set(seen.append)
+    try:
+        with limiter.slot("openai", "gpt-4o"):
+            assert flaky() == "ok"
+    finally:
+        retry_observer.reset(token)
+    assert len(seen) == 1
+    assert limiter.limit("openai", "gpt-4o") == 4
+
+
+def test_caller_deadlines_are_not_overload():
+    """Test that requests running out of their own timeout leave the limit alone."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(0.5)
+    ) as server:
+        limiter = AdaptiveLimiter(initial_limit=16)
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            model="mock-model",
+            base_url=server.base_url("openai"),
+            limiter=limiter,
+        )
+        chat.provider.client = chat.provider.client.with_options(max_retries=0)
+        for _ in range(4):
+            with pytest.raises(DeadlineExceeded):
+                chat.get_response("Hi", timeout=0.2)
+        snapshot = limiter.snapshot()["openai/mock-model"]
+        assert snapshot["limit"] == 16
+        assert snapshot["decreases"] == 0
+
+        # A timeout at the configured provider timeout still counts
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            model="mock-model",
+            base_url=server.base_url("openai"),
+            limiter=limiter,
+            timeout=0.2,
+        )
+        chat.provider.client = chat.provider.client.with_options(max_retries=0)
+        with pytest.raises(Exception):
+            chat.get_response("Hi", timeout=3)
+        assert limiter.snapshot()["openai/mock-model"]["decreases"] == 1
+
+
+def test_chat_requests_follow_the_limit():
+    """Test that Chat requests are held to the limit, which is cut on 429s."""
+    with MockProviderServer(
+        response_text="ok",
+        ttft=LatencyDistribution.constant(0.2),
+        max_concurrency=4,
+        retry_after=0.05,
+    ) as server:
+        limiter = AdaptiveLimiter(initial_limit=6, max_limit=6)
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            model="mock-model",
+            base_url=server.base_url("openai"),
+            limiter=limiter,
+        )
+        chat.provider.client = chat.provider.client.with_options(max_retries=0)
+        with ThreadPoolExecutor(6) as executor:
+            results = list(executor.map(lambda _: chat.get_response("Hi"), range(6)))
+        assert results == ["ok"] * 6
+
+        snapshot = limiter.snapshot()["openai/mock-model"]
+        assert snapshot["decreases"] >= 1
+        assert snapshot["limit"] < 6
+        assert snapshot["inflight"] == 0
+        assert server.stats.snapshot()["peak_inflight"] <= 6
+
+
+def test_submitted_requests_follow_the_limit():
+    """Test that requests on the submit loop are held to the limit too."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(0.1)
+    ) as server:
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            limiter=limiter,
+        )
+        futures = [chat.submit("Hi") for _ in range(8)]
+        assert [future.result(timeout=10) for future in futures] == ["ok"] * 8
+        assert server.stats.snapshot()["peak_inflight"] <= 2
+        assert limiter.limit("openai", chat.provider.model) == 2
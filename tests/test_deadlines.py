@@ -0,0 +1,151 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.concurrency import AdaptiveLimiter
+from chatanvil.testing import LatencyDistribution, MockProviderServer
+from chatanvil.utils.retry import (
+    DeadlineExceeded,
+    deadline_scope,
+    remaining_time,
+    request_deadline,
+    retry_observer,
+    retry_with_exponential_backoff,
+)
+
+
+class RateLimited(Exception):
+    """Stand-in for an SDK's 429 error."""
+
+    status_code = 429
+
+
+def slow_chat(server):
+    chat = Chat("openai", api_key="test_key", base_url=server.base_url("openai"))
+    # Leave retries to chatanvil, which knows the deadline
+    chat.provider.client = chat.provider.client.with_options(max_retries=0)
+    return chat
+
+
+def test_retries_stop_at_the_deadline():
+    """Test that a backoff sleep past the deadline raises instead of sleeping."""
+    calls = []
+
+    @retry_with_exponential_backoff(max_retries=5, base_delay=1.0)
+    def call(timeout=None):
+        calls.append(timeout)
+        raise RateLimited()
+
+    started = time.monotonic()
+    with deadline_scope(time.monotonic() + 0.5):
+        with pytest.raises(DeadlineExceeded) as info:
+            call(timeout=30.0)
+    assert time.monotonic() - started < 0.5
+    assert isinstance(info.value.__cause__, RateLimited)
+    # The SDK timeout was capped at the time left
+    assert len(calls) == 1 and calls[0] <= 0.5
+
+
+def test_nested_deadlines_keep_the_earliest():
+    """Test that an inner scope cannot extend an enclosing deadline."""
+    with deadline_scope(time.monotonic() + 1.0):
+        with deadline_scope(time.monotonic() + 60.0):
+            assert remaining_time() <= 1.0
+        with deadline_scope(time.monotonic() - 1.0):
+            with pytest.raises(DeadlineExceeded):
+                remaining_time()
+    assert remaining_time() is None
+
+
+def test_get_response_timeout():
+    """Test that a request to a hung provider fails at its timeout."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(2.0)
+    ) as server:
+        chat = slow_chat(server)
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            chat.get_response("Hi", timeout=0.3)
+        assert time.monotonic() - started < 1.5
+
+
+def test_stream_ttft_timeout():
+    """Test that a stream with no first chunk in time is given up."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(2.0)
+    ) as server:
+        chat = slow_chat(server)
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            list(chat.stream_response("Hi", ttft_timeout=0.3))
+        assert time.monotonic() - started < 1.5
+
+
+def test_stream_deadline_and_cancel():
+    """Test that a stream stops at its deadline, or when cancelled, mid-response."""
+    with MockProviderServer(output_tokens=20, tokens_per_second=10) as server:
+        chat = slow_chat(server)
+        chunks = []
+        with pytest.raises(DeadlineExceeded):
+            for chunk in chat.stream_response("Hi", timeout=0.5):
+                chunks.append(chunk)
+        assert 0 < len(chunks) < 20
+
+        cancel = threading.Event()
+        chunks = []
+        with pytest.raises(CancelledError):
+            for chunk in chat.stream_response("Hi", cancel=cancel):
+                chunks.append(chunk)
+                cancel.set()
+        assert len(chunks) == 1
+
+
+def test_partly_read_stream_keeps_its_deadline_to_itself():
+    """Test that a stream's deadline and limiter slot do not leak into other requests."""
+    with MockProviderServer(output_tokens=20, tokens_per_second=10) as server:
+        chat = slow_chat(server)
+        chat.limiter = AdaptiveLimiter()
+        stream = chat.stream_response("Hi", timeout=0.5)
+        next(stream)
+        assert request_deadline.get() is None
+        assert retry_observer.get() is None
+
+        time.sleep(0.6)
+        server.behavior.tokens_per_second = None
+        assert chat.get_response("Hi")
+        with pytest.raises(DeadlineExceeded):
+            next(stream)
+
+
+def test_total_timeout_bounds_a_trickling_response(monkeypatch):
+    """Test that total_timeout stops a response whose bytes keep arriving."""
+    monkeypatch.setenv("HTTP_TOTAL_TIMEOUT", "0.5")
+    with MockProviderServer(output_tokens=40, tokens_per_second=10) as server:
+        chat = slow_chat(server)
+        assert chat.config.total_timeout == 0.5
+        assert "total_timeout" not in chat.config.http_options
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            "".join(chat.stream_response("Hi"))
+        assert time.monotonic() - started < 1.5
+        # A request's own timeout takes precedence
+        assert len(list(chat.stream_response("Hi", max_tokens=3, timeout=5))) == 3
+
+
+def test_submit_timeout():
+    """Test that a submitted request fails at its timeout."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(2.0)
+    ) as server:
+        chat = Chat("openai", api_key="test_key", base_url=server.base_url("openai"))
+        started = time.monotonic()
+        future = chat.submit("Hi", timeout=0.3)
+        with pytest.raises(DeadlineExceeded):
+            future.result(timeout=5)
+        assert time.monotonic() - started < 1.5
+
+        server.behavior.ttft = LatencyDistribution.constant(0.0)
+        assert chat.submit("Hi", timeout=5).result(timeout=5) == "ok"
@@ -0,0 +1,77 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.embeddings import Embedder, EmbeddingCache
+from chatanvil.testing.wire import mock_embedding
+
+
+class RecordingProvider:
+    """Provider stand-in that records the batches it is asked to embed."""
+
+    EMBEDDING_MODEL = "test-embedding"
+    EMBEDDING_BATCH_SIZE = 3
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_batch(self, texts, model=None, **kwargs):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_embedder_batches_and_caches():
+    """Test batching by count and characters, deduplication and the cache."""
+    provider = RecordingProvider()
+    embedder = Embedder(provider, max_batch_chars=8, concurrency=2)
+
+    vectors = embedder.embed(["a", "bb", "a", "ccc", "dddddddd", "e"])
+    assert vectors.dtype == np.float32
+    assert vectors.flags["C_CONTIGUOUS"]
+    assert vectors[:, 0].tolist() == [1, 2, 1, 3, 8, 1]
+    assert provider.batches == [["a", "bb", "ccc"], ["dddddddd"], ["e"]]
+
+    provider.batches.clear()
+    again = embedder.embed(["bb", "new"])
+    assert provider.batches == [["new"]]
+    assert again[:, 0].tolist() == [2, 3]
+    assert embedder.embed("a").shape == (2,)
+
+
+def test_embedding_cache_key_includes_model_and_options():
+    """Test that the same text under another model or option is a miss."""
+    key = EmbeddingCache.key("m", "text")
+    assert key == EmbeddingCache.key("m", "text")
+    assert key != EmbeddingCache.key("other", "text")
+    assert key != EmbeddingCache.key("m", "text", {"dimensions": 4})
+
+    cache = EmbeddingCache(maxsize=1)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    assert cache.get(b"a") is None and len(cache) == 1
+
+
+@pytest.mark.parametrize("provider", ["openai", "ollama"])
+def test_chat_embed_against_mock_server(mock_server, provider):
+    """Test embeddings through the OpenAI (base64) and Ollama wire formats."""
+    chat = Chat(provider, api_key="test_key", base_url=mock_server.base_url(provider))
+    chat.embedder = Embedder(chat.provider, batch_size=2)
+
+    vectors = chat.embed(["one", "two", "three", "one"], model="mock-embed")
+
+    assert vectors.shape == (4, 8)
+    np.testing.assert_allclose(vectors[2], mock_embedding("three"), rtol=1e-6)
+    assert (vectors[0] == vectors[3]).all()
+    stats = mock_server.stats.snapshot()
+    assert stats["embedded"] == 3
+
+    chat.embed(["two"], model="mock-embed")
+    assert mock_server.stats.snapshot()["embedded"] == 3
+
+
+def test_embed_unsupported_provider():
+    """Test that providers without an embeddings API say so."""
+    chat = Chat("claude", api_key="test_key")
+    with pytest.raises(ValueError, match="no default embedding model"):
+        chat.embed(["text"])
@@ -0,0 +1,62 @@
+import pytest
+
+from chatanvil.parsers.auto import AutoParser
+from chatanvil.parsers.factory import ParserFactory
+
+
+@pytest.mark.parametrize(
+    "response, expected",
+    [
+        ('  {"code": "x = 1", "language": "python"}', "json"),
+        ("[1, 2]", "json"),
+        ("<root><code>x</code></root>", "xml"),
+        ('Here it is:\n```json\n{"a": 1}\n```', "json"),
+        ("Here it is:\n```XML\n<a/>\n```", "xml"),
+        ("Here it is:\n```python\nx = 1\n```", "markdown"),
+        ("Plain text with a {brace} and a <tag>.", "default"),
+        ("", "default"),
+    ],
+)
+def test_detect_format(response, expected):
+    """Test format sniffing from the leading character or first fence."""
+    assert AutoParser().detect_format(response) == expected
+
+
+def test_auto_parser_delegates():
+    """Test that results match the chosen parser and record the format."""
+    parser = ParserFactory.get_parser("auto")
+    parsed = parser.parse('{"code": "x = 1", "language": "python",}')
+    assert parsed.format == "json"
+    assert parsed.data == {"code": "x = 1", "language": "python"}
+    assert parsed.repairs == ["removed_trailing_commas"]
+    assert (
+        parser.parse_response(parsed.raw)
+        == '{\n  "code": "x = 1",\n  "language": "python"\n}'
+    )
+
+    response = "Use this:\n```python\nprint(1)\n```\nand this:\n```bash\nls\n```"
+    assert parser.parse(response).format == "markdown"
+    assert parser.parse_response(response) == response
+    assert parser.extract_code(response) == [
+        {"language": "python", "content": "print(1)"},
+        {"language": "bash", "content": "ls"},
+    ]
+
+    xml = '<root><code language="python">x = 1</code></root>'
+    assert parser.extract_code(xml) == [{"language": "python", "content": "x = 1"}]
+    assert parser.parse("Hello").format == "default"
+    assert parser.extract_code("Hello") == []
+
+
+def test_auto_parser_parses_each_response_once(monkeypatch):
+    """Test that a response is sniffed and parsed a single time."""
+    parser = AutoParser()
+    calls = []
+    original = parser.parsers["json"]._build
+    monkeypatch.setattr(
+        parser.parsers["json"], "_build", lambda r: calls.append(r) or original(r)
+    )
+    text = parser.parse_response('{"a": 1}')
+    parser.extract_code('{"a": 1}')
+    parser.extract_code(text)
+    assert len(calls) == 1
@@ -0,0 +1,195 @@
+import json
+import time
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.parsers.completion import (
+    JSONValueDetector,
+    get_detector,
+)
+from chatanvil.testing import MockProviderServer
+
+
+def feed_all(until, text, size):
+    """Feed text in fixed-size chunks; return the complete prefix or None."""
+    detector = get_detector(until)
+    for i in range(0, len(text), size):
+        end = detector.feed(text[i : i + size])
+        if end is not None:
+            return text[:end]
+    return None
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+@pytest.mark.parametrize(
+    "until, text, expected",
+    [
+        (
+            "json",
+            'Sure: {"a": "x}\\"]", "b": [1, {"c": 2}]} Anything else?',
+            'Sure: {"a": "x}\\"]", "b": [1, {"c": 2}]}',
+        ),
+        ("json", "```json\n[1, 2]\n```\nDone.", "```json\n[1, 2]\n```"),
+        (
+            "json",
+            'It returns a list [like this]:\n```json\n{"a": [1]}\n```\nDone.',
+            'It returns a list [like this]:\n```json\n{"a": [1]}\n```',
+        ),
+        (
+            "json",
+            '```python\nx = [1]\n```\n```json\n{"a": 1}\n```',
+            '```python\nx = [1]\n```\n```json\n{"a": 1}\n```',
+        ),
+        (
+            "json",
+            'As shown in [1], the answer is {"x": 2}. See [2].',
+            'As shown in [1], the answer is {"x": 2}',
+        ),
+        ("json", "Values:\n[1, 2]\nDone.", "Values:\n[1, 2]"),
+        (
+            "code",
+            'Here:\n```python\nprint("```")\n```\nThis prints...',
+            'Here:\n```python\nprint("```")\n```',
+        ),
+        (
+            "xml",
+            'a < b: <?xml version="1.0"?><r><!-- </r> --><code>1 &lt; 2</code><x/></r> ok',
+            'a < b: <?xml version="1.0"?><r><!-- </r> --><code>1 &lt; 2</code><x/></r>',
+        ),
+        ("xml", "```xml\n<r/>\n``` bye", "```xml\n<r/>\n```"),
+        (lambda text: "END" in text, "abc END", "abc END"),
+    ],
+)
+def test_detectors_find_end_across_chunk_sizes(until, text, expected, size):
+    """Test that completion is detected at the same place however text is split."""
+    assert feed_all(until, text, size) == expected
+
+
+def test_detectors_wait_for_incomplete_responses():
+    """Test that unfinished documents are not reported complete."""
+    assert feed_all("json", '{"a": [1, 2}', 1) is None
+    assert feed_all("code", "```python\nx = 1\n``", 1) is None
+    assert feed_all("xml", "<r><a></a>", 1) is None
+
+
+def test_json_detector_scans_each_chunk_once():
+    """Test that a long stream is scanned in linear time."""
+    detector = JSONValueDetector()
+    detector.feed("```json\n[")
+    started = time.perf_counter()
+    for _ in range(20000):
+        assert detector.feed('"a", ') is None
+    assert detector.feed('"b"]\n```') is not None
+    assert time.perf_counter() - started < 1.0
+
+
+def test_predicate_detector_scans_each_chunk_once():
+    """Test that a predicate sees the text so far without quadratic copying."""
+    detector = get_detector(lambda text: text.endswith("END"))
+    started = time.perf_counter()
+    for _ in range(50000):
+        assert detector.feed("word ") is None
+    assert detector.feed("END") == 50000 * 5 + 3
+    assert time.perf_counter() - started < 1.0
+
+
+def test_get_detector_rejects_unknown_names():
+    """Test that unknown detector names raise a ValueError."""
+    assert isinstance(get_detector("JSON"), JSONValueDetector)
+    with pytest.raises(ValueError, match="Unsupported completion detector"):
+        get_detector("yaml")
+
+
+@pytest.mark.parametrize("provider", ["openai", "claude", "ollama"])
+def test_get_response_until_stops_stream_early(provider):
+    """Test that the stream is closed once the parser has a complete value."""
+    payload = {"code": "print(1)", "language": "python"}
+    text = json.dumps(payload) + " " + " ".join(["commentary"] * 200)
+    with MockProviderServer(response_text=text, tokens_per_second=200) as server:
+        chat = Chat(
+            provider,
+            api_key="test_key",
+            base_url=server.base_url(provider),
+            parser_type="json",
+            parser_options={"return_objects": True},
+        )
+        started = time.monotonic()
+        result = chat.get_response_until("Give me JSON")
+        elapsed = time.monotonic() - started
+        deadline = time.monotonic() + 5
+        while (
+            server.stats.snapshot()["disconnected"] == 0 and time.monotonic() < deadline
+        ):
+            time.sleep(0.05)
+        stats = server.stats.snapshot()
+
+    assert result == payload
+    # The full response would take about a second to stream
+    assert elapsed < 0.5
+    assert stats["disconnected"] == 1
+    assert stats["completed"] == 0
+
+
+@pytest.mark.parametrize("provider", ["openai", "claude", "groq", "ollama"])
+def test_stop_sequences_normalized(provider):
+    """Test that ``stop`` is sent in each provider's own format."""
+    bodies = []
+
+    def responder(body):
+        bodies.append(body)
+        return "first part END second part"
+
+    with MockProviderServer(responder=responder) as server:
+        chat = Chat(provider, api_key="test_key", base_url=server.base_url(provider))
+        response = chat.get_response("Hi", stop="END")
+        streamed = "".join(chat.stream_response("Hi", stop=["END"]))
+
+    assert response.strip() == "first part"
+    assert streamed.strip() == "first part"
+    if provider == "claude":
+        assert bodies[0]["stop_sequences"] == ["END"]
+    elif provider == "ollama":
+        assert bodies[0]["options"]["stop"] == ["END"]
+    else:
+        assert bodies[0]["stop"] == ["END"]
+
+
+@pytest.mark.parametrize("provider", ["openai", "claude", "ollama"])
+def test_get_response_until_keeps_finish_reason(provider):
+    """Test that a stream read to the end reports a max_tokens cutoff."""
+    with MockProviderServer(response_text="one two three four") as server:
+        chat = Chat(provider, api_key="test_key", base_url=server.base_url(provider))
+        truncated = chat.get_response_until("Hi", max_tokens=2)
+        complete = chat.get_response_until("Hi", max_tokens=100)
+
+    assert truncated.finish_reason == "length"
+    assert complete.finish_reason == "stop"
+
+
+@pytest.mark.parametrize(
+    "provider, expected_key",
+    [("openai", "response_format"), ("ollama", "format"), ("claude", "tool_choice")],
+)
+def test_get_response_until_requests_structured_output(provider, expected_key):
+    """Test that streamed requests are constrained by a structured parser's schema."""
+    bodies = []
+
+    def responder(body):
+        bodies.append(body)
+        return '{"a": 1}'
+
+    with MockProviderServer(responder=responder) as server:
+        chat = Chat(
+            provider,
+            api_key="test_key",
+            base_url=server.base_url(provider),
+            parser_type="structured",
+            parser_options={
+                "schema": {"type": "object", "properties": {"a": {"type": "integer"}}}
+            },
+        )
+        result = chat.get_response_until("Hi")
+
+    assert result == {"a": 1}
+    assert expected_key in bodies[0]
@@ -82,4 +82,75 @@ def test_extract_code_missing_fields():
     '''
     
     blocks = parser.extract_code(response)
-    assert len(blocks) == 0  # Should skip invalid code blocks 
\ No newline at end of file
+    assert len(blocks) == 0  # Should skip invalid code blocks 
+
+
+def test_extract_deeply_nested_code():
+    """Test that deeply nested structures do not hit the recursion limit."""
+    parser = JSONParser()
+    data = {"code": "x = 1", "language": "python"}
+    for _ in range(5000):
+        data = {"child": [data]}
+    blocks = parser.extract_code(data)
+    assert blocks == [{"language": "python", "content": "x = 1"}]
+
+
+def test_extract_code_visits_code_objects_once():
+    """Test that nested code objects under code fields are reported once."""
+    parser = JSONParser()
+    response = '{"function": {"code": "a()"}, "tests": [{"code": "b()"}]}'
+    blocks = parser.extract_code(response)
+    assert [b["content"] for b in blocks] == ["a()", "b()"]
+
+
+def test_return_objects():
+    """Test returning decoded values instead of re-serialized text."""
+    parser = JSONParser(return_objects=True)
+    data = parser.parse_response('```json\n{"code": "print(1)"}\n```')
+    assert data == {"code": "print(1)"}
+    assert parser.extract_code(data) == [{"language": "", "content": "print(1)"}]
+    assert parser.parse_response("not json") == "not json"
+    assert parser.parse_response("null") is None
+
+
+def test_parse_repairs_broken_json():
+    """Test that slightly broken JSON is repaired and the repairs reported."""
+    parser = JSONParser()
+    parsed = parser.parse("Here you go:\n{'code': 'x = 1', 'language': 'python',}")
+    assert parsed.ok
+    assert parsed.data == {"code": "x = 1", "language": "python"}
+    assert parsed.repairs == [
+        "extracted_json",
+        "converted_single_quotes",
+        "removed_trailing_commas",
+    ]
+    assert not parsed.truncated
+    assert parser.extract_code(parsed.raw) == [
+        {"language": "python", "content": "x = 1"}
+    ]
+
+    assert not JSONParser(repair=False).parse(parsed.raw).ok
+
+
+def test_parse_uses_finish_reason_for_truncation():
+    """Test that truncation is taken from the finish reason when available."""
+    from chatanvil.providers.base import ProviderResponse
+
+    parser = JSONParser()
+    text = '{"code": "def f():\n    return'
+    assert parser.parse(text).truncated
+    assert parser.parse(text).data == {"code": "def f():\n    return"}
+
+    parser = JSONParser()
+    assert parser.parse(ProviderResponse('{"a": 1}', "length")).truncated
+    assert not JSONParser().parse(ProviderResponse(text, "stop")).truncated
+
+
+def test_parse_cache_keeps_finish_reasons_apart():
+    """Test that one parser reports truncation per finish reason for equal text."""
+    from chatanvil.providers.base import ProviderResponse
+
+    parser = JSONParser()
+    assert parser.parse(ProviderResponse('{"a": 1}', "length")).truncated
+    assert not parser.parse(ProviderResponse('{"a": 1}', "stop")).truncated
+    assert parser.parse(ProviderResponse('{"a": 1}', "length")).truncated
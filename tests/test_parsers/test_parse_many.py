@@ -0,0 +1,67 @@
+import pytest
+
+from chatanvil.parsers.factory import ParserFactory
+from chatanvil.parsers.json_parser import JSONParser
+
+
+def make_responses(count):
+    return [f'{{"code": "print({i})", "language": "python"}}' for i in range(count)]
+
+
+@pytest.mark.parametrize("mode", ["process", "thread"])
+def test_parse_many_preserves_order(mode):
+    """Test that results come back in input order across chunks."""
+    responses = make_responses(50)
+    results = list(
+        ParserFactory.parse_many(responses, "json", workers=2, mode=mode, chunksize=7)
+    )
+    parser = JSONParser()
+    assert results == [parser.parse_response(r) for r in responses]
+
+
+def test_parse_many_extract_code_lazy_input():
+    """Test code extraction over a generator input."""
+    responses = (f"```python\nprint({i})\n```" for i in range(20))
+    results = list(
+        ParserFactory.parse_many(
+            responses,
+            "markdown",
+            workers=2,
+            mode="thread",
+            chunksize=3,
+            extract_code=True,
+        )
+    )
+    assert len(results) == 20
+    assert results[5] == [{"language": "python", "content": "print(5)"}]
+
+
+def test_parse_many_validation():
+    """Test unsupported parser types and modes."""
+    with pytest.raises(ValueError, match="Unsupported parser type"):
+        ParserFactory.parse_many([], "yaml")
+    with pytest.raises(ValueError, match="Unsupported parse mode"):
+        ParserFactory.parse_many([], "json", mode="gpu")
+
+
+def test_parse_many_starts_pool_lazily(monkeypatch):
+    """Test that no pool is created until the results are read."""
+    from chatanvil.parsers import factory
+
+    created = []
+
+    class RecordingExecutor(factory.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(factory, "ThreadPoolExecutor", RecordingExecutor)
+    results = ParserFactory.parse_many(make_responses(10), "json", mode="thread")
+    assert created == []
+    del results
+
+    results = ParserFactory.parse_many(make_responses(10), "json", mode="thread")
+    assert next(results) == JSONParser().parse_response(make_responses(1)[0])
+    results.close()
+    assert len(created) == 1
+    assert created[0]._shutdown
@@ -0,0 +1,79 @@
+import json
+from unittest.mock import patch
+
+from chatanvil.parsers.json_parser import JSONParser
+from chatanvil.parsers.markdown import MarkdownParser
+from chatanvil.parsers.parsed import ParseCache, ParsedResponse
+from chatanvil.parsers.xml_parser import XMLParser
+from chatanvil.utils import json_backend
+
+JSON_RESPONSE = '```json\n{"code": "print(1)", "language": "python"}\n```'
+
+
+def test_json_parses_once():
+    """Test that parse_response followed by extract_code loads the JSON once."""
+    parser = JSONParser()
+    with patch.object(json_backend, "loads", wraps=json_backend.loads) as loads:
+        text = parser.parse_response(JSON_RESPONSE)
+        blocks = parser.extract_code(text)
+        assert parser.extract_code(JSON_RESPONSE) == blocks
+    assert loads.call_count == 1
+    assert blocks[0] == {"language": "python", "content": "print(1)"}
+
+
+def test_parsed_response_is_lazy():
+    """Test that formatting and extraction only run on first access."""
+    parser = JSONParser()
+    parsed = parser.parse(JSON_RESPONSE)
+    assert parsed.data == {"code": "print(1)", "language": "python"}
+    assert parsed._text is None and parsed._code_blocks is None
+    assert parsed.text == json.dumps(parsed.data, indent=2)
+    assert str(parsed) == parsed.text
+    assert parser.parse(JSON_RESPONSE) is parsed
+
+
+def test_extract_code_returns_copies():
+    """Test that callers cannot corrupt cached code blocks."""
+    parser = MarkdownParser()
+    response = "```python\nprint(1)\n```"
+    parser.extract_code(response)[0]["content"] = "changed"
+    assert parser.extract_code(response)[0]["content"] == "print(1)"
+
+
+def test_xml_parsed_response():
+    """Test that XML keeps its root element and handles invalid input."""
+    parser = XMLParser()
+    parsed = parser.parse('<root><code language="python">x = 1</code></root>')
+    assert parsed.data.tag == "root"
+    assert parsed.code_blocks == [{"language": "python", "content": "x = 1"}]
+
+    invalid = parser.parse("<root>")
+    assert invalid.data is None
+    assert invalid.text == "<root>"
+    assert invalid.code_blocks == []
+
+
+def test_parse_cache_evicts_oldest():
+    """Test the LRU bound of the parse cache."""
+    cache = ParseCache(maxsize=2)
+    for key in ("a", "b"):
+        cache.put(key, ParsedResponse(key))
+    cache.get("a")
+    cache.put("c", ParsedResponse("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_chat_extract_code_reuses_parse():
+    """Test the get_response then extract_code flow through Chat."""
+    from chatanvil.core.chat import Chat
+    from chatanvil.testing import MockProviderServer
+
+    with MockProviderServer(response_text=JSON_RESPONSE) as server:
+        chat = Chat("ollama", base_url=server.base_url("ollama"), parser_type="json")
+        with patch.object(chat.parser, "_build", wraps=chat.parser._build) as build:
+            parsed = chat.get_parsed_response("hi")
+            text = chat.get_response("hi")
+            assert chat.extract_code(text) == chat.extract_code(parsed)
+    assert build.call_count == 1
+    assert text == parsed.text
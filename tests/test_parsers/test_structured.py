@@ -0,0 +1,133 @@
+import enum
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Optional
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.parsers.factory import ParserFactory
+from chatanvil.parsers.structured import (
+    StructuredOutputError,
+    StructuredParser,
+    compile_validator,
+    schema_from_dataclass,
+)
+from chatanvil.testing import MockProviderServer
+
+
+class Level(enum.Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+@dataclass
+class Step:
+    title: str
+    minutes: float
+
+
+@dataclass
+class Plan:
+    name: str
+    steps: List[Step]
+    level: Level
+    kind: Literal["draft", "final"] = "draft"
+    owner: Optional[str] = None
+    tags: Dict[str, int] = field(default_factory=dict)
+
+
+PLAN_JSON = json.dumps(
+    {"name": "p", "steps": [{"title": "a", "minutes": 5}], "level": "high"}
+)
+
+
+def test_schema_from_dataclass():
+    """Test JSON Schema generation from type hints."""
+    schema = schema_from_dataclass(Plan)
+    assert schema["required"] == ["name", "steps", "level"]
+    assert schema["additionalProperties"] is False
+    assert schema["properties"]["steps"]["items"]["properties"]["minutes"] == {
+        "type": "number"
+    }
+    assert schema["properties"]["level"] == {"enum": ["low", "high"]}
+    assert schema["properties"]["owner"] == {
+        "anyOf": [{"type": "string"}, {"type": "null"}]
+    }
+    assert len(schema_from_dataclass(Plan, strict=True)["required"]) == 6
+    with pytest.raises(TypeError, match="Expected a dataclass"):
+        schema_from_dataclass(dict)
+
+
+def test_parse_response_returns_typed_object():
+    """Test conversion into nested dataclasses and enums."""
+    plan = StructuredParser(Plan).parse_response(PLAN_JSON)
+    assert plan == Plan(
+        name="p", steps=[Step(title="a", minutes=5.0)], level=Level.HIGH
+    )
+
+
+def test_parse_response_validation_errors():
+    """Test that schema violations raise with their JSON paths."""
+    parser = StructuredParser(Plan)
+    with pytest.raises(StructuredOutputError) as excinfo:
+        parser.parse_response(
+            '{"name": 1, "steps": [{"title": "a"}], "level": "x", "y": 0}'
+        )
+    errors = excinfo.value.errors
+    assert "$.name: expected string, got int" in errors
+    assert "$.steps[0]: missing required property 'minutes'" in errors
+    assert "$.level: 'x' is not one of ['low', 'high']" in errors
+    assert "$: unexpected property 'y'" in errors
+    with pytest.raises(StructuredOutputError, match="invalid JSON"):
+        parser.parse_response("not json")
+
+
+def test_compile_validator_is_cached():
+    """Test that equal schemas share one compiled validator."""
+    schema = {
+        "$defs": {
+            "node": {"type": "object", "properties": {"next": {"$ref": "#/$defs/node"}}}
+        },
+        "$ref": "#/$defs/node",
+    }
+    validator = compile_validator(schema)
+    assert validator is compile_validator(json.loads(json.dumps(schema)))
+    assert validator({"next": {"next": {}}}) == []
+    assert validator({"next": {"next": 3}}) == ["$.next.next: expected object, got int"]
+
+
+def test_factory_requires_schema():
+    """Test that the structured parser needs a schema."""
+    with pytest.raises(ValueError, match="requires a schema"):
+        ParserFactory.get_parser("structured")
+
+
+@pytest.mark.parametrize(
+    "provider, expected_key",
+    [("openai", "response_format"), ("ollama", "format"), ("claude", "tool_choice")],
+)
+def test_chat_requests_native_structured_output(provider, expected_key):
+    """Test that Chat sends each provider's constrained-output parameters."""
+    bodies = []
+
+    def responder(body):
+        bodies.append(body)
+        return PLAN_JSON
+
+    with MockProviderServer(responder=responder) as server:
+        chat = Chat(
+            provider,
+            api_key="test_key",
+            base_url=server.base_url(provider),
+            parser_type="structured",
+            parser_options={"schema": Plan},
+        )
+        plan = chat.get_response("Make a plan")
+
+    assert plan.steps == [Step(title="a", minutes=5.0)]
+    assert expected_key in bodies[0]
+    if provider == "openai":
+        assert bodies[0]["response_format"]["json_schema"]["name"] == "Plan"
+    if provider == "claude":
+        assert bodies[0]["tools"][0]["input_schema"] == schema_from_dataclass(Plan)
@@ -0,0 +1,61 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from chatanvil.parsers.xml_parser import XMLParser
+
+RESPONSE = """```xml
+<answer>
+<source language="js">let a = 1;</source>
+<step><code language="python">print(1)</code></step>
+<code>  x = 2  </code>
+</answer>
+```"""
+
+
+def test_parse_response_pretty():
+    """Test that valid XML is re-indented without minidom."""
+    parser = XMLParser()
+    text = parser.parse_response("<a><b>1</b></a>")
+    assert text == "<a>\n  <b>1</b>\n</a>\n"
+    assert parser.parse_response("<a>") == "<a>"
+
+
+def test_parse_response_not_pretty():
+    """Test that pretty-printing can be turned off."""
+    parser = XMLParser(pretty=False)
+    assert parser.parse_response(RESPONSE) == RESPONSE[7:-4]
+
+
+def test_extract_code():
+    """Test code extraction from <code> and <source> tags."""
+    blocks = XMLParser().extract_code(RESPONSE)
+    assert blocks == [
+        {"language": "python", "content": "print(1)"},
+        {"language": "", "content": "x = 2"},
+        {"language": "js", "content": "let a = 1;"},
+    ]
+
+
+def test_streaming_extract_code():
+    """Test that streaming mode finds the same blocks in document order."""
+    parser = XMLParser(streaming=True)
+    blocks = parser.extract_code(RESPONSE)
+    assert blocks == [
+        {"language": "js", "content": "let a = 1;"},
+        {"language": "python", "content": "print(1)"},
+        {"language": "", "content": "x = 2"},
+    ]
+    assert parser.parse(RESPONSE).data is None
+    assert parser.extract_code("<answer><code>x</code>") == []
+    assert parser.parse_response("<a><b>1</b></a>") == "<a>\n  <b>1</b>\n</a>\n"
+
+
+def test_iter_code_chunks():
+    """Test extraction from small chunks, ignoring a <code> root element."""
+    document = "<code><items>" + "<code>x</code>" * 100 + "</items></code>"
+    chunks = [document[i : i + 7] for i in range(0, len(document), 7)]
+    blocks = list(XMLParser().iter_code(chunks))
+    assert len(blocks) == 100
+    with pytest.raises(ET.ParseError):
+        list(XMLParser().iter_code(["<a><b></a>"]))
@@ -0,0 +1,49 @@
+import httpx
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.testing import MockProviderServer
+
+
+def test_prewarm_opens_pooled_connections():
+    """Test that prewarm fills the pool and real requests reuse its connections."""
+    with MockProviderServer(response_text="ok") as server:
+        client = httpx.Client()
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            http_client=client,
+        )
+        chat.prewarm(connections=3).result(timeout=5)
+        assert server.stats.snapshot()["paths"]["/v1/models"] == 3
+        # Connection pool internals: idle connections to the server, up to one
+        # per prewarm request depending on how they overlapped
+        opened = len(client._transport._pool.connections)
+        assert 1 <= opened <= 3
+
+        chat.get_response("Hi")
+        assert len(client._transport._pool.connections) == opened
+
+
+def test_prewarm_from_environment(monkeypatch):
+    """Test that HTTP_PREWARM prewarms on construction without blocking it."""
+    monkeypatch.setenv("HTTP_PREWARM", "1")
+    with MockProviderServer() as server:
+        chat = Chat("openai_compatible", base_url=server.base_url("openai_compatible"))
+        assert chat.config.prewarm
+        chat.prewarm().result(timeout=5)
+        assert server.stats.snapshot()["paths"]["/v1/models"] >= 1
+
+
+def test_prewarm_failure_is_reported_by_the_future():
+    """Test that an unreachable endpoint fails the future rather than raising."""
+    chat = Chat(
+        "openai",
+        api_key="test_key",
+        base_url="http://127.0.0.1:9/v1",
+        connect_timeout=1,
+    )
+    chat.provider.client = chat.provider.client.with_options(max_retries=0)
+    with pytest.raises(Exception):
+        chat.prewarm().result(timeout=5)
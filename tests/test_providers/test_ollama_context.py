@@ -0,0 +1,99 @@
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.providers.ollama.context import ContextStore
+from chatanvil.testing import MockProviderServer
+
+
+@pytest.fixture
+def requests_seen():
+    """Fixture for a mock server that records every generation request body."""
+    bodies = []
+
+    def responder(body):
+        bodies.append(body)
+        return f"reply {len(bodies)}"
+
+    with MockProviderServer(responder=responder) as server:
+        yield server, bodies
+
+
+def converse(chat, session_id, turns, stream=False):
+    """Run a conversation the way a caller keeping full history would."""
+    messages = [{"role": "system", "content": "Be brief"}]
+    for turn in turns:
+        messages.append({"role": "user", "content": turn})
+        if stream:
+            reply = "".join(
+                chat.provider.stream_chat_completion(messages, session_id=session_id)
+            )
+        else:
+            reply = chat.get_chat_completion(messages, session_id=session_id)
+        messages.append({"role": "assistant", "content": reply})
+    return messages
+
+
+def test_session_turns_send_only_the_new_message(requests_seen):
+    """Test that later turns continue from the stored context."""
+    server, bodies = requests_seen
+    chat = Chat("ollama", model="mock-model", base_url=server.base_url("ollama"))
+    converse(chat, "s1", ["first question", "second", "third"])
+
+    assert server.stats.snapshot()["paths"]["/api/generate"] == 3
+    assert "/api/chat" not in server.stats.snapshot()["paths"]
+    assert bodies[0]["system"] == "Be brief"
+    assert [body["prompt"] for body in bodies] == ["first question", "second", "third"]
+    # Each context extends the previous one
+    assert len(bodies[1]["context"]) < len(bodies[2]["context"])
+    assert bodies[2]["context"][: len(bodies[1]["context"])] == bodies[1]["context"]
+    assert chat.provider.contexts.hits == 2
+
+
+def test_streamed_session_turns_keep_the_context(requests_seen):
+    """Test that streamed turns store the context from the final chunk."""
+    server, bodies = requests_seen
+    chat = Chat("ollama", model="mock-model", base_url=server.base_url("ollama"))
+    converse(chat, "s1", ["one", "two"], stream=True)
+    assert "context" in bodies[1]
+    assert len(chat.provider.contexts) == 1
+
+
+def test_evicted_or_edited_history_falls_back_to_chat(requests_seen):
+    """Test the full-history fallback when no stored context matches."""
+    server, bodies = requests_seen
+    chat = Chat(
+        "ollama",
+        model="mock-model",
+        base_url=server.base_url("ollama"),
+        max_sessions=1,
+    )
+    first = converse(chat, "a", ["hello"])
+    converse(chat, "b", ["hello"])  # evicts session a
+
+    first.append({"role": "user", "content": "again"})
+    chat.get_chat_completion(first, session_id="a")
+    assert bodies[-1]["messages"] == first
+
+    edited = converse(chat, "b", ["hello"])
+    edited[1]["content"] = "changed"
+    edited.append({"role": "user", "content": "next"})
+    chat.get_chat_completion(edited, session_id="b")
+    assert "messages" in bodies[-1]
+    assert server.stats.snapshot()["paths"]["/api/chat"] == 2
+
+
+def test_context_store_bounds_tokens():
+    """Test that the store evicts least recently used contexts over its token budget."""
+    store = ContextStore(max_sessions=10, max_tokens=100)
+    history = [{"role": "user", "content": "hi"}]
+    store.put("a", "m", history, range(60))
+    store.put("b", "m", history, range(30))
+    assert store.get("a", "m", history) == list(range(60))
+    store.put("c", "m", history, range(30))
+
+    assert store.get("b", "m", history) is None
+    assert store.get("a", "m", [{"role": "user", "content": "other"}]) is None
+    assert store.get("a", "other-model", history) is None
+    assert store.tokens == 90
+    store.put("d", "m", history, range(500))
+    assert store.get("d", "m", history) is None
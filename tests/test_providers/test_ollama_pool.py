@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import pytest
+from ollama import ResponseError
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.config import Config
+from chatanvil.providers.ollama.pool import OllamaHostPool
+from chatanvil.testing import MockProviderServer
+
+
+class FakeClient:
+    """Client whose /api/ps reports fixed models, or fails when down."""
+
+    def __init__(self, url):
+        self.url = url
+        self.models = []
+        self.down = False
+
+    def ps(self):
+        if self.down:
+            raise ConnectionError(f"{self.url} is down")
+        return SimpleNamespace(
+            models=[SimpleNamespace(name=name, model=name) for name in self.models]
+        )
+
+
+def make_pool(count=2, **kwargs):
+    urls = [f"http://host{i}:11434" for i in range(count)]
+    return OllamaHostPool(urls, client_factory=FakeClient, **kwargs)
+
+
+def test_select_prefers_least_outstanding_and_resident_hosts():
+    """Test that busy hosts are avoided and loaded models attract requests."""
+    pool = make_pool(3)
+    first = pool.select("llama3.1")
+    second = pool.select("llama3.1")
+    third = pool.select("llama3.1")
+    assert len({first.url, second.url, third.url}) == 3
+
+    pool = make_pool(2, cold_penalty=2)
+    pool.hosts[1].client.models = ["llama3.1:latest"]
+    pool.check_health()
+    with pool.acquire("llama3.1") as host:
+        assert host is pool.hosts[1]
+        with pool.acquire("llama3.1") as host:
+            assert host is pool.hosts[1]
+            # Two outstanding on the warm host outweigh the cold load
+            with pool.acquire("llama3.1") as host:
+                assert host is pool.hosts[0]
+    assert [h["outstanding"] for h in pool.snapshot()] == [0, 0]
+
+
+def test_conversations_stick_to_their_host():
+    """Test that a conversation id keeps routing to the same host."""
+    pool = make_pool(3)
+    with pool.acquire("llama3.1", session="a") as host:
+        home = host
+    for _ in range(5):
+        with pool.acquire("llama3.1") as host:
+            pass
+        with pool.acquire("llama3.1", session="a") as host:
+            assert host is home
+
+
+def test_failing_host_is_ejected_and_readmitted():
+    """Test ejection after repeated server errors and re-admission by health check."""
+    pool = make_pool(2, max_failures=2, eject_seconds=60)
+    bad = pool.hosts[0]
+    for _ in range(2):
+        with pytest.raises(ResponseError):
+            with pool.acquire("llama3.1", session="s"):
+                raise ResponseError("overloaded", 503)
+        pool._sessions["s"] = bad
+    assert not bad.healthy
+
+    # The sticky session moves off the ejected host
+    for _ in range(3):
+        with pool.acquire("llama3.1", session="s") as host:
+            assert host is pool.hosts[1]
+
+    # Client errors are the request's fault and do not count against the host
+    with pytest.raises(ResponseError):
+        with pool.acquire("missing") as host:
+            raise ResponseError("model not found", 404)
+    assert host.failures == 0
+
+    bad.client.down = True
+    assert pool.check_health() == {bad.url: False, pool.hosts[1].url: True}
+    bad.client.down = False
+    pool.check_health()
+    assert bad.healthy and bad.failures == 0
+
+
+def test_chat_balances_across_mock_servers():
+    """Test that Chat spreads requests over OLLAMA_HOSTS-style host lists."""
+    with MockProviderServer(response_text="a") as one, MockProviderServer(
+        response_text="b"
+    ) as two:
+        hosts = f"{one.base_url('ollama')},{two.base_url('ollama')}"
+        chat = Chat("ollama", model="mock-model", base_url=hosts)
+        # Once both hosts have the model loaded, idle hosts take turns
+        chat.warmup()
+        assert {m["host"] for m in chat.provider.resident_models()} == {
+            one.base_url("ollama"),
+            two.base_url("ollama"),
+        }
+        replies = [chat.get_response("Hello") for _ in range(4)]
+        assert sorted(set(replies)) == ["a", "b"]
+
+        answers = {chat.get_response("Hi", conversation_id="c1") for _ in range(4)}
+        assert len(answers) == 1
+        assert "".join(chat.stream_response("Hi", conversation_id="c1")) in answers
+
+
+def test_ollama_hosts_from_environment(monkeypatch):
+    """Test that OLLAMA_HOSTS is read as a list of base URLs."""
+    monkeypatch.setenv("OLLAMA_HOSTS", "http://a:11434, http://b:11434")
+    config = Config(service_provider="ollama")
+    assert config.ollama_options["hosts"] == ["http://a:11434", "http://b:11434"]
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.config import Config, parse_keep_alive
+
+
+@pytest.fixture
+def mock_server_options():
+    """Give the mock server a noticeable cold-load delay."""
+    return {"model_load_time": 0.3, "response_text": "hi"}
+
+
+def test_warmup_loads_model_before_first_request(mock_server):
+    """Test that warmup pays the cold load so the first request does not."""
+    chat = Chat("ollama", model="mock-model", base_url=mock_server.base_url("ollama"))
+    chat.warmup()
+    assert chat.provider.is_resident()
+
+    started = time.monotonic()
+    assert chat.get_response("Hello") == "hi"
+    assert time.monotonic() - started < 0.3
+    assert mock_server.stats.snapshot()["model_loads"] == 1
+
+
+def test_keep_alive_controls_residency(mock_server):
+    """Test pinning a model, a per-request override and unloading."""
+    chat = Chat(
+        "ollama",
+        model="mock-model",
+        base_url=mock_server.base_url("ollama"),
+        keep_alive=-1,
+        num_ctx=8192,
+    )
+    chat.get_response("Hello")
+    [resident] = chat.provider.resident_models()
+    assert resident["name"] == "mock-model"
+    assert resident["expires_at"].year > 2100
+
+    chat.get_response("Hello", keep_alive=0)
+    assert not chat.provider.is_resident()
+
+    chat.provider.warmup()
+    chat.provider.unload()
+    assert chat.provider.resident_models() == []
+    assert chat.provider._options(0.5, None, {})["num_ctx"] == 8192
+
+
+def test_ollama_options_from_environment(monkeypatch):
+    """Test that OLLAMA_KEEP_ALIVE and runtime options are read into Config."""
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "-1")
+    monkeypatch.setenv("OLLAMA_NUM_CTX", "4096")
+    config = Config(service_provider="ollama")
+    assert config.ollama_options == {"keep_alive": -1, "num_ctx": 4096}
+    assert config.provider_config["num_ctx"] == 4096
+
+    assert parse_keep_alive("30m") == "30m"
+    assert parse_keep_alive("300") == 300
+    assert Config(service_provider="ollama", keep_alive="1h").keep_alive == "1h"
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.testing import LatencyDistribution, MockProviderServer
+
+
+@pytest.fixture
+def requests_seen():
+    """Fixture for a mock server that records every generation request body."""
+    bodies = []
+
+    def responder(body):
+        bodies.append(body)
+        return "ok"
+
+    with MockProviderServer(responder=responder, models=["served/llama"]) as server:
+        yield server, bodies
+
+
+def test_model_mapping_and_server_extras(requests_seen):
+    """Test that model names are mapped and server parameters reach the body."""
+    server, bodies = requests_seen
+    chat = Chat(
+        "openai_compatible",
+        model="llama",
+        base_url=server.base_url("openai_compatible"),
+        model_map={"llama": "served/llama"},
+        extra_body={"cache_prompt": True},
+    )
+    assert chat.get_response("Hi", best_of=3, guided_regex="ok|no", top_p=0.9) == "ok"
+
+    body = bodies[-1]
+    assert body["model"] == "served/llama"
+    assert body["best_of"] == 3
+    assert body["guided_regex"] == "ok|no"
+    assert body["cache_prompt"] is True
+    assert body["top_p"] == 0.9
+
+
+def test_model_defaults_to_the_served_model(requests_seen):
+    """Test that without a model the first listed model is used."""
+    server, bodies = requests_seen
+    chat = Chat("openai_compatible", base_url=server.base_url("openai_compatible"))
+    assert "".join(chat.stream_response("Hi")) == "ok"
+    assert bodies[-1]["model"] == "served/llama"
+
+
+def test_concurrent_requests_reach_the_server_together():
+    """Test that one provider lets many threads' requests overlap upstream."""
+    with MockProviderServer(ttft=LatencyDistribution.constant(0.2)) as server:
+        chat = Chat("openai_compatible", base_url=server.base_url("openai_compatible"))
+        with ThreadPoolExecutor(32) as executor:
+            list(executor.map(lambda _: chat.get_response("Hi"), range(32)))
+        assert server.stats.snapshot()["peak_inflight"] >= 24
+
+
+def test_requests_spread_over_base_urls():
+    """Test rotation over several servers and conversation affinity."""
+    with MockProviderServer(response_text="a") as one, MockProviderServer(
+        response_text="b"
+    ) as two:
+        urls = [one.base_url("openai_compatible"), two.base_url("openai_compatible")]
+        chat = Chat("openai_compatible", base_url=",".join(urls), model="m")
+        assert {chat.get_response("Hi") for _ in range(4)} == {"a", "b"}
+        assert (
+            len({chat.get_response("Hi", conversation_id="c") for _ in range(4)}) == 1
+        )
+
+
+def test_embeddings_use_the_embedding_model(requests_seen):
+    """Test that embeddings are requested with the embedding model, not the chat model."""
+    server, _ = requests_seen
+    chat = Chat(
+        "openai_compatible",
+        model="llama",
+        base_url=server.base_url("openai_compatible"),
+        model_map={"bge": "BAAI/bge-small-en"},
+        embedding_model="bge",
+    )
+    models = []
+    create = chat.provider.client.embeddings.create
+
+    def recording_create(**kwargs):
+        models.append(kwargs["model"])
+        return create(**kwargs)
+
+    chat.provider.client.embeddings.create = recording_create
+    assert chat.embed(["one", "two"]).shape == (2, 8)
+    assert models == ["BAAI/bge-small-en"]
+
+    chat = Chat("openai_compatible", base_url=server.base_url("openai_compatible"))
+    with pytest.raises(ValueError, match="no default embedding model"):
+        chat.embed(["one"])
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.scheduler import DeadlineExceeded, RequestScheduler
+from chatanvil.testing import LatencyDistribution, MockProviderServer
+
+
+def wait_for_queued(scheduler, count):
+    """Wait until ``count`` requests are queued in the scheduler."""
+    for _ in range(500):
+        if sum(scheduler.snapshot()["queued"].values()) == count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("requests were not queued")
+
+
+def start_waiters(scheduler, requests, admitted):
+    """Start one thread per (priority, tenant) that records its admission."""
+
+    def run(priority, tenant):
+        with scheduler.slot(priority, tenant):
+            admitted.append((priority, tenant))
+
+    threads = []
+    for priority, tenant in requests:
+        thread = threading.Thread(target=run, args=(priority, tenant))
+        thread.start()
+        threads.append(thread)
+        # Queue in a known order
+        wait_for_queued(scheduler, len(threads))
+    return threads
+
+
+def test_interactive_requests_go_first():
+    """Test that queued interactive requests are admitted before batch ones."""
+    scheduler = RequestScheduler(max_concurrency=1, reserved_share=0)
+    admitted = []
+    held = scheduler.acquire()
+    threads = start_waiters(
+        scheduler, [("batch", None), ("batch", None), ("interactive", None)], admitted
+    )
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(5)
+    assert [priority for priority, _ in admitted] == ["interactive", "batch", "batch"]
+
+
+def test_weighted_fair_queuing_between_tenants():
+    """Test that tenants are admitted in proportion to their weights."""
+    scheduler = RequestScheduler(max_concurrency=1, weights={"a": 2})
+    admitted = []
+    held = scheduler.acquire()
+    threads = start_waiters(
+        scheduler, [("batch", "a")] * 6 + [("batch", "b")] * 3, admitted
+    )
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(5)
+    first = [tenant for _, tenant in admitted[:6]]
+    assert first.count("a") == 4 and first.count("b") == 2
+
+
+def test_share_reserved_for_interactive_requests():
+    """Test that batch requests cannot use the reserved concurrency or rate."""
+    scheduler = RequestScheduler(max_concurrency=4, reserved_share=0.5)
+    tickets = [scheduler.acquire("batch") for _ in range(2)]
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("batch", deadline=time.monotonic() + 0.05)
+    tickets += [scheduler.acquire("interactive") for _ in range(2)]
+    assert scheduler.snapshot()["running"] == {"interactive": 2, "batch": 2}
+    for ticket in tickets:
+        scheduler.release(ticket)
+
+    scheduler = RequestScheduler(requests_per_second=10, reserved_share=0.5)
+    for _ in range(5):
+        scheduler.release(scheduler.acquire("batch"))
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("batch", deadline=time.monotonic() + 0.05)
+    scheduler.release(scheduler.acquire("interactive", deadline=time.monotonic() + 1))
+
+
+def test_expired_requests_are_dropped_while_queued():
+    """Test that a request whose deadline passes in the queue is never admitted."""
+    scheduler = RequestScheduler(max_concurrency=1)
+    held = scheduler.acquire()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("batch", deadline=started + 0.2)
+    assert 0.15 <= time.monotonic() - started < 1.0
+    snapshot = scheduler.snapshot()
+    assert snapshot["dropped"]["batch"] == 1
+    assert snapshot["queued"]["batch"] == 0
+    scheduler.release(held)
+    assert scheduler.snapshot()["running"]["interactive"] == 0
+
+
+def test_interactive_latency_holds_during_batch_job():
+    """Test that Chat requests skip ahead of a submitted batch backlog."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(0.2)
+    ) as server:
+        scheduler = RequestScheduler(max_concurrency=2, reserved_share=0.5)
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            scheduler=scheduler,
+        )
+        backlog = [chat.submit("Hi", priority="batch", tenant="job") for _ in range(10)]
+        wait_for_queued(scheduler, 9)
+
+        started = time.monotonic()
+        assert chat.get_response("Hi", tenant="user") == "ok"
+        assert "".join(chat.stream_response("Hi")) == "ok"
+        assert time.monotonic() - started < 1.0
+
+        late = chat.submit("Hi", priority="batch", tenant="job", queue_timeout=0.1)
+        with pytest.raises(DeadlineExceeded):
+            late.result(timeout=5)
+        assert [future.result(timeout=10) for future in backlog] == ["ok"] * 10
+        assert scheduler.snapshot()["running"] == {"interactive": 0, "batch": 0}
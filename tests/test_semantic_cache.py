@@ -0,0 +1,137 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.scheduler import RequestScheduler
+from chatanvil.core.semantic_cache import SemanticCache, cache_scope
+from chatanvil.testing import MockProviderServer
+from chatanvil.utils.retry import DeadlineExceeded
+
+VOCABULARY = ["capital", "france", "paris", "weather", "today", "what", "is", "the"]
+
+
+def bag_of_words(texts):
+    """Embed texts as word counts over a small vocabulary."""
+    vectors = np.zeros((len(texts), len(VOCABULARY)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().strip("?!.").split():
+            if word in VOCABULARY:
+                vectors[row, VOCABULARY.index(word)] += 1
+    return vectors
+
+
+def test_search_respects_threshold_and_scope():
+    """Test that only similar prompts in the same scope are answered."""
+    cache = SemanticCache(bag_of_words, threshold=0.9)
+    scope = cache_scope("openai", "gpt", None)
+    cache.put("What is the capital of France?", scope, "Paris")
+
+    assert cache.get("what is the capital of france", scope) == "Paris"
+    assert cache.get("What is the weather today?", scope) is None
+    assert (
+        cache.get(
+            "What is the capital of France?", cache_scope("openai", "gpt", "be brief")
+        )
+        is None
+    )
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_eviction_keeps_recently_used_entries():
+    """Test that the least recently used entry is evicted when full."""
+    cache = SemanticCache(bag_of_words, threshold=0.99, capacity=2)
+    cache.put("capital", 1, "a")
+    cache.put("weather", 1, "b")
+    assert cache.get("capital", 1) == "a"
+    cache.put("today", 1, "c")
+
+    assert len(cache) == 2
+    assert cache.get("weather", 1) is None
+    assert cache.get("capital", 1) == "a"
+    assert cache.get("today", 1) == "c"
+
+
+def test_save_and_load_memory_mapped(tmp_path):
+    """Test persisting the cache and loading it with a memory-mapped index."""
+    cache = SemanticCache(bag_of_words, threshold=0.9, capacity=8)
+    cache.put("capital of france", 1, "Paris")
+    cache.save(str(tmp_path))
+
+    loaded = SemanticCache.load(str(tmp_path), bag_of_words)
+    assert isinstance(loaded._vectors, np.memmap)
+    assert loaded.get("Capital of France!", 1) == "Paris"
+
+    loaded.put("weather today", 1, "Sunny")
+    assert loaded.get("weather today", 1) == "Sunny"
+    loaded.save(str(tmp_path))
+    assert len(SemanticCache.load(str(tmp_path), bag_of_words, mmap=False)) == 2
+
+
+def test_chat_answers_paraphrases_from_cache():
+    """Test that Chat skips the provider for near-duplicate prompts."""
+    with MockProviderServer(response_text="Paris") as server:
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            semantic_cache=SemanticCache(bag_of_words, threshold=0.9),
+        )
+        assert chat.get_response("What is the capital of France?") == "Paris"
+        assert chat.get_response("what is the capital of france") == "Paris"
+        assert server.stats.snapshot()["completed"] == 1
+
+        chat.get_response("What is the capital of France?", system_prompt="Be brief")
+        assert server.stats.snapshot()["completed"] == 2
+
+        # Sampling settings are part of the scope
+        chat.get_response("What is the capital of France?", temperature=0.0)
+        assert server.stats.snapshot()["completed"] == 3
+
+
+def test_cache_lookup_is_scheduled_and_bounded():
+    """Test that embedding the prompt holds a scheduler slot and counts against the deadline."""
+    scheduler = RequestScheduler(max_concurrency=1)
+    running = []
+
+    def slow_embed(texts):
+        running.append(scheduler.snapshot()["running"]["interactive"])
+        time.sleep(0.4)
+        return bag_of_words(texts)
+
+    with MockProviderServer(response_text="Paris") as server:
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            scheduler=scheduler,
+            semantic_cache=SemanticCache(slow_embed, threshold=0.9),
+        )
+        with pytest.raises(DeadlineExceeded):
+            chat.get_response("What is the capital of France?", timeout=0.2)
+        assert running == [1]
+        assert server.stats.snapshot()["completed"] == 0
+
+
+def test_cache_needs_an_embedder():
+    """Test that a cache without an embedder is rejected for a provider without embeddings."""
+    with pytest.raises(ValueError, match="SemanticCache\\(embedder=...\\)"):
+        Chat("claude", api_key="test_key", semantic_cache=SemanticCache())
+
+    chat = Chat("claude", api_key="test_key")
+    chat.semantic_cache = SemanticCache(bag_of_words)
+    assert chat.semantic_cache.embedder is bag_of_words
+
+    cache = SemanticCache()
+    chat = Chat("openai", api_key="test_key", semantic_cache=cache)
+    assert cache.embedder is chat.embedder
+
+    # Self-hosted servers need an embedding model to be named
+    with pytest.raises(ValueError, match="SemanticCache\\(embedder=...\\)"):
+        Chat("openai_compatible", semantic_cache=SemanticCache())
+    chat = Chat(
+        "openai_compatible", embedding_model="bge", semantic_cache=SemanticCache()
+    )
+    assert chat.semantic_cache.embedder is chat.embedder
@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.submit import Submitter
+from chatanvil.testing import LatencyDistribution, MockProviderServer
+
+
+def client_threads():
+    """Threads other than the mock server's per-connection handlers."""
+    return [
+        thread
+        for thread in threading.enumerate()
+        if "process_request_thread" not in thread.name
+    ]
+
+
+def echo(body):
+    """Mock responder answering with the last message's text."""
+    return body["messages"][-1]["content"]
+
+
+def test_submit_multiplexes_requests_on_the_loop():
+    """Test that many submitted requests overlap upstream without a thread each."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(0.3)
+    ) as server:
+        chat = Chat("openai", api_key="test_key", base_url=server.base_url("openai"))
+        # The first burst opens the connections; name resolution for them
+        # runs in the loop's small thread pool
+        futures = [chat.submit("Hi") for _ in range(32)]
+        assert [future.result(timeout=10) for future in futures] == ["ok"] * 32
+
+        threads = len(client_threads())
+        server.stats.peak_inflight = 0
+        futures = [chat.submit("Hi") for _ in range(32)]
+        assert [future.result(timeout=10) for future in futures] == ["ok"] * 32
+        assert server.stats.snapshot()["peak_inflight"] >= 24
+        assert len(client_threads()) == threads
+
+
+@pytest.mark.parametrize(
+    "provider", ["openai", "claude", "groq", "ollama", "openai_compatible"]
+)
+def test_submit_uses_each_providers_async_client(provider):
+    """Test that every provider answers submitted requests."""
+    with MockProviderServer(response_text="ok") as server:
+        chat = Chat(
+            provider,
+            api_key="test_key",
+            model="mock-model",
+            base_url=server.base_url(provider),
+        )
+        assert chat.submit("Hi", system_prompt="Be brief").result(timeout=10) == "ok"
+
+
+def test_cancel_submitted_request():
+    """Test that cancelling a future frees its slot for the next request."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(2.0)
+    ) as server:
+        chat = Chat("openai", api_key="test_key", base_url=server.base_url("openai"))
+        chat.submitter = Submitter(max_pending=1, timeout=0)
+        started = time.monotonic()
+        future = chat.submit("Hi")
+        time.sleep(0.2)
+        assert future.cancel()
+        assert future.cancelled()
+
+        server.behavior.ttft = LatencyDistribution.constant(0.0)
+        assert chat.submit("Hi").result(timeout=5) == "ok"
+        assert time.monotonic() - started < 1.9
+
+
+def test_submit_queue_is_bounded():
+    """Test that submitting past max_pending raises queue.Full."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(0.5)
+    ) as server:
+        chat = Chat("openai", api_key="test_key", base_url=server.base_url("openai"))
+        chat.submitter = Submitter(max_concurrency=1, max_pending=2, timeout=0)
+        futures = [chat.submit("Hi"), chat.submit("Hi")]
+        with pytest.raises(queue.Full):
+            chat.submit("Hi")
+        assert [future.result(timeout=5) for future in futures] == ["ok", "ok"]
+        assert chat.submit("Hi").result(timeout=5) == "ok"
+
+
+def test_map_yields_responses():
+    """Test map in prompt order and in completion order."""
+    with MockProviderServer(responder=echo) as server:
+        chat = Chat("openai", api_key="test_key", base_url=server.base_url("openai"))
+        prompts = [f"prompt {i}" for i in range(10)]
+        assert list(chat.map(prompts)) == prompts
+        assert sorted(chat.map(prompts, ordered=False)) == sorted(prompts)
+        messages = [{"role": "user", "content": "listed"}]
+        assert list(chat.map([messages])) == ["listed"]
@@ -0,0 +1,181 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from chatanvil.testing import LatencyDistribution, MockProviderServer, ServerBehavior
+
+
+@pytest.fixture(autouse=True)
+def api_keys(monkeypatch):
+    """Provide dummy API keys so providers and loggers can be created."""
+    for name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GROQ_API_KEY"):
+        monkeypatch.setenv(name, "test_key")
+
+
+def post(url, body):
+    """POST a JSON body and return (status, headers, raw bytes)."""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_latency_distributions():
+    """Test that latency samples are non-negative and follow their parameters."""
+    rng = random.Random(0)
+    assert LatencyDistribution.constant(0.5).sample(rng) == 0.5
+    samples = [LatencyDistribution.uniform(1.0, 2.0).sample(rng) for _ in range(100)]
+    assert all(1.0 <= s <= 2.0 for s in samples)
+    assert all(
+        LatencyDistribution.normal(0.0, 1.0).sample(rng) >= 0 for _ in range(100)
+    )
+    with pytest.raises(ValueError, match="Unsupported latency distribution"):
+        LatencyDistribution("bogus")
+
+
+def test_openai_provider_against_mock():
+    """Test that OpenAIChat can be pointed at the mock server."""
+    from chatanvil.providers.openai import OpenAIChat
+
+    with MockProviderServer(response_text="Hello from mock") as server:
+        chat = OpenAIChat(api_key="test_key", base_url=server.base_url("openai"))
+        assert chat.get_response("Hi") == "Hello from mock"
+        assert server.stats.snapshot()["completed"] == 1
+
+
+def test_ollama_provider_against_mock():
+    """Test that OllamaChat can be pointed at the mock server."""
+    from chatanvil.providers.ollama import OllamaChat
+
+    with MockProviderServer(response_text="Hello from mock") as server:
+        chat = OllamaChat(base_url=server.base_url("ollama"))
+        assert chat.get_response("Hi") == "Hello from mock"
+
+
+@pytest.mark.parametrize("provider", ["openai", "claude", "groq", "ollama"])
+def test_finish_reason_reported_by_providers(provider):
+    """Test that providers report a normalised finish reason with the text."""
+    from chatanvil.core.chat import Chat
+
+    text = '{"code": "print(1)", "language": "python"}'
+    with MockProviderServer(response_text=text) as server:
+        chat = Chat(
+            provider,
+            api_key="test_key",
+            base_url=server.base_url(provider),
+            parser_type="json",
+        )
+        complete = chat.provider.get_response("Hi", max_tokens=100)
+        truncated = chat.provider.get_response("Hi", max_tokens=2)
+        parsed = chat.get_parsed_response("Hi", max_tokens=2)
+
+    assert complete == text
+    assert complete.finish_reason == "stop"
+    assert truncated.finish_reason == "length"
+    assert parsed.truncated
+    assert parsed.data == {"code": "print(1)"}
+    assert parsed.repairs == ["closed_brackets"]
+
+
+def test_openai_stream_format():
+    """Test OpenAI SSE chunks and the [DONE] terminator."""
+    with MockProviderServer(output_tokens=3) as server:
+        status, headers, raw = post(
+            server.url + "/v1/chat/completions",
+            {
+                "model": "m",
+                "stream": True,
+                "messages": [{"role": "user", "content": "x"}],
+            },
+        )
+    assert status == 200
+    assert headers["Content-Type"] == "text/event-stream"
+    events = [
+        line[6:] for line in raw.decode().split("\n\n") if line.startswith("data: ")
+    ]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(e) for e in events[:-1]]
+    text = "".join(c["choices"][0]["delta"].get("content") or "" for c in chunks)
+    assert text == "lorem ipsum dolor"
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+
+def test_anthropic_stream_format():
+    """Test Anthropic event names and max_tokens truncation."""
+    with MockProviderServer(output_tokens=5) as server:
+        status, _, raw = post(
+            server.url + "/v1/messages",
+            {
+                "model": "m",
+                "max_tokens": 2,
+                "stream": True,
+                "messages": [{"role": "user", "content": "x"}],
+            },
+        )
+    assert status == 200
+    events = [block.split("\n")[0] for block in raw.decode().strip().split("\n\n")]
+    assert events[0] == "event: message_start"
+    assert events[-1] == "event: message_stop"
+    assert events.count("event: content_block_delta") == 2
+    assert '"stop_reason": "max_tokens"' in raw.decode()
+
+
+def test_ollama_ndjson_stream():
+    """Test that Ollama streams newline-delimited JSON by default."""
+    with MockProviderServer(output_tokens=2) as server:
+        status, _, raw = post(
+            server.url + "/api/chat",
+            {"model": "m", "messages": [{"role": "user", "content": "x"}]},
+        )
+    lines = [json.loads(line) for line in raw.decode().splitlines()]
+    assert status == 200
+    assert [line["done"] for line in lines] == [False, False, True]
+    assert lines[-1]["done_reason"] == "stop"
+
+
+def test_rate_limit_injection():
+    """Test 429 injection with a Retry-After header."""
+    with MockProviderServer(rate_limit_rate=1.0, retry_after=2.5) as server:
+        status, headers, raw = post(
+            server.url + "/v1/chat/completions", {"model": "m", "messages": []}
+        )
+        assert server.stats.snapshot()["rate_limited"] == 1
+    assert status == 429
+    assert headers["Retry-After"] == "3"
+    assert headers["retry-after-ms"] == "2500"
+    assert json.loads(raw)["error"]["type"] == "rate_limit_exceeded"
+
+
+def test_error_injection():
+    """Test injected server errors use the configured status."""
+    behavior = ServerBehavior(error_rate=1.0, error_status=503, seed=1)
+    with MockProviderServer(behavior) as server:
+        status, _, _ = post(server.url + "/api/chat", {"model": "m", "stream": False})
+    assert status == 503
+
+
+def test_ttft_and_token_rate():
+    """Test that time to first token and token rate shape response time."""
+    with MockProviderServer(ttft=0.1, tokens_per_second=50, output_tokens=6) as server:
+        started = time.monotonic()
+        post(server.url + "/v1/chat/completions", {"model": "m", "messages": []})
+        elapsed = time.monotonic() - started
+    # 0.1 s to first token plus 5 gaps of 0.02 s
+    assert 0.2 <= elapsed < 1.0
+
+
+def test_base_url_unknown_provider():
+    """Test base_url with an unsupported provider."""
+    with MockProviderServer() as server:
+        with pytest.raises(ValueError, match="Unsupported provider"):
+            server.base_url("invalid_provider")
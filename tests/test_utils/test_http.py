@@ -0,0 +1,95 @@
+import sys
+import time
+
+import httpx
+import pytest
+
+from chatanvil.core.chat import Chat
+from chatanvil.core.config import Config
+from chatanvil.testing import LatencyDistribution, MockProviderServer
+from chatanvil.utils.http import build_http_client, http_options
+
+
+def test_http_options():
+    """Test that transport settings become httpx client arguments."""
+    options = http_options(timeout=30, connect_timeout=2, max_connections=50)
+    assert options["timeout"] == httpx.Timeout(30, connect=2)
+    assert options["limits"].max_connections == 50
+    assert options["limits"].max_keepalive_connections == 20
+    # The limit not set keeps httpx's default instead of becoming unlimited
+    limits = http_options(max_keepalive_connections=32)["limits"]
+    assert limits.max_connections == 100
+    assert http_options() == {}
+
+    shared = httpx.Client()
+    assert build_http_client(shared, options) is shared
+    assert build_http_client() is None
+    client = build_http_client(None, {"timeout": httpx.Timeout(7.0)})
+    assert client.timeout.read == 7.0
+
+
+def test_http2_requires_h2(monkeypatch):
+    """Test the install hint when HTTP/2 is requested without h2."""
+    monkeypatch.setitem(sys.modules, "h2", None)
+    with pytest.raises(ImportError, match="chatanvil\\[http2\\]"):
+        http_options(http2=True)
+
+
+def test_transport_settings_from_environment(monkeypatch):
+    """Test the environment mappings and per-provider default timeouts."""
+    monkeypatch.setenv("HTTP_READ_TIMEOUT", "45")
+    monkeypatch.setenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "32")
+    monkeypatch.setenv("HTTP_PROXY_URL", "http://proxy:3128")
+    config = Config(service_provider="groq", api_key="test_key")
+    assert config.read_timeout == 45.0
+    assert config.timeout is None
+    assert config.http_options["timeout"] == httpx.Timeout(60.0, connect=5.0, read=45.0)
+    assert config.http_options["limits"].max_keepalive_connections == 32
+    assert config.http_options["proxy"] == "http://proxy:3128"
+
+
+def test_sdk_keeps_its_own_client_unless_needed():
+    """Test that only settings other than timeouts replace the SDK's HTTP client."""
+    import openai
+
+    chat = Chat("openai", api_key="test_key")
+    assert chat.provider.client.timeout == httpx.Timeout(120.0, connect=5.0)
+    assert chat.provider.client._client._transport._pool._max_connections == 1000
+
+    chat = Chat("openai", api_key="test_key", timeout=30, max_connections=50)
+    assert chat.provider.client.timeout == httpx.Timeout(30.0, connect=5.0)
+    assert isinstance(chat.provider.client._client, openai.DefaultHttpxClient)
+    assert chat.provider.client._client._transport._pool._max_connections == 50
+
+
+def test_chat_uses_injected_client_and_timeouts():
+    """Test that a shared client is used and read timeouts cut off hung calls."""
+    with MockProviderServer(
+        response_text="ok", ttft=LatencyDistribution.constant(2.0)
+    ) as server:
+        seen = []
+        shared = httpx.Client(
+            timeout=httpx.Timeout(10.0),
+            event_hooks={"request": [lambda request: seen.append(request.url.path)]},
+        )
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            http_client=shared,
+        )
+        assert chat.provider.client._client is shared
+        assert "".join(chat.stream_response("Hi")) == "ok"
+        assert seen == ["/v1/chat/completions"]
+
+        chat = Chat(
+            "openai",
+            api_key="test_key",
+            base_url=server.base_url("openai"),
+            read_timeout=0.2,
+        )
+        chat.provider.client = chat.provider.client.with_options(max_retries=0)
+        started = time.monotonic()
+        with pytest.raises(Exception, match="timed out"):
+            "".join(chat.stream_response("Hi"))
+        assert time.monotonic() - started < 1.9
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from chatanvil.utils import json_backend
+
+
+def test_loads_matches_stdlib():
+    """Test that the active backend decodes like the standard library."""
+    text = (
+        '{"a": [1, 2.5, "x\\u00e9", null, true], "big": 123456789012345678901234567890}'
+    )
+    assert json_backend.loads(text) == json.loads(text)
+
+
+def test_long_numbers_use_the_standard_library():
+    """Test that only integers too long for 64 bits bypass the fast backend."""
+    assert not json_backend._has_long_number('{"id": 1234567890123456789, "é": 1}')
+    assert json_backend._has_long_number("[-12345678901234567890]")
+    big = -123456789012345678901234567890
+    assert json_backend.loads(f'{{"é": [{big}]}}') == {"é": [big]}
+
+
+def test_loads_invalid_raises_json_error():
+    """Test that invalid input raises the standard JSONDecodeError."""
+    with pytest.raises(json.JSONDecodeError):
+        json_backend.loads("Sure! Here is the JSON: {")
+
+
+def test_dumps_pretty():
+    """Test that pretty output matches json.dumps(indent=2)."""
+    data = {"a": [1, {"b": "é"}]}
+    assert json_backend.dumps_pretty(data) == json.dumps(data, indent=2)
@@ -0,0 +1,54 @@
+import pytest
+
+from chatanvil.utils.json_repair import repair_json
+
+
+@pytest.mark.parametrize(
+    "text, expected, repairs",
+    [
+        ('{"a": [1, 2,],}', {"a": [1, 2]}, ["removed_trailing_commas"]),
+        ('Sure! Here it is: {"a": 1}\nHope that helps.', {"a": 1}, ["extracted_json"]),
+        (
+            "{'a': 'it\\'s \"x\"', 'b': True, 'c': None}",
+            {"a": 'it\'s "x"', "b": True, "c": None},
+            ["converted_single_quotes", "converted_python_literals"],
+        ),
+        (
+            '{"a": "line1\nline2"}',
+            {"a": "line1\nline2"},
+            ["escaped_control_characters"],
+        ),
+        ('[{"x": 1}, {"x": 2', [{"x": 1}, {"x": 2}], ["closed_brackets"]),
+        (
+            '{"code": "print(1)',
+            {"code": "print(1)"},
+            ["closed_string", "closed_brackets"],
+        ),
+        ('{"a": 1, "b"', {"a": 1}, ["closed_brackets", "dropped_incomplete_value"]),
+        (
+            '{"a": 1, "b": tru',
+            {"a": 1},
+            ["closed_brackets", "dropped_incomplete_value"],
+        ),
+        ('{"a": [1, 2], "b":', {"a": [1, 2], "b": None}, ["closed_brackets"]),
+    ],
+)
+def test_repair_json(text, expected, repairs):
+    """Test each supported repair and the repairs reported for it."""
+    assert repair_json(text) == (expected, repairs)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["no json here", '{"a": [}', '{"code": invalid json}'],
+)
+def test_repair_json_gives_up(text):
+    """Test that text that is not nearly JSON is not guessed at."""
+    assert repair_json(text) is None
+
+
+def test_repair_json_is_bounded():
+    """Test that overly long input is not repaired."""
+    text = '{"a": "' + "x" * 100
+    assert repair_json(text) is not None
+    assert repair_json(text, max_length=50) is None
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import time
 from unittest.mock import MagicMock, patch
@@ -94,3 +95,19 @@ def test_retry_on_rate_limit_with_logger():
     assert result == "success"
     assert mock_func.call_count == 2
     assert mock_logger.log_error.call_count == 1
+
+
+
+def test_retry_with_exponential_backoff_async():
+    """Test that coroutine functions are retried with non-blocking sleeps."""
+    calls = []
+
+    @retry_with_exponential_backoff(max_retries=3, base_delay=0.01)
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ValueError("Test error")
+        return "success"
+
+    assert asyncio.run(flaky()) == "success"
+    assert len(calls) == 3